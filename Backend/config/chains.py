@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 @dataclass
@@ -9,9 +9,29 @@ class ChainConfig:
     start_block: int
     native_currency: str
     stable_coins: List[str]
+    poa: bool = False  # OP-stack/PoA style extraData, needs the geth PoA middleware
+    reorg_depth: int = 64  # recent block hashes kept to detect and unwind reorgs
+
+    # Listener timing (seconds): idle poll at the head, pause between batches, back-off on errors
+    poll_interval: float = 5.0
+    batch_delay: float = 1.0
+    error_backoff: float = 10.0
+
+    # Per-chain throughput and backpressure; None falls back to the global settings
+    max_block_batch: Optional[int] = None
+    fetch_concurrency: Optional[int] = None
+    fetch_batch: Optional[int] = None
+    rpc_pool_size: Optional[int] = None
+
+    # DEX factories whose PoolCreated/PairCreated events feed the pool registry (address -> dex)
+    dex_factories: Dict[str, str] = field(default_factory=dict)
+    # Deep reference pools that price the chain's quote assets, deepest first (address -> dex)
+    price_pools: Dict[str, str] = field(default_factory=dict)
 
     def __post_init__(self):
         self.stable_coins = [addr.lower() for addr in self.stable_coins]
+        self.dex_factories = {addr.lower(): dex for addr, dex in self.dex_factories.items()}
+        self.price_pools = {addr.lower(): dex for addr, dex in self.price_pools.items()}
 
     def get_rpc_url(self) -> str:
         """Get RPC URL from settings at runtime (avoids circular import)."""
@@ -22,6 +42,19 @@ class ChainConfig:
             return settings.ETH_RPC_URL
         raise ValueError(f"Unknown chain: {self.name}")
 
+    def get_ws_url(self) -> Optional[str]:
+        """Get the optional WebSocket URL (enables newHeads mode)."""
+        from config.settings import settings
+        if self.name == "base":
+            return settings.BASE_WS_URL
+        elif self.name == "ethereum":
+            return settings.ETH_WS_URL
+        return None
+
+    @property
+    def label(self) -> str:
+        return self.name.capitalize()
+
 
 # Base chain configuration
 BASE = ChainConfig(
@@ -32,7 +65,21 @@ BASE = ChainConfig(
     stable_coins=[
         "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913",  # USDC
         "0xd9aaec86b65d86f6a7b5b1b0c42ffa531710b6ca",  # USDbC
-    ]
+    ],
+    poa=True,
+    poll_interval=5.0,  # ~2s blocks
+    batch_delay=1.0,
+    error_backoff=10.0,
+    rpc_pool_size=32,
+    dex_factories={
+        "0x33128a8fc17869897dce68ed026d694621f6fdfd": "uniswap_v3",
+        "0x420dd381b31aef6683db6b902084cb0ffece40da": "aerodrome",
+        "0x8909dc15e40173ff4699343b6eb8132c65e18ec6": "uniswap_v2",
+    },
+    price_pools={
+        "0xd0b53d9277642d899df5c87a3966a349a798f224": "uniswap_v3",  # WETH/USDC 0.05%
+        "0xcdac0d6c6c59727a65f871236188350531885c43": "aerodrome",  # WETH/USDC volatile
+    },
 )
 
 # Ethereum chain configuration
@@ -44,14 +91,31 @@ ETHEREUM = ChainConfig(
     stable_coins=[
         "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48",  # USDC
         "0xdac17f958d2ee523a2206206994597c13d831ec7",  # USDT
-    ]
+    ],
+    poll_interval=12.0,  # ~1 Ethereum block time
+    batch_delay=2.0,
+    error_backoff=15.0,
+    rpc_pool_size=16,
+    dex_factories={
+        "0x1f98431c8ad98523631ae4a59f267346ea31f984": "uniswap_v3",
+        "0x5c69bee701ef814a2b6a3edd4b1652cb9cc5aa6f": "uniswap_v2",
+    },
+    price_pools={
+        "0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640": "uniswap_v3",  # USDC/WETH 0.05%
+    },
 )
 
+# All indexed chains by name
+CHAINS = {chain.name: chain for chain in (BASE, ETHEREUM)}
+
 # DEX Factory Addresses
 UNISWAP_V3_FACTORY = "0x33128a8fc17869897dce68ed026d694621f6fdfd"  # Base
 AERODROME_FACTORY = "0x420dd381b31aef6683db6b902084cb0ffece40da"  # Base
 UNISWAP_UNIVERSAL_ROUTER = "0x3fC91A3afd70395Cd496C647d5a6CC9D4B2b7FAD"
 
+# Multicall3, deployed at the same address on every supported chain
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
 # WETH on Base
 WETH_BASE = "0x4200000000000000000000000000000000000006"
 USDC_BASE = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
@@ -73,4 +137,11 @@ SYNC_EVENT = "0x1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1
 MINT_EVENT = "0x4c209b5fc8ad50758f13e2e1088ba56a560dff690a1c6fef26394f4c03821c4f"
 BURN_EVENT = "0xdccd412f0b1252819cb1fd330b93224ca42612892bb3f4f789976e6d81936496"
 POOL_CREATED_EVENT = "0x783cca1c0412dd0d695e784568c96da2e9c22ff989357a2e8b1d9b2b4e6b7118"
-PAIR_CREATED_EVENT = "0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9"  # Aerodrome/UniswapV2
\ No newline at end of file
+PAIR_CREATED_EVENT = "0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9"  # Aerodrome/UniswapV2
+AERODROME_POOL_CREATED_EVENT = "0x2128d88d14c80cb081c1252a5acff7a264671bf199ce226b53788fb26065005e"
+AERODROME_SYNC_EVENT = "0xcf2aa50876cdfbb541206f89af0ee78d44a2abf8d328e37fa4917f982149848a"
+AERODROME_BURN_EVENT = "0x5d624aa9c148153ab3446c1b154f660ee7701e549fe9b62dab7171b1c80e6fa2"
+V3_INITIALIZE_EVENT = "0x98636036cb66a9c19a37435efc1e90142190214e8abeb821bdba3f2990dd4c95"
+V3_SWAP_EVENT = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67"
+V3_MINT_EVENT = "0x7a53080ba414158be7ec69b987b5fb7d07dee101fe85488f0853ae16239d0bde"
+V3_BURN_EVENT = "0x0c396cd989a39f4459b5fa1aed6a9a8dcdbc45908acfd67e028cd568da98982c"
@@ -11,6 +11,11 @@ class Settings(BaseSettings):
     BASE_RPC_URL: str = Field(..., alias="BASE_RPC_URL")
     ETH_RPC_URL: str = Field(..., alias="ETH_RPC_URL")
 
+    # Optional WebSocket endpoints — enable newHeads subscription mode
+    BASE_WS_URL: Optional[str] = Field(None)
+    ETH_WS_URL: Optional[str] = Field(None)
+    WS_RECONNECT_SECONDS: int = Field(30)
+
     # Database
     POSTGRES_HOST: str = Field("localhost")
     POSTGRES_PORT: int = Field(5432)
@@ -32,7 +37,30 @@ class Settings(BaseSettings):
 
     # Processing
     BATCH_INTERVAL_SECONDS: int = Field(120)
+    INDEXER_CHAINS: str = Field("base,ethereum")  # comma-separated ChainConfig names
     MAX_BLOCK_BATCH: int = Field(100)
+    BLOCK_FETCH_CONCURRENCY: int = Field(8)
+    BLOCK_FETCH_BATCH: int = Field(10)
+    RPC_BATCH_SIZE: int = Field(50)
+    RPC_POOL_SIZE: int = Field(64)
+    RPC_POOL_SIZE_PER_HOST: int = Field(32)
+    RPC_TIMEOUT_SECONDS: int = Field(30)
+    CHECKPOINT_EVERY_BLOCKS: int = Field(100)
+    CHECKPOINT_EVERY_SECONDS: float = Field(10.0)
+    BACKFILL_WORKERS: int = Field(4)
+    BACKFILL_SHARD_SIZE: int = Field(50000)
+    INTERNAL_CREATE_DETECTION: str = Field("auto")  # auto | debug | parity | logs | off
+    BYTECODE_CACHE_SIZE: int = Field(10000)  # in-process entries in front of bytecode_analysis
+    KNOWN_TOKENS_CAPACITY: int = Field(2000000)  # per-chain Bloom filter sizing
+    KNOWN_TOKENS_ERROR_RATE: float = Field(0.001)
+    LOG_RANGE_BLOCKS: int = Field(2000)  # eth_getLogs window, halved while a node caps results
+    MULTICALL_BATCH_SIZE: int = Field(500)  # calls aggregated into one Multicall3 eth_call
+    PRICE_TTL_BLOCKS: int = Field(5)  # quote-asset prices are reused for this many blocks
+    PRICE_TTL_SECONDS: float = Field(30.0)  # ... or this long, for callers that don't know the block
+    LIQUIDITY_REMOVAL_ALERT_PERCENT: float = Field(50.0)  # share of a pool's liquidity pulled that counts as a rug
+    EARLY_REMOVAL_WINDOW_HOURS: float = Field(72.0)  # removals this soon after liquidity was added are "early"
+    ARCHIVE_DIR: Optional[str] = Field(None)  # set to archive fetched blocks/receipts/logs for replay
+    ARCHIVE_PARTITION_BLOCKS: int = Field(10000)
 
     # Risk weights
     CONTRACT_RISK_WEIGHT: float = 0.35
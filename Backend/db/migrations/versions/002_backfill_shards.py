@@ -0,0 +1,28 @@
+"""Backfill shards — per-shard progress for the parallel historical backfill."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "backfill_shards",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("chain", sa.String(), nullable=False),
+        sa.Column("start_block", sa.BigInteger(), nullable=False),
+        sa.Column("end_block", sa.BigInteger(), nullable=False),
+        sa.Column("last_block", sa.BigInteger(), nullable=False),
+        sa.Column("status", sa.String(), default="pending"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+    )
+    op.create_index("ix_backfill_shards_chain", "backfill_shards", ["chain"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_backfill_shards_chain", table_name="backfill_shards")
+    op.drop_table("backfill_shards")
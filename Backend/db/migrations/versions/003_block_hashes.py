@@ -0,0 +1,22 @@
+"""Block hashes — rolling window of recent block hashes for reorg detection."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "block_hashes",
+        sa.Column("chain", sa.String(), primary_key=True),
+        sa.Column("block_number", sa.BigInteger(), primary_key=True),
+        sa.Column("hash", sa.String(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("block_hashes")
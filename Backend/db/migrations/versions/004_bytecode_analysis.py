@@ -0,0 +1,27 @@
+"""Bytecode analysis — results shared by every token with the same runtime bytecode."""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bytecode_analysis",
+        sa.Column("bytecode_hash", sa.String(), primary_key=True),
+        sa.Column("is_erc20", sa.Boolean(), nullable=True),
+        sa.Column("selectors", postgresql.JSONB(), nullable=True),
+        sa.Column("dangerous_functions", postgresql.JSONB(), nullable=True),
+        sa.Column("contract_score", sa.Float(), nullable=True),
+        sa.Column("contract_flags", postgresql.JSONB(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bytecode_analysis")
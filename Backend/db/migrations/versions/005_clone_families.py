@@ -0,0 +1,33 @@
+"""Clone families — normalized bytecode fingerprints and MinHash signatures."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bytecode_fingerprints",
+        sa.Column("bytecode_hash", sa.String(), primary_key=True),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("family_id", sa.String(), nullable=False),
+        sa.Column("minhash", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+    )
+    op.create_index("ix_bytecode_fingerprints_fingerprint", "bytecode_fingerprints", ["fingerprint"])
+    op.create_index("ix_bytecode_fingerprints_family_id", "bytecode_fingerprints", ["family_id"])
+
+    op.add_column("tokens", sa.Column("family_id", sa.String(), nullable=True))
+    op.create_index("ix_tokens_family_id", "tokens", ["family_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tokens_family_id", table_name="tokens")
+    op.drop_column("tokens", "family_id")
+    op.drop_index("ix_bytecode_fingerprints_family_id", table_name="bytecode_fingerprints")
+    op.drop_index("ix_bytecode_fingerprints_fingerprint", table_name="bytecode_fingerprints")
+    op.drop_table("bytecode_fingerprints")
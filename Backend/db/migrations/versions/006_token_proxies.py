@@ -0,0 +1,19 @@
+"""Token proxies — proxy kind and implementation address of proxied tokens."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("tokens", sa.Column("proxy_kind", sa.String(), nullable=True))
+    op.add_column("tokens", sa.Column("implementation", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("tokens", "implementation")
+    op.drop_column("tokens", "proxy_kind")
@@ -0,0 +1,36 @@
+"""DEX pool registry — every pool created by a known factory, indexed by token."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dex_pools",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("chain", sa.String(), nullable=False),
+        sa.Column("pool_address", sa.String(), nullable=False),
+        sa.Column("dex", sa.String(), nullable=False),
+        sa.Column("token0", sa.String(), nullable=False),
+        sa.Column("token1", sa.String(), nullable=False),
+        sa.Column("fee", sa.Integer(), nullable=True),
+        sa.Column("tick_spacing", sa.Integer(), nullable=True),
+        sa.Column("stable", sa.Boolean(), nullable=True),
+        sa.Column("created_at_block", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()")),
+    )
+    op.create_index("ix_dex_pools_token0", "dex_pools", ["token0"])
+    op.create_index("ix_dex_pools_token1", "dex_pools", ["token1"])
+    op.create_index("ix_dex_pools_created_at_block", "dex_pools", ["created_at_block"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dex_pools_created_at_block", table_name="dex_pools")
+    op.drop_index("ix_dex_pools_token1", table_name="dex_pools")
+    op.drop_index("ix_dex_pools_token0", table_name="dex_pools")
+    op.drop_table("dex_pools")
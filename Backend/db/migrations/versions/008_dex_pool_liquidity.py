@@ -0,0 +1,21 @@
+"""DEX pool liquidity state — the reserve tracker's LP liquidity and peak, so restarts keep them."""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("dex_pools", sa.Column("lp_liquidity", sa.Numeric(78, 0), nullable=True))
+    op.add_column("dex_pools", sa.Column("peak_lp_liquidity", sa.Numeric(78, 0), nullable=True))
+    op.add_column("dex_pools", sa.Column("liquidity_block", sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("dex_pools", "liquidity_block")
+    op.drop_column("dex_pools", "peak_lp_liquidity")
+    op.drop_column("dex_pools", "lp_liquidity")
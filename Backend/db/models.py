@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Text, JSON, BigInteger, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Text, JSON, BigInteger, ForeignKey, LargeBinary, Numeric
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import JSONB
@@ -16,6 +16,9 @@ class Token(Base):
     deployed_block = Column(BigInteger, nullable=False)
     deployed_at = Column(DateTime(timezone=True), server_default=func.now())
     bytecode_hash = Column(String, nullable=True)
+    family_id = Column(String, nullable=True, index=True)  # clone family (see intelligence/clone_index.py)
+    proxy_kind = Column(String, nullable=True)  # eip1167 | eip1967 | beacon | zeppelinos
+    implementation = Column(String, nullable=True)  # bytecode_hash then refers to this code
     name = Column(String, nullable=True)
     symbol = Column(String, nullable=True)
     decimals = Column(Integer, nullable=True)
@@ -97,6 +100,26 @@ class LiquidityPool(Base):
     # Relationship
     token = relationship("Token", back_populates="liquidity_pools")
 
+class DexPool(Base):
+    __tablename__ = "dex_pools"
+    
+    # Every pool created by a known factory, whatever its pair (see dex/pool_registry.py)
+    id = Column(String, primary_key=True)  # chain:address
+    chain = Column(String, nullable=False)
+    pool_address = Column(String, nullable=False)
+    dex = Column(String, nullable=False)  # uniswap_v3, uniswap_v2, aerodrome
+    token0 = Column(String, nullable=False, index=True)
+    token1 = Column(String, nullable=False, index=True)
+    fee = Column(Integer, nullable=True)  # V3 fee tier
+    tick_spacing = Column(Integer, nullable=True)
+    stable = Column(Boolean, nullable=True)  # Aerodrome pool type
+    created_at_block = Column(BigInteger, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Reserve tracker state (see dex/reserve_tracker.py), as of liquidity_block
+    lp_liquidity = Column(Numeric(78, 0), nullable=True)
+    peak_lp_liquidity = Column(Numeric(78, 0), nullable=True)
+    liquidity_block = Column(BigInteger, nullable=True)
+
 class ContractAnalysis(Base):
     __tablename__ = "contract_analysis"
     
@@ -145,4 +168,43 @@ class ProcessedBlock(Base):
     chain = Column(String, primary_key=True)
     block_number = Column(BigInteger, nullable=False)
     processed_at = Column(DateTime(timezone=True), server_default=func.now())
-    hash = Column(String, nullable=True)
\ No newline at end of file
+    hash = Column(String, nullable=True)
+
+class BytecodeAnalysis(Base):
+    __tablename__ = "bytecode_analysis"
+    
+    # Results that depend only on the runtime bytecode, shared by every clone
+    bytecode_hash = Column(String, primary_key=True)
+    is_erc20 = Column(Boolean, nullable=True)
+    selectors = Column(JSONB, nullable=True)
+    dangerous_functions = Column(JSONB, nullable=True)
+    contract_score = Column(Float, nullable=True)
+    contract_flags = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class BytecodeFingerprint(Base):
+    __tablename__ = "bytecode_fingerprints"
+    
+    bytecode_hash = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False, index=True)  # hash of the normalized bytecode
+    family_id = Column(String, nullable=False, index=True)
+    minhash = Column(LargeBinary, nullable=False)  # MinHash signature over opcode n-grams
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class BlockHash(Base):
+    __tablename__ = "block_hashes"
+    
+    chain = Column(String, primary_key=True)
+    block_number = Column(BigInteger, primary_key=True)
+    hash = Column(String, nullable=False)
+
+class BackfillShard(Base):
+    __tablename__ = "backfill_shards"
+    
+    id = Column(String, primary_key=True)  # chain:start-end
+    chain = Column(String, nullable=False, index=True)
+    start_block = Column(BigInteger, nullable=False)
+    end_block = Column(BigInteger, nullable=False)
+    last_block = Column(BigInteger, nullable=False)  # last committed block of the shard
+    status = Column(String, default="pending")  # pending, running, done, failed
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
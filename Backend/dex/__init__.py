@@ -1,5 +1,6 @@
 from dex.uniswap import UniswapTracker
 from dex.aerodrome import AerodromeTracker
+from dex.uniswap_v2 import UniswapV2Tracker
 from dex.liquidity_tracker import LiquidityTracker
 
-__all__ = ["UniswapTracker", "AerodromeTracker", "LiquidityTracker"]
\ No newline at end of file
+__all__ = ["UniswapTracker", "AerodromeTracker", "UniswapV2Tracker", "LiquidityTracker"]
\ No newline at end of file
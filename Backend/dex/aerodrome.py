@@ -1,8 +1,11 @@
 import logging
-from typing import Dict, Any, Optional, List
-from web3 import Web3
+from typing import Dict, Any, Optional, List, Tuple
+from web3 import AsyncWeb3, Web3
 
 from config.chains import AERODROME_FACTORY, WETH_BASE, USDC_BASE
+from dex.discovery import discover_pools
+from utils.multicall import Multicall
+from utils.rpc_batch import BatchRPC
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +70,16 @@ AERODROME_POOL_ABI = [
     },
 ]
 
+# Pool reads behind get_pool_info, in call order
+POOL_INFO_FIELDS = [
+    ("token0", "address"),
+    ("token1", "address"),
+    ("reserve0", "uint256"),
+    ("reserve1", "uint256"),
+    ("totalSupply", "uint256"),
+    ("stable", "bool"),
+]
+
 PAIRED_TOKENS_BASE = [WETH_BASE, USDC_BASE]
 POOL_TYPES = [False, True]  # volatile=False, stable=True
 
@@ -74,87 +87,91 @@ POOL_TYPES = [False, True]  # volatile=False, stable=True
 class AerodromeTracker:
     """Tracks Aerodrome V2/CL liquidity pools on Base for a given ERC-20 token."""
 
-    def __init__(self, w3: Web3, chain: str):
+    DEX = "aerodrome"
+
+    def __init__(self, w3: AsyncWeb3, chain: str, multicall: Optional[Multicall] = None):
         self.w3 = w3
         self.chain = chain
+        self.rpc = BatchRPC(w3)
+        self.multicall = multicall or Multicall(w3, self.rpc)
         self.factory = self.w3.eth.contract(
             address=Web3.to_checksum_address(AERODROME_FACTORY),
             abi=AERODROME_FACTORY_ABI,
         )
+        self._pool = self.w3.eth.contract(abi=AERODROME_POOL_ABI)
 
-    def detect_pool(self, token_address: str) -> Optional[Dict[str, Any]]:
+    async def detect_pool(self, token_address: str) -> Optional[Dict[str, Any]]:
         """
         Query the Aerodrome factory for both volatile and stable pools paired
         against WETH and USDC. Returns first found pool or None.
         """
-        token_cs = Web3.to_checksum_address(token_address)
-
-        for paired in PAIRED_TOKENS_BASE:
-            paired_cs = Web3.to_checksum_address(paired)
-            for stable in POOL_TYPES:
-                try:
-                    pool_address = self.factory.functions.getPool(
-                        token_cs, paired_cs, stable
-                    ).call()
-
-                    if pool_address == "0x0000000000000000000000000000000000000000":
-                        continue
-
-                    logger.info(
-                        f"Aerodrome pool found for {token_address}: {pool_address} "
-                        f"(stable={stable}, pair={paired})"
-                    )
-
-                    pool_info = self.get_pool_info(pool_address)
-                    if pool_info:
-                        pool_info["paired_with"] = paired.lower()
-                        pool_info["stable"] = stable
-                        return pool_info
-
-                except Exception as e:
-                    logger.debug(
-                        f"No Aerodrome pool for {token_address} / {paired} / stable={stable}: {e}"
-                    )
+        try:
+            pools = (await discover_pools(self.multicall, [self], [token_address]))[token_address]
+        except Exception as e:
+            logger.error(f"Error querying Aerodrome factory for {token_address}: {e}")
+            return None
+        return pools[0] if pools else None
 
-        return None
+    def pool_lookups(self, token_address: str) -> List[Tuple[Dict[str, Any], Tuple[str, str]]]:
+        """A factory getPool call for every (paired token, stable) pair, with what it looks for."""
+        token_cs = Web3.to_checksum_address(token_address)
+        return [
+            (
+                {"paired_with": paired.lower(), "stable": stable},
+                (
+                    AERODROME_FACTORY,
+                    self.factory.encodeABI(
+                        fn_name="getPool",
+                        args=[token_cs, Web3.to_checksum_address(paired), stable],
+                    ),
+                ),
+            )
+            for paired in PAIRED_TOKENS_BASE
+            for stable in POOL_TYPES
+        ]
+
+    def pool_info_calls(self, pool_address: str) -> List[Tuple[str, str]]:
+        return [(pool_address, self._pool.encodeABI(fn_name=fn)) for fn, _ in POOL_INFO_FIELDS]
+
+    def parse_pool_info(self, pool_address: str, raws: List[Optional[bytes]]) -> Optional[Dict[str, Any]]:
+        try:
+            token0, token1, reserve0, reserve1, total_supply, is_stable = [
+                self.w3.codec.decode([abi_type], data)[0]
+                for (_, abi_type), data in zip(POOL_INFO_FIELDS, raws)
+            ]
+        except Exception as e:
+            logger.error(f"Error decoding Aerodrome pool info for {pool_address}: {e}")
+            return None
 
-    def get_pool_info(self, pool_address: str) -> Optional[Dict[str, Any]]:
+        return {
+            "address": pool_address.lower(),
+            "dex": self.DEX,
+            "token0": token0.lower(),
+            "token1": token1.lower(),
+            "reserve0": reserve0,
+            "reserve1": reserve1,
+            "total_supply": total_supply,
+            "stable": is_stable,
+            "created_at_block": None,
+        }
+
+    async def get_pool_info(self, pool_address: str) -> Optional[Dict[str, Any]]:
         """Fetch reserves, token addresses and supply from the pool contract."""
         try:
-            pool_cs = Web3.to_checksum_address(pool_address)
-            pool = self.w3.eth.contract(address=pool_cs, abi=AERODROME_POOL_ABI)
-
-            token0 = pool.functions.token0().call()
-            token1 = pool.functions.token1().call()
-            reserve0 = pool.functions.reserve0().call()
-            reserve1 = pool.functions.reserve1().call()
-            total_supply = pool.functions.totalSupply().call()
-            is_stable = pool.functions.stable().call()
-
-            return {
-                "address": pool_address.lower(),
-                "dex": "aerodrome",
-                "token0": token0.lower(),
-                "token1": token1.lower(),
-                "reserve0": reserve0,
-                "reserve1": reserve1,
-                "total_supply": total_supply,
-                "stable": is_stable,
-                "created_at_block": None,
-            }
+            raws = await self.multicall.call(self.pool_info_calls(pool_address))
         except Exception as e:
             logger.error(f"Error fetching Aerodrome pool info for {pool_address}: {e}")
             return None
+        return self.parse_pool_info(pool_address, raws)
 
-    def get_reserves(self, pool_address: str) -> Dict[str, int]:
+    async def get_reserves(self, pool_address: str) -> Dict[str, int]:
         """Fetch current reserves from a pool."""
         try:
-            pool_cs = Web3.to_checksum_address(pool_address)
-            pool = self.w3.eth.contract(address=pool_cs, abi=AERODROME_POOL_ABI)
-            return {
-                "reserve0": pool.functions.reserve0().call(),
-                "reserve1": pool.functions.reserve1().call(),
-            }
+            raws = await self.multicall.call([
+                (pool_address, self._pool.encodeABI(fn_name=fn)) for fn in ("reserve0", "reserve1")
+            ])
+            reserve0, reserve1 = [self.w3.codec.decode(["uint256"], raw)[0] for raw in raws]
+            return {"reserve0": reserve0, "reserve1": reserve1}
         except Exception as e:
             logger.error(f"Error fetching Aerodrome reserves for {pool_address}: {e}")
             return {"reserve0": 0, "reserve1": 0}
\ No newline at end of file
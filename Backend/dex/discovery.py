@@ -0,0 +1,90 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.multicall import Multicall
+
+logger = logging.getLogger(__name__)
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# (to, calldata)
+Call = Tuple[str, str]
+
+
+async def discover_pools(multicall: Multicall, trackers: Sequence[Any],
+                         tokens: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Find the pools of many tokens across DEX trackers in two aggregate calls:
+    every factory lookup first, then the state of every pool found.
+
+    Trackers provide `pool_lookups(token)`, `pool_info_calls(pool)` and
+    `parse_pool_info(pool, raws)`. Pools come back per token in tracker
+    order, then in each tracker's lookup order.
+    """
+    lookups: List[Tuple[str, Any, Dict[str, Any], Call]] = [
+        (token, tracker, candidate, call)
+        for token in tokens
+        for tracker in trackers
+        for candidate, call in tracker.pool_lookups(token)
+    ]
+    raws = await multicall.call([call for *_, call in lookups])
+
+    hits: List[Tuple[str, Any, Dict[str, Any], str]] = []
+    for (token, tracker, candidate, _), raw in zip(lookups, raws):
+        pool_address = _address(raw)
+        if pool_address is None:
+            logger.debug(f"No {tracker.DEX} pool for {token} ({candidate})")
+            continue
+        hits.append((token, tracker, candidate, pool_address))
+
+    infos = await _read_pool_info(multicall, [(tracker, pool_address) for _, tracker, _, pool_address in hits])
+
+    found: Dict[str, List[Dict[str, Any]]] = {token: [] for token in tokens}
+    for (token, tracker, candidate, pool_address), pool_info in zip(hits, infos):
+        if pool_info:
+            logger.info(f"{tracker.DEX} pool found for {token}: {pool_address} ({candidate})")
+            pool_info.update(candidate)
+            found[token].append(pool_info)
+    return found
+
+
+async def read_pools(multicall: Multicall, trackers: Dict[str, Any],
+                     pools: Sequence[Dict[str, Any]], block: str = "latest") -> List[Optional[Dict[str, Any]]]:
+    """
+    State of already known pools (e.g. from the pool registry) at `block` in
+    one aggregate call, merged with each pool dict (whose fields win). `trackers` maps dex
+    names to trackers; pools of other DEXes, or whose reads fail, are None.
+    """
+    targets = [(trackers.get(pool["dex"]), pool["address"]) for pool in pools]
+    known = [(tracker, address) for tracker, address in targets if tracker is not None]
+    infos = iter(await _read_pool_info(multicall, known, block))
+
+    results: List[Optional[Dict[str, Any]]] = []
+    for pool, (tracker, _) in zip(pools, targets):
+        pool_info = next(infos) if tracker is not None else None
+        results.append({**pool_info, **pool} if pool_info else None)
+    return results
+
+
+async def _read_pool_info(multicall: Multicall, targets: Sequence[Tuple[Any, str]],
+                          block: str = "latest") -> List[Optional[Dict[str, Any]]]:
+    """Every (tracker, pool) target's pool info, read in one aggregate call."""
+    calls: List[Call] = []
+    spans: List[Tuple[int, int]] = []
+    for tracker, pool_address in targets:
+        pool_calls = tracker.pool_info_calls(pool_address)
+        spans.append((len(calls), len(pool_calls)))
+        calls.extend(pool_calls)
+    raws = await multicall.call(calls, block)
+    return [
+        tracker.parse_pool_info(pool_address, raws[start:start + count])
+        for (tracker, pool_address), (start, count) in zip(targets, spans)
+    ]
+
+
+def _address(raw: Optional[bytes]) -> Optional[str]:
+    """The address returned by a factory lookup (None for no pool)."""
+    if not raw or len(raw) < 32:
+        return None
+    address = "0x" + bytes(raw[12:32]).hex()
+    return None if address == ZERO_ADDRESS else address
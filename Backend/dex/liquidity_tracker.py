@@ -1,32 +1,32 @@
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
-from web3 import Web3
+from web3 import AsyncWeb3
 
 from db.session import SessionLocal
 from db.models import LiquidityPool, Token
-from dex.uniswap import UniswapTracker
-from dex.aerodrome import AerodromeTracker
-from config.chains import KNOWN_LP_LOCKERS, WETH_BASE, USDC_BASE
+from dex.pool_detector import PoolDetector
+from dex.pool_registry import PoolRegistry
+from dex.price_oracle import get_price_oracle
+from dex.valuation import value_pools
+from config.chains import KNOWN_LP_LOCKERS
 
 logger = logging.getLogger(__name__)
 
-# Rough WETH/USDC price in USD — would be replaced by a price oracle in production
-WETH_PRICE_USD = 2500.0
-USDC_PRICE_USD = 1.0
-
-STABLECOIN_ADDRS = {USDC_BASE.lower()}
-WETH_ADDR = WETH_BASE.lower()
-
 
 class LiquidityTracker:
-    """Orchestrates liquidity pool detection across Uniswap V3 and Aerodrome on Base."""
+    """
+    Orchestrates liquidity pool detection across Uniswap V3, Uniswap V2 and
+    Aerodrome. Pools come from the event-fed pool registry; tokens it has
+    no pools for yet fall back to factory lookups against WETH/USDC.
+    """
 
-    def __init__(self, w3: Web3, chain: str):
+    def __init__(self, w3: AsyncWeb3, chain: str):
         self.w3 = w3
         self.chain = chain
-        self.uniswap = UniswapTracker(w3, chain)
-        self.aerodrome = AerodromeTracker(w3, chain)
+        self.pool_detector = PoolDetector(w3, chain)
+        self.pool_registry = PoolRegistry(chain)
+        self.price_oracle = get_price_oracle(w3, chain)
 
     # ------------------------------------------------------------------
     # Entry point called by the analysis pipeline
@@ -37,17 +37,14 @@ class LiquidityTracker:
         and return a liquidity risk signal dict.
         """
         token_address = token_address.lower()
-        all_pools: list[Dict[str, Any]] = []
 
-        # Check Uniswap V3
-        uni_pool = self.uniswap.detect_pool(token_address)
-        if uni_pool:
-            all_pools.append(uni_pool)
-
-        # Check Aerodrome
-        aero_pool = self.aerodrome.detect_pool(token_address)
-        if aero_pool:
-            all_pools.append(aero_pool)
+        registered = self.pool_registry.lookup([token_address])[token_address]
+        if registered:
+            # Known pools against any quote asset, read in one aggregate call
+            all_pools: list[Dict[str, Any]] = await self.pool_detector.read(registered)
+        else:
+            # Uniswap V3 and Aerodrome lookups and pool reads in two aggregate calls
+            all_pools = await self.pool_detector.detect_all(token_address)
 
         if not all_pools:
             logger.info(f"No DEX pools found for {token_address}")
@@ -57,6 +54,13 @@ class LiquidityTracker:
                 "flags": ["No liquidity added"],
             }
 
+        # Quote-asset prices come from the shared, per-block cached oracle
+        prices = await self.price_oracle.prices(
+            token for pool in all_pools for token in (pool["token0"], pool["token1"])
+        )
+        await self.pool_detector.read_balances(all_pools)
+        values = value_pools(all_pools, prices)
+
         # Persist & enrich each pool record
         db = SessionLocal()
         try:
@@ -65,9 +69,8 @@ class LiquidityTracker:
             ).first()
 
             results = []
-            for pool_data in all_pools:
+            for pool_data, liquidity_usd in zip(all_pools, values):
                 pool_record = self._upsert_pool(db, pool_data, token_address)
-                liquidity_usd = self._estimate_liquidity_usd(pool_data)
                 pool_record.current_liquidity_usd = liquidity_usd
                 if pool_record.peak_liquidity_usd == 0 or liquidity_usd > pool_record.peak_liquidity_usd:
                     pool_record.peak_liquidity_usd = liquidity_usd
@@ -106,39 +109,12 @@ class LiquidityTracker:
                 chain=self.chain,
                 dex=pool_data["dex"],
                 pool_address=pool_data["address"],
+                created_at_block=pool_data.get("created_at_block"),
                 created_at=datetime.utcnow(),
             )
             db.add(record)
         return record
 
-    def _estimate_liquidity_usd(self, pool_data: Dict[str, Any]) -> float:
-        """Rough USD estimate using reserve data from Aerodrome or raw liq from Uniswap."""
-        try:
-            paired = pool_data.get("paired_with", "").lower()
-            if pool_data["dex"] == "aerodrome":
-                reserve0 = pool_data.get("reserve0", 0)
-                reserve1 = pool_data.get("reserve1", 0)
-                # Determine which side is the pricing token
-                t0 = pool_data.get("token0", "").lower()
-                t1 = pool_data.get("token1", "").lower()
-                if t0 == WETH_ADDR:
-                    return (reserve0 / 1e18) * WETH_PRICE_USD * 2
-                if t1 == WETH_ADDR:
-                    return (reserve1 / 1e18) * WETH_PRICE_USD * 2
-                if t0 in STABLECOIN_ADDRS:
-                    return (reserve0 / 1e6) * 2
-                if t1 in STABLECOIN_ADDRS:
-                    return (reserve1 / 1e6) * 2
-                return 0.0
-
-            if pool_data["dex"] == "uniswap_v3":
-                # Uni V3 raw "liquidity" is not in USD, just flag presence
-                return 1.0 if pool_data.get("liquidity", 0) > 0 else 0.0
-
-        except Exception as e:
-            logger.debug(f"Could not estimate liquidity USD: {e}")
-        return 0.0
-
     def _calculate_liquidity_metrics(
         self, result_pools: list, token_address: str, db
     ) -> Dict[str, Any]:
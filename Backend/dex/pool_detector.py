@@ -1,58 +1,112 @@
 import logging
-from typing import Dict, Any, Optional
-from web3 import Web3
+from typing import Dict, Any, List, Optional, Sequence
+from web3 import AsyncWeb3, Web3
 
+from dex.discovery import discover_pools, read_pools
 from dex.uniswap import UniswapTracker
 from dex.aerodrome import AerodromeTracker
+from dex.uniswap_v2 import UniswapV2Tracker
+from utils.multicall import Multicall
 
 logger = logging.getLogger(__name__)
 
+BALANCE_OF_SELECTOR = "0x70a08231"  # balanceOf(address)
+
+# DEXes whose pool value is read from the token balances the pool holds
+BALANCE_DEXES = ("uniswap_v3",)
+
 
 class PoolDetector:
     """
     Unified pool detector that checks both Uniswap V3 and Aerodrome
     and returns the first discovered pool along with its source DEX.
+
+    Both DEXes share one Multicall3 aggregator, so the factory lookups of
+    every token and DEX cost one eth_call and the pool reads one more.
     """
 
-    def __init__(self, w3: Web3, chain: str):
+    def __init__(self, w3: AsyncWeb3, chain: str):
         self.w3 = w3
         self.chain = chain
-        self.uniswap = UniswapTracker(w3, chain)
-        self.aerodrome = AerodromeTracker(w3, chain)
+        self.multicall = Multicall(w3)
+        self.uniswap = UniswapTracker(w3, chain, self.multicall)
+        self.aerodrome = AerodromeTracker(w3, chain, self.multicall)
+        self.uniswap_v2 = UniswapV2Tracker(w3, chain, self.multicall)
+        self.trackers = {t.DEX: t for t in (self.uniswap, self.aerodrome, self.uniswap_v2)}
 
-    def detect(self, token_address: str) -> Optional[Dict[str, Any]]:
+    async def detect(self, token_address: str) -> Optional[Dict[str, Any]]:
         """
         Return the first pool found across all supported DEXes,
         or None if the token has no pool yet.
         """
-        token_address = token_address.lower()
+        pools = await self.detect_all(token_address)
+        if not pools:
+            logger.debug(f"No DEX pool found for {token_address} on {self.chain}")
+            return None
+        return pools[0]
 
-        uni_pool = self.uniswap.detect_pool(token_address)
-        if uni_pool:
-            uni_pool["source"] = "uniswap_v3"
-            return uni_pool
+    async def detect_all(self, token_address: str) -> list[Dict[str, Any]]:
+        """
+        Return every pool found across all supported DEXes for a token.
+        """
+        token_address = token_address.lower()
+        return (await self.detect_many([token_address]))[token_address]
 
-        aero_pool = self.aerodrome.detect_pool(token_address)
-        if aero_pool:
-            aero_pool["source"] = "aerodrome"
-            return aero_pool
+    async def detect_many(self, token_addresses: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        The first pool of each DEX for every token (Uniswap V3 before
+        Aerodrome), keyed by lowercase token address.
+        """
+        tokens = list(dict.fromkeys(address.lower() for address in token_addresses))
+        try:
+            found = await discover_pools(self.multicall, [self.uniswap, self.aerodrome], tokens)
+        except Exception as e:
+            logger.error(f"Error detecting pools for {len(tokens)} tokens on {self.chain}: {e}")
+            return {token: [] for token in tokens}
 
-        logger.debug(f"No DEX pool found for {token_address} on {self.chain}")
-        return None
+        result = {}
+        for token, pools in found.items():
+            first_per_dex: Dict[str, Dict[str, Any]] = {}
+            for pool in pools:
+                pool["source"] = pool["dex"]
+                first_per_dex.setdefault(pool["dex"], pool)
+            result[token] = list(first_per_dex.values())
+        return result
 
-    def detect_all(self, token_address: str) -> list[Dict[str, Any]]:
+    async def read(self, pools: Sequence[Dict[str, Any]], block: str = "latest") -> List[Dict[str, Any]]:
         """
-        Return every pool found across all supported DEXes for a token.
+        State of already known pools (e.g. from the pool registry) at `block`
+        in one aggregate call. Pools that can't be read are dropped.
         """
-        pools = []
-        uni_pool = self.uniswap.detect_pool(token_address.lower())
-        if uni_pool:
-            uni_pool["source"] = "uniswap_v3"
-            pools.append(uni_pool)
+        try:
+            results = await read_pools(self.multicall, self.trackers, pools, block)
+        except Exception as e:
+            logger.error(f"Error reading {len(pools)} pools on {self.chain}: {e}")
+            return []
+        read = []
+        for pool in results:
+            if pool is not None:
+                pool["source"] = pool["dex"]
+                read.append(pool)
+        return read
 
-        aero_pool = self.aerodrome.detect_pool(token_address.lower())
-        if aero_pool:
-            aero_pool["source"] = "aerodrome"
-            pools.append(aero_pool)
-
-        return pools
+    async def read_balances(self, pools: Sequence[Dict[str, Any]]):
+        """
+        Add `balance0`/`balance1`, the token balances each Uniswap V3 pool
+        holds, to the pool dicts in one aggregate call.
+        """
+        targets = [pool for pool in pools if pool["dex"] in BALANCE_DEXES]
+        calls = []
+        for pool in targets:
+            data = BALANCE_OF_SELECTOR + pool["address"][2:].lower().rjust(64, "0")
+            calls.extend([(pool["token0"], data), (pool["token1"], data)])
+        try:
+            raws = await self.multicall.call(calls)
+        except Exception as e:
+            logger.error(f"Error reading balances of {len(targets)} pools on {self.chain}: {e}")
+            return
+        for i, pool in enumerate(targets):
+            raw0, raw1 = raws[2 * i], raws[2 * i + 1]
+            if raw0 and raw1:
+                pool["balance0"] = Web3.to_int(raw0[:32])
+                pool["balance1"] = Web3.to_int(raw1[:32])
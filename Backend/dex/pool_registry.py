@@ -0,0 +1,200 @@
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+
+from config.chains import CHAINS
+from db.session import SessionLocal
+from db.models import DexPool
+
+logger = logging.getLogger(__name__)
+
+# Events that announce a new pool
+POOL_EVENTS = ("PoolCreated", "PairCreated")
+
+# Rows per multi-row INSERT
+POOL_INSERT_CHUNK = 1000
+
+
+class PoolRegistry:
+    """
+    Token -> pools index built from the PoolCreated/PairCreated events of a
+    chain's known DEX factories, so finding a token's pools is a dictionary
+    hit instead of a round of factory lookups. Pools against any quote
+    asset are indexed, not just WETH/USDC.
+
+    The chain listener feeds the registry through its log ingestor and
+    flushes new pools to `dex_pools` after each batch. Processes that don't
+    hold the full index (analysis workers) look tokens up in the table.
+    Events from contracts other than the known factories are ignored, so a
+    fake PoolCreated can't plant pools.
+    """
+
+    def __init__(self, chain: str, factories: Optional[Dict[str, str]] = None):
+        self.chain = chain
+        if factories is None:
+            factories = CHAINS[chain].dex_factories if chain in CHAINS else {}
+        self.factories = {address.lower(): dex for address, dex in factories.items()}
+
+        self.pools: Dict[str, Dict[str, Any]] = {}
+        self.by_token: Dict[str, List[str]] = defaultdict(list)
+        self.pending: List[Dict[str, Any]] = []
+        self.loaded = False
+
+    def load(self):
+        """Build the in-memory index from every persisted pool of the chain."""
+        db = SessionLocal()
+        try:
+            rows = db.query(DexPool).filter(DexPool.chain == self.chain).yield_per(10000)
+            for row in rows:
+                self._add(_from_row(row))
+        finally:
+            db.close()
+        self.loaded = True
+        logger.info(f"Loaded {len(self.pools)} {self.chain} DEX pools into the pool registry")
+
+    def on_event(self, event: Dict[str, Any]):
+        """LogIngestor consumer for PoolCreated/PairCreated."""
+        dex = self.factories.get(event["address"])
+        if dex is None:
+            return
+        params = event["params"]
+        pool = {
+            "address": (params.get("pool") or params.get("pair")).lower(),
+            "dex": dex,
+            "token0": params["token0"].lower(),
+            "token1": params["token1"].lower(),
+            "created_at_block": event["block_number"],
+        }
+        if "fee" in params:
+            pool["fee_tier"] = params["fee"]
+            pool["tick_spacing"] = params["tickSpacing"]
+        if "stable" in params:
+            pool["stable"] = params["stable"]
+
+        if self._add(pool):
+            self.pending.append(pool)
+            logger.debug(f"New {dex} pool {pool['address']} for {pool['token0']}/{pool['token1']}")
+
+    def pools_of(self, token_address: str) -> List[Dict[str, Any]]:
+        """A token's pools from the in-memory index, each with `paired_with` set."""
+        token_address = token_address.lower()
+        return [_paired(self.pools[address], token_address) for address in self.by_token.get(token_address, ())]
+
+    def lookup(self, token_addresses: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Pools of many tokens. Without the full index loaded, tokens the
+        memory index doesn't know are looked up in `dex_pools` in one query.
+        """
+        tokens = list(dict.fromkeys(address.lower() for address in token_addresses))
+        found = {token: self.pools_of(token) for token in tokens}
+        missing = [token for token in tokens if not found[token]]
+        if self.loaded or not missing:
+            return found
+
+        db = SessionLocal()
+        try:
+            rows = db.query(DexPool).filter(
+                DexPool.chain == self.chain,
+                or_(DexPool.token0.in_(missing), DexPool.token1.in_(missing)),
+            ).all()
+        except Exception as e:
+            logger.error(f"Error looking up {self.chain} pools for {len(missing)} tokens: {e}")
+            return found
+        finally:
+            db.close()
+
+        wanted = set(missing)
+        for row in rows:
+            pool = _from_row(row)
+            for token in (pool["token0"], pool["token1"]):
+                if token in wanted:
+                    found[token].append(_paired(pool, token))
+        return found
+
+    def rewind(self, block_number: int):
+        """Forget pools created above block_number after a reorg (persisted ones go with rollback_to)."""
+        orphaned = [p for p in self.pools.values() if p["created_at_block"] > block_number]
+        for pool in orphaned:
+            del self.pools[pool["address"]]
+            for token in (pool["token0"], pool["token1"]):
+                self.by_token[token].remove(pool["address"])
+                if not self.by_token[token]:
+                    del self.by_token[token]
+        self.pending = [p for p in self.pending if p["created_at_block"] <= block_number]
+
+    def flush(self) -> bool:
+        """Persist new pools; on failure they stay pending for the next flush."""
+        if not self.pending:
+            return True
+
+        rows = [_to_row(self.chain, pool) for pool in self.pending]
+        db = SessionLocal()
+        try:
+            for i in range(0, len(rows), POOL_INSERT_CHUNK):
+                stmt = insert(DexPool).values(rows[i:i + POOL_INSERT_CHUNK]).on_conflict_do_nothing(
+                    index_elements=[DexPool.id]
+                )
+                db.execute(stmt)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to persist {len(rows)} {self.chain} pools: {e}")
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+        logger.debug(f"Persisted {len(rows)} new {self.chain} pools")
+        self.pending = []
+        return True
+
+    def _add(self, pool: Dict[str, Any]) -> bool:
+        if pool["address"] in self.pools:
+            return False
+        self.pools[pool["address"]] = pool
+        self.by_token[pool["token0"]].append(pool["address"])
+        self.by_token[pool["token1"]].append(pool["address"])
+        return True
+
+
+def _paired(pool: Dict[str, Any], token_address: str) -> Dict[str, Any]:
+    other = pool["token1"] if pool["token0"] == token_address else pool["token0"]
+    return {**pool, "paired_with": other}
+
+
+def _from_row(row: DexPool) -> Dict[str, Any]:
+    pool = {
+        "address": row.pool_address,
+        "dex": row.dex,
+        "token0": row.token0,
+        "token1": row.token1,
+        "created_at_block": row.created_at_block,
+    }
+    if row.fee is not None:
+        pool["fee_tier"] = row.fee
+        pool["tick_spacing"] = row.tick_spacing
+    if row.stable is not None:
+        pool["stable"] = row.stable
+    # Reserve tracker state persisted by an earlier run
+    if row.liquidity_block is not None:
+        pool["lp_liquidity"] = int(row.lp_liquidity)
+        pool["peak_lp_liquidity"] = int(row.peak_lp_liquidity)
+        pool["liquidity_block"] = row.liquidity_block
+    return pool
+
+
+def _to_row(chain: str, pool: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": f"{chain}:{pool['address']}",
+        "chain": chain,
+        "pool_address": pool["address"],
+        "dex": pool["dex"],
+        "token0": pool["token0"],
+        "token1": pool["token1"],
+        "fee": pool.get("fee_tier"),
+        "tick_spacing": pool.get("tick_spacing"),
+        "stable": pool.get("stable"),
+        "created_at_block": pool["created_at_block"],
+    }
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+from web3 import AsyncWeb3
+
+from config.chains import CHAINS
+from config.settings import settings
+from dex.pool_detector import PoolDetector
+
+logger = logging.getLogger(__name__)
+
+DECIMALS_CALL = "0x313ce567"  # decimals()
+
+Q96 = 1 << 96
+
+
+@dataclass
+class Price:
+    usd: float  # per whole token
+    decimals: int
+
+    def value(self, amount: int) -> float:
+        """USD value of a raw token amount."""
+        return amount / 10 ** self.decimals * self.usd
+
+
+class PriceOracle:
+    """
+    USD prices of a chain's quote assets, read from its reference pools
+    (ChainConfig.price_pools): Uniswap V3 pools through slot0's
+    sqrtPriceX96, reserve pools through their reserves.
+
+    Stablecoins anchor at $1 and prices spread through the reference pools,
+    so WETH is priced off WETH/USDC and any asset paired with WETH off that.
+    Every reference pool is read in one aggregate call, and the snapshot is
+    reused for PRICE_TTL_BLOCKS blocks (PRICE_TTL_SECONDS for callers that
+    don't pass a block), so pricing any number of tokens costs at most one
+    eth_call per TTL.
+    """
+
+    def __init__(self, w3: AsyncWeb3, chain: str, pool_detector: Optional[PoolDetector] = None):
+        self.w3 = w3
+        self.chain = chain
+        self.pool_detector = pool_detector or PoolDetector(w3, chain)
+        config = CHAINS.get(chain)
+        self.reference_pools = [
+            {"address": address, "dex": dex} for address, dex in (config.price_pools if config else {}).items()
+        ]
+        self.stable_coins = list(config.stable_coins) if config else []
+        self.ttl_blocks = settings.PRICE_TTL_BLOCKS
+        self.ttl_seconds = settings.PRICE_TTL_SECONDS
+
+        self.snapshot: Dict[str, Price] = {}
+        self.decimals: Dict[str, int] = {}
+        self._block: Optional[int] = None
+        self._fetched_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def prices(self, tokens: Iterable[str], block: Optional[int] = None) -> Dict[str, Price]:
+        """Prices of the given tokens that the oracle can price (others are left out)."""
+        snapshot = await self.refresh(block)
+        wanted = {token.lower() for token in tokens}
+        return {token: price for token, price in snapshot.items() if token in wanted}
+
+    async def price(self, token: str, block: Optional[int] = None) -> Optional[Price]:
+        return (await self.refresh(block)).get(token.lower())
+
+    async def refresh(self, block: Optional[int] = None) -> Dict[str, Price]:
+        """
+        The current price snapshot, re-read if it is older than the TTL. If
+        the read fails the previous snapshot is kept.
+        """
+        if self._fresh(block):
+            return self.snapshot
+        async with self._lock:
+            # Another caller may have refreshed while we waited
+            if self._fresh(block):
+                return self.snapshot
+            try:
+                pools = await self.pool_detector.read(self.reference_pools)
+                await self._load_decimals(pools)
+                self.snapshot = self._derive(pools)
+                self._block = block
+                self._fetched_at = time.monotonic()
+                logger.debug(f"{self.chain} prices at block {block}: "
+                             + ", ".join(f"{t}=${p.usd:.4f}" for t, p in self.snapshot.items()))
+            except Exception as e:
+                logger.error(f"Error refreshing {self.chain} prices: {e}")
+        return self.snapshot
+
+    def _fresh(self, block: Optional[int]) -> bool:
+        if not self.snapshot:
+            return False
+        if block is not None and self._block is not None:
+            return 0 <= block - self._block < self.ttl_blocks
+        return time.monotonic() - self._fetched_at < self.ttl_seconds
+
+    async def _load_decimals(self, pools: List[Dict[str, Any]]):
+        """Decimals of the stablecoins and reference pool tokens, read once."""
+        tokens = set(self.stable_coins)
+        for pool in pools:
+            tokens.update((pool["token0"], pool["token1"]))
+        missing = sorted(tokens - self.decimals.keys())
+        if not missing:
+            return
+        raws = await self.pool_detector.multicall.call([(token, DECIMALS_CALL) for token in missing])
+        for token, raw in zip(missing, raws):
+            if raw:
+                self.decimals[token] = self.w3.codec.decode(["uint256"], raw)[0]
+
+    def _derive(self, pools: List[Dict[str, Any]]) -> Dict[str, Price]:
+        """Spread USD prices from the stablecoins through the reference pools."""
+        prices = {
+            token: Price(1.0, self.decimals[token]) for token in self.stable_coins if token in self.decimals
+        }
+        ratios = []
+        for pool in pools:
+            t0, t1 = pool["token0"], pool["token1"]
+            if t0 in self.decimals and t1 in self.decimals:
+                ratio = _ratio(pool)
+                if ratio:
+                    # token1 per token0, in whole tokens
+                    ratios.append((t0, t1, ratio * 10 ** (self.decimals[t0] - self.decimals[t1])))
+
+        # Earlier (deeper) pools win when several price the same token
+        changed = True
+        while changed:
+            changed = False
+            for t0, t1, ratio in ratios:
+                if t1 in prices and t0 not in prices:
+                    prices[t0] = Price(ratio * prices[t1].usd, self.decimals[t0])
+                    changed = True
+                elif t0 in prices and t1 not in prices:
+                    prices[t1] = Price(prices[t0].usd / ratio, self.decimals[t1])
+                    changed = True
+        return prices
+
+
+def _ratio(pool: Dict[str, Any]) -> Optional[float]:
+    """Raw token1 per raw token0 in a reference pool."""
+    if "sqrt_price_x96" in pool:
+        return (pool["sqrt_price_x96"] / Q96) ** 2 or None
+    if pool.get("reserve0"):
+        return pool["reserve1"] / pool["reserve0"] or None
+    return None
+
+
+_oracles: Dict[str, PriceOracle] = {}
+
+
+def get_price_oracle(w3: AsyncWeb3, chain: str) -> PriceOracle:
+    """The process-wide price oracle of a chain, so every analysis shares its cache."""
+    oracle = _oracles.get(chain)
+    if oracle is None:
+        oracle = _oracles[chain] = PriceOracle(w3, chain)
+    return oracle
@@ -0,0 +1,432 @@
+import logging
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from celery import group
+from sqlalchemy import DateTime, Float, and_, bindparam, func, or_
+
+from config.settings import settings
+from db.session import SessionLocal
+from db.models import DexPool, LiquidityPool
+from dex.pool_registry import PoolRegistry
+from dex.price_oracle import PriceOracle
+from dex.valuation import value_pools
+from tasks.job_runner import trigger_token_analysis
+
+logger = logging.getLogger(__name__)
+
+# Events that move a pool's reserves or liquidity
+RESERVE_EVENTS = ("Sync", "Mint", "Burn", "Swap", "Initialize")
+
+# Pool addresses per IN (...) lookup
+POOL_QUERY_CHUNK = 1000
+
+
+class ReserveTracker:
+    """
+    Event-sourced liquidity state of the pools in the pool registry.
+
+    Reserve pools (Uniswap V2, Aerodrome) take their reserves from Sync.
+    Uniswap V3 pools take price, tick and in-range liquidity from Initialize
+    and Swap, and apply Mint/Burn liquidity deltas that straddle the
+    current tick.
+
+    Removal is the drop of the pool's LP liquidity from its peak: the
+    geometric mean of the reserves for reserve pools, the total liquidity
+    of all positions for V3. Mints raise the peak, so ordinary add/remove
+    churn doesn't add up to a rug. It is measured at every Burn, so a rug is
+    seen in the block it happens; a Burn crossing
+    LIQUIDITY_REMOVAL_ALERT_PERCENT is logged right away. Removal times are
+    the block timestamps passed to `note_block`.
+
+    A pool's state starts from the LP liquidity and peak persisted in
+    `dex_pools` by an earlier run, from zero for pools created since the
+    tracker started following the chain (`follow_from`), or else from an
+    on-chain read of the pool just before its first event: its reserves, or
+    its in-range `liquidity()` for V3 (a lower bound of all positions).
+    Events of such pools wait for the read, made for all of them in one
+    aggregate call at flush time. Every flush persists the state of changed
+    pools, and a snapshot per pool and block within reorg depth lets
+    `rewind` restore the state from before a fork.
+
+    `flush` values changed pools with the oracle's latest price snapshot,
+    writes those that have a `liquidity_pools` row (tokens under analysis)
+    in one batched UPDATE, and re-queues the analysis of tokens whose pools
+    were just rugged. Reserve pools are valued from their tracked reserves;
+    V3 pools from the token balances they hold, read in one aggregate call
+    at flush time, since their liquidity is spread over arbitrary ranges.
+    Pools that can't be valued yet keep their stored USD liquidity.
+    """
+
+    def __init__(self, chain: str, registry: PoolRegistry, price_oracle: PriceOracle,
+                 trigger_analysis: bool = True, reorg_depth: int = 64):
+        self.chain = chain
+        self.registry = registry
+        self.price_oracle = price_oracle
+        self.trigger_analysis = trigger_analysis
+        self.reorg_depth = reorg_depth
+        self.threshold = settings.LIQUIDITY_REMOVAL_ALERT_PERCENT
+        self.early_window = timedelta(hours=settings.EARLY_REMOVAL_WINDOW_HOURS)
+
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self.dirty: Set[str] = set()
+        self.alerts: Set[str] = set()
+        self.block_times: Dict[int, int] = {}
+        # Pool -> its states as of the end of earlier blocks, oldest first
+        self.history: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        # Pool -> events waiting for the on-chain read of its starting state
+        self.unseeded: Dict[str, List[Dict[str, Any]]] = {}
+        self.reread: Set[str] = set()
+        self.since: Optional[int] = None
+        self.head = 0
+
+    def follow_from(self, block_number: int):
+        """Every pool event from block_number on reaches the tracker, so pools created since start empty."""
+        self.since = block_number
+
+    def note_block(self, block_number: int, timestamp: int):
+        """Record a block's timestamp, ahead of ingesting its logs."""
+        self.block_times[block_number] = timestamp
+
+    def on_event(self, event: Dict[str, Any]):
+        """LogIngestor consumer for Sync/Mint/Burn/Swap/Initialize."""
+        pool = self.registry.pools.get(event["address"])
+        if pool is None:
+            return
+        address = pool["address"]
+        self.head = max(self.head, event["block_number"])
+
+        state = self.state.get(address)
+        if state is None:
+            if address in self.unseeded:
+                self.unseeded[address].append(event)
+                return
+            state = self._seed(pool)
+            if state is None:
+                self.unseeded[address] = [event]
+                return
+            self.state[address] = state
+        self._apply(state, event)
+
+    def _seed(self, pool: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """A pool's starting state when it is known without a chain read."""
+        if pool["address"] in self.reread:
+            return None
+        if "liquidity_block" in pool:
+            return _new_state(pool, pool["lp_liquidity"], pool["peak_lp_liquidity"], pool["liquidity_block"])
+        if self.since is not None and pool["created_at_block"] >= self.since:
+            return _new_state(pool, 0, 0, pool["created_at_block"] - 1)
+        return None
+
+    def _apply(self, state: Dict[str, Any], event: Dict[str, Any]):
+        block_number = event["block_number"]
+        # Already part of the starting state (replayed after a restart)
+        if block_number <= state["seeded_through"]:
+            return
+        if block_number != state["block"]:
+            self.history[state["address"]].append(dict(state))
+
+        name = event["name"]
+        if state["dex"] == "uniswap_v3":
+            _apply_v3(state, name, event["params"])
+        else:
+            _apply_reserves(state, name, event["params"])
+        state["block"] = block_number
+
+        if name == "Mint":
+            state["peak"] = max(state["peak"], state["lp_liquidity"])
+            state["removal"] = _drawdown(state)
+        elif name == "Burn":
+            self._record_removal(state, block_number)
+        self.dirty.add(state["address"])
+
+    def _record_removal(self, state: Dict[str, Any], block_number: int):
+        before = state["removal"]
+        state["removal"] = after = _drawdown(state)
+        if after <= 0:
+            return
+        if "removed_at" not in state:
+            state["removed_at"] = self._block_time(block_number)
+        if before < self.threshold <= after:
+            self.alerts.add(state["address"])
+            logger.warning(
+                f"{self.chain} {state['dex']} pool {state['address']}: {after:.0f}% of liquidity "
+                f"removed from its peak as of block {block_number}"
+            )
+
+    def _block_time(self, block_number: int) -> datetime:
+        timestamp = self.block_times.get(block_number)
+        if timestamp is None:
+            logger.debug(f"No timestamp for {self.chain} block {block_number}, using the current time")
+            return datetime.now(timezone.utc)
+        return datetime.fromtimestamp(timestamp, timezone.utc)
+
+    def rewind(self, block_number: int):
+        """
+        Restore every pool to its state as of block_number, after a reorg.
+        Pools without a snapshot that old are read from chain again on their
+        next event; pools the registry dropped are forgotten.
+        """
+        for address in list(self.state):
+            state = self.state[address]
+            if state["block"] <= block_number and address in self.registry.pools:
+                continue
+            self.alerts.discard(address)
+            snapshots = self.history.get(address, [])
+            while snapshots and snapshots[-1]["block"] > block_number:
+                snapshots.pop()
+            if snapshots and address in self.registry.pools:
+                self.state[address] = snapshots.pop()
+                self.dirty.add(address)
+                continue
+            del self.state[address]
+            self.history.pop(address, None)
+            self.dirty.discard(address)
+            if address in self.registry.pools:
+                self.reread.add(address)
+
+        for address in list(self.unseeded):
+            events = [e for e in self.unseeded[address] if e["block_number"] <= block_number]
+            if events and address in self.registry.pools:
+                self.unseeded[address] = events
+            else:
+                del self.unseeded[address]
+        self.head = min(self.head, block_number)
+
+    async def flush(self) -> bool:
+        """
+        Write changed pools to their `liquidity_pools` rows in one transaction.
+        On failure the changes stay pending for the next flush.
+        """
+        if self.unseeded:
+            await self._seed_from_chain()
+        # Removals are dated as they are applied, so the batch's timestamps are done with
+        self.block_times.clear()
+        self._prune()
+        if not self.dirty:
+            return True
+
+        dirty = list(self.dirty)
+        table = LiquidityPool.__table__
+        removal = bindparam("removal", type_=Float)
+        removed_at = bindparam("removed_at", type_=DateTime(timezone=True))
+        liquidity_usd = bindparam("liquidity_usd", type_=Float)
+        stmt = table.update().where(table.c.id == bindparam("pool_id")).values(
+            # NULL (pool not valued) keeps the stored figure; greatest() ignores NULLs
+            current_liquidity_usd=func.coalesce(liquidity_usd, table.c.current_liquidity_usd),
+            peak_liquidity_usd=func.greatest(table.c.peak_liquidity_usd, liquidity_usd),
+            removal_percentage=func.greatest(table.c.removal_percentage, removal),
+            first_liquidity_removed_at=func.coalesce(table.c.first_liquidity_removed_at, removed_at),
+            removed_early=or_(
+                table.c.removed_early,
+                and_(
+                    removal >= self.threshold,
+                    or_(
+                        table.c.first_liquidity_added_at.is_(None),
+                        removed_at - table.c.first_liquidity_added_at <= self.early_window,
+                    ),
+                ),
+            ),
+        )
+        pool_table = DexPool.__table__
+        state_stmt = pool_table.update().where(pool_table.c.id == bindparam("pool_id")).values(
+            lp_liquidity=bindparam("lp"),
+            peak_lp_liquidity=bindparam("peak"),
+            liquidity_block=bindparam("block"),
+        )
+
+        tracked = self._tracked(dirty)
+        if tracked is None:
+            return False
+        states = [self.state[address] for address in tracked]
+        values = await self._values(states)
+        params = [self._row(state, value) for state, value in zip(states, values)]
+
+        db = SessionLocal()
+        try:
+            db.execute(state_stmt, [self._state_row(self.state[address]) for address in dirty])
+            if params:
+                db.execute(stmt, params)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to write {self.chain} pool liquidity for {len(dirty)} pools: {e}")
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+        rugged = {tracked[address] for address in self.alerts if address in tracked}
+        logger.debug(f"{self.chain} liquidity flush: {len(tracked)}/{len(dirty)} changed pools tracked")
+        self.dirty.clear()
+        self.alerts.clear()
+
+        if self.trigger_analysis and rugged:
+            self._trigger_analyses(rugged)
+        return True
+
+    def _tracked(self, addresses: List[str]) -> Optional[Dict[str, str]]:
+        """Pool -> token of the pools that have a `liquidity_pools` row (None on error)."""
+        db = SessionLocal()
+        try:
+            tracked: Dict[str, str] = {}
+            for i in range(0, len(addresses), POOL_QUERY_CHUNK):
+                rows = db.query(LiquidityPool.pool_address, LiquidityPool.token_address).filter(
+                    LiquidityPool.chain == self.chain,
+                    LiquidityPool.pool_address.in_(addresses[i:i + POOL_QUERY_CHUNK]),
+                )
+                tracked.update(rows)
+            return tracked
+        except Exception as e:
+            logger.error(f"Failed to look up tracked {self.chain} pools: {e}")
+            return None
+        finally:
+            db.close()
+
+    async def _seed_from_chain(self):
+        """
+        Read the pools waiting for a starting state in one aggregate call, as
+        of the block before the earliest event waiting, then apply their events.
+        """
+        pending, self.unseeded = self.unseeded, {}
+        pools = [self.registry.pools[address] for address in pending if address in self.registry.pools]
+        block_number = min(events[0]["block_number"] for events in pending.values()) - 1
+        read = await self.price_oracle.pool_detector.read(pools, hex(block_number))
+        reads = {pool["address"]: pool for pool in read}
+        if len(reads) < len(pools):
+            logger.warning(
+                f"Could not read {len(pools) - len(reads)}/{len(pools)} {self.chain} pools at block "
+                f"{block_number}; their liquidity is tracked from zero"
+            )
+
+        for pool in pools:
+            read = reads.get(pool["address"], {})
+            lp_liquidity, fields = _chain_state(pool["dex"], read)
+            state = self.state[pool["address"]] = _new_state(pool, lp_liquidity, lp_liquidity, block_number)
+            state.update(fields)
+            self.reread.discard(pool["address"])
+            for event in pending[pool["address"]]:
+                self._apply(state, event)
+
+    def _prune(self):
+        """Drop snapshots no reorg can go back to, keeping the newest one at or below the reorg depth."""
+        cutoff = self.head - self.reorg_depth
+        for address in list(self.history):
+            snapshots = self.history[address]
+            keep = next((i for i in range(len(snapshots) - 1, -1, -1) if snapshots[i]["block"] <= cutoff), 0)
+            del snapshots[:keep]
+            if not snapshots:
+                del self.history[address]
+
+    async def _values(self, states: List[Dict[str, Any]]) -> List[Optional[float]]:
+        """USD value of each pool state, None for pools that can't be valued yet."""
+        pools = [dict(state) for state in states]
+        v3 = [pool for pool in pools if pool["dex"] == "uniswap_v3"]
+        if v3:
+            await self.price_oracle.pool_detector.read_balances(v3)
+        values = value_pools(pools, self.price_oracle.snapshot)
+        return [
+            value if ("balance0" if pool["dex"] == "uniswap_v3" else "reserve0") in pool else None
+            for pool, value in zip(pools, values)
+        ]
+
+    def _row(self, state: Dict[str, Any], liquidity_usd: Optional[float]) -> Dict[str, Any]:
+        return {
+            "pool_id": f"{self.chain}:{state['address']}",
+            "liquidity_usd": liquidity_usd,
+            "removal": state["removal"],
+            "removed_at": state.get("removed_at"),
+        }
+
+    def _state_row(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "pool_id": f"{self.chain}:{state['address']}",
+            "lp": state["lp_liquidity"],
+            "peak": state["peak"],
+            "block": state["block"],
+        }
+
+    def _trigger_analyses(self, tokens: Set[str]):
+        """Re-score rugged tokens so the removal shows up in their risk right away."""
+        try:
+            group(
+                trigger_token_analysis.s(token_address=address, chain=self.chain)
+                for address in tokens
+            ).apply_async()
+        except Exception as e:
+            logger.error(f"Failed to enqueue re-analysis for {len(tokens)} rugged {self.chain} tokens: {e}")
+
+
+def _new_state(pool: Dict[str, Any], lp_liquidity: int, peak: int, block_number: int) -> Dict[str, Any]:
+    """Tracked state of a pool starting at the end of block_number."""
+    state = {
+        "address": pool["address"],
+        "dex": pool["dex"],
+        "token0": pool["token0"],
+        "token1": pool["token1"],
+        "tick_spacing": pool.get("tick_spacing"),
+        "lp_liquidity": lp_liquidity,
+        "peak": peak,
+        "block": block_number,
+        "seeded_through": block_number,
+    }
+    state["removal"] = _drawdown(state)
+    return state
+
+
+def _chain_state(dex: str, read: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    """LP liquidity and tracked fields of a pool read (PoolDetector.read)."""
+    if dex == "uniswap_v3":
+        if "liquidity" not in read:
+            return 0, {}
+        return read["liquidity"], {
+            "sqrt_price_x96": read["sqrt_price_x96"],
+            "tick": read["tick"],
+            "liquidity": read["liquidity"],
+        }
+    if "reserve0" not in read:
+        return 0, {}
+    return math.isqrt(read["reserve0"] * read["reserve1"]), {
+        "reserve0": read["reserve0"],
+        "reserve1": read["reserve1"],
+    }
+
+
+def _apply_reserves(state: Dict[str, Any], name: str, params: Dict[str, Any]):
+    """Apply a V2/Aerodrome event. Burn and Mint follow the Sync with the new reserves."""
+    if name == "Sync":
+        state["reserve0"] = params["reserve0"]
+        state["reserve1"] = params["reserve1"]
+        state["lp_liquidity"] = math.isqrt(params["reserve0"] * params["reserve1"])
+        # A pool tracked from zero peaks no lower than its first reserves
+        if not state["peak"]:
+            state["peak"] = state["lp_liquidity"]
+
+
+def _apply_v3(state: Dict[str, Any], name: str, params: Dict[str, Any]):
+    """Apply a Uniswap V3 event."""
+    if name == "Initialize":
+        state["sqrt_price_x96"] = params["sqrtPriceX96"]
+        state["tick"] = params["tick"]
+        state["liquidity"] = 0
+    elif name == "Swap":
+        state["sqrt_price_x96"] = params["sqrtPriceX96"]
+        state["tick"] = params["tick"]
+        state["liquidity"] = params["liquidity"]
+    elif name in ("Mint", "Burn") and "tickLower" in params:
+        delta = params["amount"] if name == "Mint" else -params["amount"]
+        # Liquidity of every position, whatever its range, measures removal. A
+        # pool seeded from chain starts at its in-range liquidity, a lower bound
+        # that burns of out-of-range positions minted earlier can go below.
+        state["lp_liquidity"] = max(0, state["lp_liquidity"] + delta)
+        # Only positions straddling the current tick change in-range liquidity
+        if "liquidity" in state and params["tickLower"] <= state["tick"] < params["tickUpper"]:
+            state["liquidity"] = max(0, state["liquidity"] + delta)
+
+
+def _drawdown(state: Dict[str, Any]) -> float:
+    """Percent of the peak LP liquidity that is gone."""
+    if state["peak"] <= 0:
+        return 0.0
+    return max(0.0, 1.0 - state["lp_liquidity"] / state["peak"]) * 100
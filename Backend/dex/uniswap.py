@@ -1,8 +1,11 @@
 import logging
-from typing import Dict, Any, Optional, List
-from web3 import Web3
+from typing import Dict, Any, Optional, List, Tuple
+from web3 import AsyncWeb3, Web3
 
 from config.chains import UNISWAP_V3_FACTORY, WETH_BASE, USDC_BASE
+from dex.discovery import discover_pools
+from utils.multicall import Multicall
+from utils.rpc_batch import BatchRPC
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +24,7 @@ UNISWAP_V3_FACTORY_ABI = [
     }
 ]
 
-# Minimal ABI to read Uniswap V3 pool slot0 + liquidity
+# Minimal ABI to read Uniswap V3 pool slot0, liquidity and layout
 UNISWAP_V3_POOL_ABI = [
     {
         "inputs": [],
@@ -45,6 +48,13 @@ UNISWAP_V3_POOL_ABI = [
         "stateMutability": "view",
         "type": "function",
     },
+    {
+        "inputs": [],
+        "name": "tickSpacing",
+        "outputs": [{"internalType": "int24", "name": "", "type": "int24"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
     {
         "inputs": [],
         "name": "token0",
@@ -64,6 +74,15 @@ UNISWAP_V3_POOL_ABI = [
 # Standard Uniswap V3 fee tiers
 FEE_TIERS = [100, 500, 3000, 10000]  # 0.01%, 0.05%, 0.3%, 1%
 
+# Pool reads behind get_pool_info, in call order
+POOL_INFO_FIELDS = [
+    ("token0", "address"),
+    ("token1", "address"),
+    ("liquidity", "uint128"),
+    ("slot0", "(uint160,int24,uint16,uint16,uint16,uint8,bool)"),
+    ("tickSpacing", "int24"),
+]
+
 # Paired tokens to search for pools against
 PAIRED_TOKENS_BASE = [
     WETH_BASE,
@@ -74,78 +93,89 @@ PAIRED_TOKENS_BASE = [
 class UniswapTracker:
     """Tracks Uniswap V3 liquidity pools on Base for a given ERC-20 token."""
 
-    def __init__(self, w3: Web3, chain: str):
+    DEX = "uniswap_v3"
+
+    def __init__(self, w3: AsyncWeb3, chain: str, multicall: Optional[Multicall] = None):
         self.w3 = w3
         self.chain = chain
+        self.rpc = BatchRPC(w3)
+        self.multicall = multicall or Multicall(w3, self.rpc)
         self.factory = self.w3.eth.contract(
             address=Web3.to_checksum_address(UNISWAP_V3_FACTORY),
             abi=UNISWAP_V3_FACTORY_ABI,
         )
+        self._pool = self.w3.eth.contract(abi=UNISWAP_V3_POOL_ABI)
 
-    def detect_pool(self, token_address: str) -> Optional[Dict[str, Any]]:
+    async def detect_pool(self, token_address: str) -> Optional[Dict[str, Any]]:
         """
         Query the Uniswap V3 factory for all fee-tier pools paired against
         WETH and USDC. Returns the first found pool, or None.
         """
-        token_cs = Web3.to_checksum_address(token_address)
+        try:
+            pools = (await discover_pools(self.multicall, [self], [token_address]))[token_address]
+        except Exception as e:
+            logger.error(f"Error querying Uniswap V3 factory for {token_address}: {e}")
+            return None
+        return pools[0] if pools else None
 
-        for paired in PAIRED_TOKENS_BASE:
-            paired_cs = Web3.to_checksum_address(paired)
-            for fee in FEE_TIERS:
-                try:
-                    pool_address = self.factory.functions.getPool(
-                        token_cs, paired_cs, fee
-                    ).call()
-
-                    if pool_address == "0x0000000000000000000000000000000000000000":
-                        continue
-
-                    logger.info(
-                        f"Uniswap V3 pool found for {token_address}: {pool_address} "
-                        f"(fee={fee}, pair={paired})"
-                    )
-
-                    pool_info = self.get_pool_info(pool_address)
-                    if pool_info:
-                        pool_info["paired_with"] = paired.lower()
-                        pool_info["fee_tier"] = fee
-                        return pool_info
-
-                except Exception as e:
-                    logger.debug(
-                        f"No Uniswap V3 pool for {token_address} / {paired} / fee={fee}: {e}"
-                    )
-
-        return None
-
-    def get_pool_info(self, pool_address: str) -> Optional[Dict[str, Any]]:
-        """Fetch token0, token1 and current liquidity from the pool contract."""
+    def pool_lookups(self, token_address: str) -> List[Tuple[Dict[str, Any], Tuple[str, str]]]:
+        """A factory getPool call for every (paired token, fee tier), with what it looks for."""
+        token_cs = Web3.to_checksum_address(token_address)
+        return [
+            (
+                {"paired_with": paired.lower(), "fee_tier": fee},
+                (
+                    UNISWAP_V3_FACTORY,
+                    self.factory.encodeABI(
+                        fn_name="getPool",
+                        args=[token_cs, Web3.to_checksum_address(paired), fee],
+                    ),
+                ),
+            )
+            for paired in PAIRED_TOKENS_BASE
+            for fee in FEE_TIERS
+        ]
+
+    def pool_info_calls(self, pool_address: str) -> List[Tuple[str, str]]:
+        return [(pool_address, self._pool.encodeABI(fn_name=fn)) for fn, _ in POOL_INFO_FIELDS]
+
+    def parse_pool_info(self, pool_address: str, raws: List[Optional[bytes]]) -> Optional[Dict[str, Any]]:
         try:
-            pool_cs = Web3.to_checksum_address(pool_address)
-            pool = self.w3.eth.contract(address=pool_cs, abi=UNISWAP_V3_POOL_ABI)
+            token0, token1, liquidity, (sqrt_price_x96, tick, *_), tick_spacing = [
+                self.w3.codec.decode([abi_type], data)[0]
+                for (_, abi_type), data in zip(POOL_INFO_FIELDS, raws)
+            ]
+        except Exception as e:
+            logger.error(f"Error decoding Uniswap V3 pool info for {pool_address}: {e}")
+            return None
 
-            token0 = pool.functions.token0().call()
-            token1 = pool.functions.token1().call()
-            liquidity = pool.functions.liquidity().call()
-
-            return {
-                "address": pool_address.lower(),
-                "dex": "uniswap_v3",
-                "token0": token0.lower(),
-                "token1": token1.lower(),
-                "liquidity": liquidity,
-                "created_at_block": None,  # Not available from pool directly
-            }
+        return {
+            "address": pool_address.lower(),
+            "dex": self.DEX,
+            "token0": token0.lower(),
+            "token1": token1.lower(),
+            "liquidity": liquidity,
+            "sqrt_price_x96": sqrt_price_x96,
+            "tick": tick,
+            "tick_spacing": tick_spacing,
+            "created_at_block": None,  # Not available from pool directly
+        }
+
+    async def get_pool_info(self, pool_address: str) -> Optional[Dict[str, Any]]:
+        """Fetch token0, token1, current liquidity and price from the pool contract."""
+        try:
+            raws = await self.multicall.call(self.pool_info_calls(pool_address))
         except Exception as e:
             logger.error(f"Error fetching Uniswap V3 pool info for {pool_address}: {e}")
             return None
+        return self.parse_pool_info(pool_address, raws)
 
-    def get_liquidity_data(self, pool_address: str) -> Dict[str, Any]:
+    async def get_liquidity_data(self, pool_address: str) -> Dict[str, Any]:
         """Get current liquidity for a pool in raw units."""
         try:
             pool_cs = Web3.to_checksum_address(pool_address)
             pool = self.w3.eth.contract(address=pool_cs, abi=UNISWAP_V3_POOL_ABI)
-            liquidity = pool.functions.liquidity().call()
+            liquidity = await pool.functions.liquidity().call()
             return {"raw_liquidity": liquidity}
         except Exception as e:
             logger.error(f"Error fetching liquidity for {pool_address}: {e}")
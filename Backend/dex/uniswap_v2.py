@@ -0,0 +1,104 @@
+import logging
+from typing import Dict, Any, Optional, List, Tuple
+from web3 import AsyncWeb3
+
+from utils.multicall import Multicall
+from utils.rpc_batch import BatchRPC
+
+logger = logging.getLogger(__name__)
+
+# Minimal Uniswap V2 pair ABI
+UNISWAP_V2_PAIR_ABI = [
+    {
+        "inputs": [],
+        "name": "getReserves",
+        "outputs": [
+            {"internalType": "uint112", "name": "reserve0", "type": "uint112"},
+            {"internalType": "uint112", "name": "reserve1", "type": "uint112"},
+            {"internalType": "uint32", "name": "blockTimestampLast", "type": "uint32"},
+        ],
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "inputs": [],
+        "name": "token0",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "inputs": [],
+        "name": "token1",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "inputs": [],
+        "name": "totalSupply",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+]
+
+# Pair reads behind get_pool_info, in call order
+POOL_INFO_FIELDS = [
+    ("token0", "address"),
+    ("token1", "address"),
+    ("getReserves", "(uint112,uint112,uint32)"),
+    ("totalSupply", "uint256"),
+]
+
+
+class UniswapV2Tracker:
+    """
+    Reads Uniswap V2 pair state. V2 pairs are only known through the pool
+    registry (PairCreated events), so there are no factory lookups.
+    """
+
+    DEX = "uniswap_v2"
+
+    def __init__(self, w3: AsyncWeb3, chain: str, multicall: Optional[Multicall] = None):
+        self.w3 = w3
+        self.chain = chain
+        self.rpc = BatchRPC(w3)
+        self.multicall = multicall or Multicall(w3, self.rpc)
+        self._pool = self.w3.eth.contract(abi=UNISWAP_V2_PAIR_ABI)
+
+    def pool_lookups(self, token_address: str) -> List[Tuple[Dict[str, Any], Tuple[str, str]]]:
+        return []
+
+    def pool_info_calls(self, pool_address: str) -> List[Tuple[str, str]]:
+        return [(pool_address, self._pool.encodeABI(fn_name=fn)) for fn, _ in POOL_INFO_FIELDS]
+
+    def parse_pool_info(self, pool_address: str, raws: List[Optional[bytes]]) -> Optional[Dict[str, Any]]:
+        try:
+            token0, token1, (reserve0, reserve1, _), total_supply = [
+                self.w3.codec.decode([abi_type], data)[0]
+                for (_, abi_type), data in zip(POOL_INFO_FIELDS, raws)
+            ]
+        except Exception as e:
+            logger.error(f"Error decoding Uniswap V2 pair info for {pool_address}: {e}")
+            return None
+
+        return {
+            "address": pool_address.lower(),
+            "dex": self.DEX,
+            "token0": token0.lower(),
+            "token1": token1.lower(),
+            "reserve0": reserve0,
+            "reserve1": reserve1,
+            "total_supply": total_supply,
+            "created_at_block": None,
+        }
+
+    async def get_pool_info(self, pool_address: str) -> Optional[Dict[str, Any]]:
+        """Fetch reserves, token addresses and supply from the pair contract."""
+        try:
+            raws = await self.multicall.call(self.pool_info_calls(pool_address))
+        except Exception as e:
+            logger.error(f"Error fetching Uniswap V2 pair info for {pool_address}: {e}")
+            return None
+        return self.parse_pool_info(pool_address, raws)
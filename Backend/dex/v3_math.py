@@ -0,0 +1,123 @@
+"""
+Exact Uniswap V3 price and liquidity math.
+
+Ports of the core TickMath and LiquidityAmounts library functions on
+Python ints, so results match the contracts to the wei.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+Q96 = 1 << 96
+Q128 = 1 << 128
+Q192 = 1 << 192
+MAX_UINT256 = (1 << 256) - 1
+
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+# Tick spacing of each standard fee tier
+FEE_TICK_SPACING = {100: 1, 500: 10, 3000: 60, 10000: 200}
+
+# sqrt(1.0001)^-(2^i) as Q128.128, for each bit i of |tick| above the first
+_TICK_FACTORS = (
+    (0x2, 0xfff97272373d413259a46990580e213a),
+    (0x4, 0xfff2e50f5f656932ef12357cf3c7fdcc),
+    (0x8, 0xffe5caca7e10e4e61c3624eaa0941cd0),
+    (0x10, 0xffcb9843d60f6159c9db58835c926644),
+    (0x20, 0xff973b41fa98c081472e6896dfb254c0),
+    (0x40, 0xff2ea16466c96a3843ec78b326b52861),
+    (0x80, 0xfe5dee046a99a2a811c461f1969c3053),
+    (0x100, 0xfcbe86c7900a88aedcffc83b479aa3a4),
+    (0x200, 0xf987a7253ac413176f2b074cf7815e54),
+    (0x400, 0xf3392b0822b70005940c7a398e4b70f3),
+    (0x800, 0xe7159475a2c29b7443b29c7fa6e889d9),
+    (0x1000, 0xd097f3bdfd2022b8845ad8f792aa5825),
+    (0x2000, 0xa9f746462d870fdf8a65dc1f90e061e5),
+    (0x4000, 0x70d869a156d2a1b890bb3df62baf32f7),
+    (0x8000, 0x31be135f97d08fd981231505542fcfa6),
+    (0x10000, 0x9aa508b5b7a84e1c677de54f3e99bc9),
+    (0x20000, 0x5d6af8dedb81196699c329225ee604),
+    (0x40000, 0x2216e584f5fa1ea926041bedfe98),
+    (0x80000, 0x48a170391f7dc42444e8fa2),
+)
+
+
+@lru_cache(maxsize=65536)
+def sqrt_ratio_at_tick(tick: int) -> int:
+    """sqrt(1.0001^tick) as a Q64.96, exactly as TickMath.getSqrtRatioAtTick."""
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError(f"tick {tick} out of range")
+
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 0x1 else Q128
+    for bit, factor in _TICK_FACTORS:
+        if abs_tick & bit:
+            ratio = (ratio * factor) >> 128
+    if tick > 0:
+        ratio = MAX_UINT256 // ratio
+    # Q128.128 to Q64.96, rounding up
+    return (ratio >> 32) + (1 if ratio & 0xffffffff else 0)
+
+
+def amount0_for_liquidity(sqrt_a: int, sqrt_b: int, liquidity: int) -> int:
+    """token0 held by `liquidity` between two sqrt prices (LiquidityAmounts.getAmount0ForLiquidity)."""
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    if sqrt_a == 0:
+        return 0
+    return ((liquidity << 96) * (sqrt_b - sqrt_a) // sqrt_b) // sqrt_a
+
+
+def amount1_for_liquidity(sqrt_a: int, sqrt_b: int, liquidity: int) -> int:
+    """token1 held by `liquidity` between two sqrt prices (LiquidityAmounts.getAmount1ForLiquidity)."""
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    return liquidity * (sqrt_b - sqrt_a) // Q96
+
+
+def amounts_for_liquidity(sqrt_price: int, sqrt_a: int, sqrt_b: int, liquidity: int) -> Tuple[int, int]:
+    """(amount0, amount1) of a position at the current price (LiquidityAmounts.getAmountsForLiquidity)."""
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    if sqrt_price <= sqrt_a:
+        return amount0_for_liquidity(sqrt_a, sqrt_b, liquidity), 0
+    if sqrt_price < sqrt_b:
+        return (
+            amount0_for_liquidity(sqrt_price, sqrt_b, liquidity),
+            amount1_for_liquidity(sqrt_a, sqrt_price, liquidity),
+        )
+    return 0, amount1_for_liquidity(sqrt_a, sqrt_b, liquidity)
+
+
+def active_range(tick: int, tick_spacing: int) -> Tuple[int, int]:
+    """Bounds of the initializable tick range the current tick sits in."""
+    lower = tick // tick_spacing * tick_spacing
+    return lower, lower + tick_spacing
+
+
+def in_range_amounts(sqrt_price: int, tick: int, liquidity: int, tick_spacing: int) -> Tuple[int, int]:
+    """Tokens backing the pool's in-range liquidity across the active tick range."""
+    lower, upper = active_range(tick, tick_spacing)
+    return amounts_for_liquidity(
+        sqrt_price,
+        sqrt_ratio_at_tick(max(lower, MIN_TICK)),
+        sqrt_ratio_at_tick(min(upper, MAX_TICK)),
+        liquidity,
+    )
+
+
+def token0_in_token1(amount0: int, sqrt_price: int) -> int:
+    """A raw token0 amount in raw token1 at the pool price (amount0 * P, floored)."""
+    return amount0 * sqrt_price * sqrt_price // Q192
+
+
+def token1_in_token0(amount1: int, sqrt_price: int) -> int:
+    """A raw token1 amount in raw token0 at the pool price (amount1 / P, floored)."""
+    return amount1 * Q192 // (sqrt_price * sqrt_price)
+
+
+def tick_spacing_of(pool: Dict[str, Any]) -> Optional[int]:
+    """A pool's tick spacing, from the pool itself or its fee tier."""
+    return pool.get("tick_spacing") or FEE_TICK_SPACING.get(pool.get("fee_tier"))
@@ -0,0 +1,54 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from dex.price_oracle import Price
+
+logger = logging.getLogger(__name__)
+
+# DEXes whose pools hold plain reserve0/reserve1
+RESERVE_DEXES = ("aerodrome", "uniswap_v2")
+
+
+def estimate_liquidity_usd(pool_data: Dict[str, Any], prices: Dict[str, Price]) -> float:
+    """USD estimate of one pool (see value_pools)."""
+    return value_pools([pool_data], prices)[0]
+
+
+def value_pools(pools: Sequence[Dict[str, Any]], prices: Dict[str, Price]) -> List[float]:
+    """
+    USD estimates of many pools from quote-asset prices (PriceOracle).
+    Works on pool reads (PoolDetector) and on event-tracked pool state
+    (ReserveTracker).
+
+    Reserve pools are worth their reserves and Uniswap V3 pools the token
+    balances they hold (`balance0`/`balance1`, see PoolDetector.read_balances);
+    V3 pools without balances come out as 0. When only one side has a USD
+    price, the pool is counted as twice that side: the unpriced token is
+    never valued at the pool's own price, which whoever creates the pool
+    gets to pick.
+    """
+    values = [0.0] * len(pools)
+    for i, pool in enumerate(pools):
+        try:
+            if pool["dex"] in RESERVE_DEXES:
+                values[i] = _value(pool, pool.get("reserve0", 0), pool.get("reserve1", 0), prices)
+            elif pool["dex"] == "uniswap_v3" and "balance0" in pool:
+                values[i] = _value(pool, pool["balance0"], pool["balance1"], prices)
+        except Exception as e:
+            logger.debug(f"Could not estimate liquidity USD of {pool.get('address')}: {e}")
+    return values
+
+
+def _value(pool: Dict[str, Any], amount0: int, amount1: int, prices: Dict[str, Price]) -> float:
+    price0, price1 = _prices(pool, prices)
+    if price0 and price1:
+        return price0.value(amount0) + price1.value(amount1)
+    if price1:
+        return price1.value(amount1) * 2
+    if price0:
+        return price0.value(amount0) * 2
+    return 0.0
+
+
+def _prices(pool: Dict[str, Any], prices: Dict[str, Price]) -> Tuple[Optional[Price], Optional[Price]]:
+    return prices.get(pool.get("token0", "").lower()), prices.get(pool.get("token1", "").lower())
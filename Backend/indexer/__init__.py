@@ -1,5 +1,6 @@
+from indexer.chain_listener import ChainListener
 from indexer.base_listener import BaseListener
 from indexer.ethereum_listener import EthereumListener
 from indexer.block_processor import BlockProcessor
 
-__all__ = ["BaseListener", "EthereumListener", "BlockProcessor"]
\ No newline at end of file
+__all__ = ["ChainListener", "BaseListener", "EthereumListener", "BlockProcessor"]
@@ -0,0 +1,589 @@
+"""
+Columnar on-disk archive of fetched chain data, for replay and re-scoring.
+
+With ARCHIVE_DIR set, the listeners and backfill write every block,
+transaction, receipt and log they fetch, plus the creations seen in
+traces and deployed bytecode, as Arrow IPC files:
+
+    {ARCHIVE_DIR}/{chain}/{table}/{first_block:012d}-{last_block:012d}.arrow
+
+A partition is written once its block range is below the reorg window (or
+at shutdown), and blocks already on disk are never written again.
+
+`ArchivingRPC` tees node responses into a `BlockArchive`; `ArchiveRPC`
+serves the same calls from the archive through memory-mapped files, so
+`python -m indexer.replay` can run the block pipeline without a node.
+"""
+import bisect
+import json
+import logging
+import math
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from hexbytes import HexBytes
+from web3 import AsyncWeb3, Web3
+from web3.datastructures import AttributeDict
+
+from config.settings import settings
+from utils.rpc_batch import BatchRPC, RPCMethodUnsupportedError
+
+logger = logging.getLogger(__name__)
+
+SCHEMAS = {
+    "blocks": pa.schema([
+        ("number", pa.uint64()),
+        ("hash", pa.binary(32)),
+        ("parent_hash", pa.binary(32)),
+        ("timestamp", pa.uint64()),
+    ]),
+    "transactions": pa.schema([
+        ("block_number", pa.uint64()),
+        ("transaction_index", pa.uint32()),
+        ("hash", pa.binary(32)),
+        ("from_address", pa.binary(20)),
+        ("to_address", pa.binary(20)),
+    ]),
+    "receipts": pa.schema([
+        ("block_number", pa.uint64()),
+        ("transaction_index", pa.uint32()),
+        ("transaction_hash", pa.binary(32)),
+        ("status", pa.uint8()),
+        ("contract_address", pa.binary(20)),
+    ]),
+    "logs": pa.schema([
+        ("block_number", pa.uint64()),
+        ("transaction_index", pa.uint32()),
+        ("log_index", pa.uint32()),
+        ("transaction_hash", pa.binary(32)),
+        ("address", pa.binary(20)),
+        ("topic0", pa.binary(32)),
+        ("topic1", pa.binary(32)),
+        ("topic2", pa.binary(32)),
+        ("topic3", pa.binary(32)),
+        ("data", pa.binary()),
+    ]),
+    # Creation frames of debug_traceBlockByNumber / trace_block, as JSON
+    "traces": pa.schema([
+        ("block_number", pa.uint64()),
+        ("method", pa.string()),
+        ("traces", pa.string()),
+    ]),
+    "code": pa.schema([
+        ("address", pa.binary(20)),
+        ("code", pa.binary()),
+    ]),
+}
+
+BLOCK_TABLES = ("blocks", "transactions", "receipts", "logs", "traces")
+
+_FILE_RE = re.compile(r"^(\d+)-(\d+)\.arrow$")
+
+# Partitions kept open (memory-mapped) by a reader
+OPEN_PARTITIONS = 8
+
+
+class BlockArchive:
+    """Writer and reader for one chain's archive directory."""
+
+    def __init__(self, root: str, chain: str, partition_blocks: Optional[int] = None):
+        self.root = os.path.join(root, chain)
+        self.chain = chain
+        self.partition_blocks = max(1, partition_blocks or settings.ARCHIVE_PARTITION_BLOCKS)
+        # partition -> block number -> buffered rows
+        self._pending: Dict[int, Dict[int, Dict[str, Any]]] = {}
+        self._pending_code: Dict[bytes, bytes] = {}
+        self._ranges: Optional[List[Tuple[int, int, str]]] = None
+        self._open: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._code: Optional[Dict[bytes, bytes]] = None
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def record_block(self, block: Dict[str, Any]):
+        number = block["number"]
+        if self._archived(number):
+            return
+        block_hash = bytes(block["hash"])
+        entry = self._entry(number)
+        if entry["hash"] not in (None, block_hash):
+            # Re-fetched after a reorg: forget what was recorded for the orphan
+            entry = self._pending[number // self.partition_blocks][number] = _empty_entry()
+        entry["hash"] = block_hash
+        entry["block"] = {
+            "number": number,
+            "hash": block_hash,
+            "parent_hash": bytes(block["parentHash"]),
+            "timestamp": block.get("timestamp", 0),
+        }
+        entry["transactions"] = [
+            {
+                "block_number": number,
+                "transaction_index": i,
+                "hash": bytes(tx["hash"]),
+                "from_address": _address_bytes(tx.get("from")),
+                "to_address": _address_bytes(tx.get("to")),
+            }
+            for i, tx in enumerate(block.get("transactions", []))
+            if not isinstance(tx, (bytes, str))  # hashes only without full transactions
+        ]
+
+    def record_receipts(self, receipts: Iterable[Dict[str, Any]]):
+        for receipt in receipts:
+            number = receipt["blockNumber"]
+            if self._archived(number):
+                continue
+            tx_hash = bytes(receipt["transactionHash"])
+            self._entry(number)["receipts"][tx_hash] = {
+                "block_number": number,
+                "transaction_index": receipt.get("transactionIndex", 0),
+                "transaction_hash": tx_hash,
+                "status": receipt.get("status"),
+                "contract_address": _address_bytes(receipt.get("contractAddress")),
+            }
+            self.record_logs(receipt.get("logs") or [])
+
+    def record_logs(self, logs: Iterable[Dict[str, Any]]):
+        for log in logs:
+            number = log["blockNumber"]
+            if log.get("removed") or self._archived(number):
+                continue
+            topics = [bytes(topic) for topic in log.get("topics") or []]
+            topics += [None] * (4 - len(topics))
+            self._entry(number)["logs"][log["logIndex"]] = {
+                "block_number": number,
+                "transaction_index": log.get("transactionIndex", 0),
+                "log_index": log["logIndex"],
+                "transaction_hash": bytes(log["transactionHash"]),
+                "address": _address_bytes(log["address"]),
+                "topic0": topics[0],
+                "topic1": topics[1],
+                "topic2": topics[2],
+                "topic3": topics[3],
+                "data": bytes(log.get("data") or b""),
+            }
+
+    def record_traces(self, block_number: int, method: str, traces: List[Dict[str, Any]]):
+        if not self._archived(block_number):
+            self._entry(block_number)["traces"] = {
+                "block_number": block_number,
+                "method": method,
+                "traces": json.dumps(traces, default=_json_default),
+            }
+
+    def record_code(self, address: str, code: bytes):
+        if code:
+            self._pending_code[_address_bytes(address)] = bytes(code)
+
+    def flush(self, through: Optional[int] = None):
+        """
+        Write every partition that ends at or below `through` (all buffered
+        blocks if None, e.g. at shutdown).
+        """
+        for partition in sorted(self._pending):
+            if through is not None and (partition + 1) * self.partition_blocks - 1 > through:
+                continue
+            blocks = self._pending.pop(partition)
+            numbers = sorted(blocks)
+            try:
+                self._write(numbers[0], numbers[-1], [blocks[n] for n in numbers])
+            except Exception as e:
+                logger.error(f"Failed to archive {self.chain} blocks {numbers[0]}-{numbers[-1]}: {e}")
+                self._pending[partition] = blocks
+
+    def close(self, through: int):
+        """
+        Shutdown flush: write every buffered block up to `through`, partly
+        filled partitions included, and drop the rest. Those are still in
+        reorg reach, and an archived block is never rewritten.
+        """
+        dropped = 0
+        for partition in list(self._pending):
+            blocks = self._pending[partition]
+            for number in [n for n in blocks if n > through]:
+                del blocks[number]
+                dropped += 1
+            if not blocks:
+                del self._pending[partition]
+        if dropped:
+            logger.info(f"Not archiving {dropped} {self.chain} blocks above {through}, still within reorg depth")
+        self.flush()
+
+    def _write(self, first: int, last: int, entries: List[Dict[str, Any]]):
+        # Only blocks that were actually fetched make it to disk
+        entries = [entry for entry in entries if entry["block"] is not None]
+        if not entries:
+            return
+
+        rows: Dict[str, List[Dict[str, Any]]] = {table: [] for table in BLOCK_TABLES}
+        for entry in entries:
+            rows["blocks"].append(entry["block"])
+            rows["transactions"].extend(entry["transactions"])
+            rows["receipts"].extend(sorted(entry["receipts"].values(), key=lambda r: r["transaction_index"]))
+            rows["logs"].extend(entry["logs"][i] for i in sorted(entry["logs"]))
+            if entry["traces"] is not None:
+                rows["traces"].append(entry["traces"])
+
+        name = f"{first:012d}-{last:012d}.arrow"
+        # The blocks table goes last: its files are what mark a range as archived
+        for table in ("transactions", "receipts", "logs", "traces", "blocks"):
+            _write_table(os.path.join(self.root, table, name), pa.Table.from_pylist(rows[table], SCHEMAS[table]))
+        if self._pending_code:
+            code = [{"address": a, "code": c} for a, c in self._pending_code.items()]
+            _write_table(os.path.join(self.root, "code", name), pa.Table.from_pylist(code, SCHEMAS["code"]))
+            self._pending_code = {}
+
+        self.ranges().append((first, last, name))
+        self._ranges.sort()
+        logger.debug(f"Archived {self.chain} blocks {first}-{last} ({len(rows['logs'])} logs)")
+
+    def _entry(self, number: int) -> Dict[str, Any]:
+        blocks = self._pending.setdefault(number // self.partition_blocks, {})
+        entry = blocks.get(number)
+        if entry is None:
+            entry = blocks[number] = _empty_entry()
+        return entry
+
+    def _archived(self, number: int) -> bool:
+        return self._locate(number) is not None
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def ranges(self) -> List[Tuple[int, int, str]]:
+        """(first, last, file name) of every archived block range, in block order."""
+        if self._ranges is None:
+            self._ranges = []
+            directory = os.path.join(self.root, "blocks")
+            for name in os.listdir(directory) if os.path.isdir(directory) else []:
+                match = _FILE_RE.match(name)
+                if match:
+                    self._ranges.append((int(match.group(1)), int(match.group(2)), name))
+            self._ranges.sort()
+        return self._ranges
+
+    def block(self, number: int) -> Optional[Dict[str, Any]]:
+        """A block with its transactions, shaped like eth_getBlockByNumber(full=True)."""
+        partition = self._partition(number)
+        if partition is None or number not in partition["blocks"]:
+            return None
+        row = partition["blocks"][number]
+        return AttributeDict({
+            "number": number,
+            "hash": HexBytes(row["hash"]),
+            "parentHash": HexBytes(row["parent_hash"]),
+            "timestamp": row["timestamp"],
+            "transactions": [
+                AttributeDict({
+                    "blockNumber": number,
+                    "transactionIndex": tx["transaction_index"],
+                    "hash": HexBytes(tx["hash"]),
+                    "from": _checksum(tx["from_address"]),
+                    "to": _checksum(tx["to_address"]),
+                })
+                for tx in _rows(partition["transactions"], number)
+            ],
+        })
+
+    def receipts(self, number: int) -> Optional[List[Dict[str, Any]]]:
+        """The block's archived receipts with their logs (None if the block isn't archived)."""
+        partition = self._partition(number)
+        if partition is None or number not in partition["blocks"]:
+            return None
+        logs_by_tx: Dict[bytes, List[Dict[str, Any]]] = {}
+        for log in self.logs_of(number):
+            logs_by_tx.setdefault(bytes(log["transactionHash"]), []).append(log)
+        return [
+            AttributeDict({
+                "blockNumber": number,
+                "transactionIndex": row["transaction_index"],
+                "transactionHash": HexBytes(row["transaction_hash"]),
+                "status": row["status"],
+                "contractAddress": _checksum(row["contract_address"]),
+                "logs": logs_by_tx.get(row["transaction_hash"], []),
+            })
+            for row in _rows(partition["receipts"], number)
+        ]
+
+    def logs_of(self, number: int) -> List[Dict[str, Any]]:
+        partition = self._partition(number)
+        if partition is None:
+            return []
+        return [_log(row) for row in _rows(partition["logs"], number)]
+
+    def traces(self, number: int) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        partition = self._partition(number)
+        rows = _rows(partition["traces"], number) if partition is not None else []
+        if not rows:
+            return None
+        return rows[0]["method"], json.loads(rows[0]["traces"])
+
+    def logs(self, start_block: int, end_block: int, topics: Optional[Sequence[str]] = None,
+             addresses: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Archived logs in a block range, filtered by topic0 and emitter like eth_getLogs."""
+        topic_filter = pa.array([bytes.fromhex(t[2:]) for t in topics], pa.binary(32)) if topics else None
+        address_filter = pa.array([_address_bytes(a) for a in addresses], pa.binary(20)) if addresses else None
+
+        found = []
+        for first, last, name in self.ranges():
+            if last < start_block or first > end_block:
+                continue
+            table = self._load(name)["logs"].table
+            mask = pc.and_(
+                pc.greater_equal(table["block_number"], start_block),
+                pc.less_equal(table["block_number"], end_block),
+            )
+            if topic_filter is not None:
+                mask = pc.and_(mask, pc.is_in(table["topic0"], value_set=topic_filter))
+            if address_filter is not None:
+                mask = pc.and_(mask, pc.is_in(table["address"], value_set=address_filter))
+            found.extend(_log(row) for row in table.filter(mask).to_pylist())
+        return found
+
+    def code(self, address: str) -> Optional[bytes]:
+        if self._code is None:
+            self._code = {}
+            directory = os.path.join(self.root, "code")
+            for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+                table = _read_table(os.path.join(directory, name))
+                self._code.update(zip(table["address"].to_pylist(), table["code"].to_pylist()))
+        return self._code.get(_address_bytes(address))
+
+    def _locate(self, number: int) -> Optional[str]:
+        ranges = self.ranges()
+        i = bisect.bisect_right(ranges, (number, math.inf)) - 1
+        if i >= 0 and ranges[i][1] >= number:
+            return ranges[i][2]
+        return None
+
+    def _partition(self, number: int) -> Optional[Dict[str, Any]]:
+        name = self._locate(number)
+        return self._load(name) if name is not None else None
+
+    def _load(self, name: str) -> Dict[str, Any]:
+        """Memory-map a partition's tables and index its rows by block number."""
+        partition = self._open.get(name)
+        if partition is not None:
+            self._open.move_to_end(name)
+            return partition
+
+        partition = {table: _read_table(os.path.join(self.root, table, name)) for table in BLOCK_TABLES}
+        partition["blocks"] = {row["number"]: row for row in partition["blocks"].to_pylist()}
+        for table in ("transactions", "receipts", "logs", "traces"):
+            partition[table] = _BlockIndex(partition[table])
+
+        self._open[name] = partition
+        while len(self._open) > OPEN_PARTITIONS:
+            self._open.popitem(last=False)
+        return partition
+
+
+class _BlockIndex:
+    """A table sorted by block_number with the row span of every block."""
+
+    def __init__(self, table: pa.Table):
+        self.table = table
+        self.spans: Dict[int, Tuple[int, int]] = {}
+        for i, number in enumerate(table["block_number"].to_pylist()):
+            start, _ = self.spans.get(number, (i, i))
+            self.spans[number] = (start, i + 1)
+
+
+def _rows(index: _BlockIndex, number: int) -> List[Dict[str, Any]]:
+    span = index.spans.get(number)
+    if span is None:
+        return []
+    return index.table.slice(span[0], span[1] - span[0]).to_pylist()
+
+
+class ArchivingRPC(BatchRPC):
+    """BatchRPC that also records everything the block pipeline fetches into an archive."""
+
+    def __init__(self, w3: AsyncWeb3, archive: BlockArchive):
+        super().__init__(w3)
+        self.archive = archive
+
+    async def get_blocks(self, block_numbers: Sequence[int], full_transactions: bool = True) -> List[Optional[Dict[str, Any]]]:
+        blocks = await super().get_blocks(block_numbers, full_transactions)
+        if full_transactions:
+            for block in blocks:
+                if block is not None:
+                    self.archive.record_block(block)
+        return blocks
+
+    async def get_transaction_receipts(self, tx_hashes: Sequence[Any]) -> List[Optional[Dict[str, Any]]]:
+        receipts = await super().get_transaction_receipts(tx_hashes)
+        self.archive.record_receipts(r for r in receipts if r)
+        return receipts
+
+    async def get_block_receipts(self, block_number: int) -> Optional[List[Dict[str, Any]]]:
+        receipts = await super().get_block_receipts(block_number)
+        if receipts:
+            self.archive.record_receipts(receipts)
+        return receipts
+
+    async def debug_trace_block(self, block_number: int, tracer: str = "callTracer") -> Optional[List[Dict[str, Any]]]:
+        traces = await super().debug_trace_block(block_number, tracer)
+        if traces is not None and tracer == "callTracer":
+            self.archive.record_traces(block_number, "debug", [_prune_call_trace(t) for t in traces])
+        return traces
+
+    async def trace_block(self, block_number: int) -> Optional[List[Dict[str, Any]]]:
+        traces = await super().trace_block(block_number)
+        if traces is not None:
+            self.archive.record_traces(block_number, "parity", [_prune_parity_trace(t) for t in traces
+                                                               if t.get("type") == "create" or t.get("error")])
+        return traces
+
+    async def get_logs(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        logs = await super().get_logs(params)
+        self.archive.record_logs(logs)
+        return logs
+
+    async def get_code(self, addresses: Sequence[str], block: str = "latest") -> List[Optional[bytes]]:
+        codes = await super().get_code(addresses, block)
+        if block == "latest":
+            for address, code in zip(addresses, codes):
+                if code:
+                    self.archive.record_code(address, code)
+        return codes
+
+
+class ArchiveRPC:
+    """
+    Serves the BatchRPC calls of the block pipeline from an archive. Calls
+    the archive can't answer (history it never saw, state reads) behave like
+    a node that lacks the data: None results or RPCMethodUnsupportedError.
+    """
+
+    def __init__(self, archive: BlockArchive):
+        self.archive = archive
+
+    async def get_blocks(self, block_numbers: Sequence[int], full_transactions: bool = True) -> List[Optional[Dict[str, Any]]]:
+        return [self.archive.block(n) for n in block_numbers]
+
+    async def get_transaction_receipts(self, tx_hashes: Sequence[Any]) -> List[Optional[Dict[str, Any]]]:
+        # The block processor asks for whole blocks first; single lookups have nothing more to offer
+        return [None] * len(tx_hashes)
+
+    async def get_block_receipts(self, block_number: int) -> Optional[List[Dict[str, Any]]]:
+        return self.archive.receipts(block_number)
+
+    async def debug_trace_block(self, block_number: int, tracer: str = "callTracer") -> Optional[List[Dict[str, Any]]]:
+        return self._traces(block_number, "debug")
+
+    async def trace_block(self, block_number: int) -> Optional[List[Dict[str, Any]]]:
+        return self._traces(block_number, "parity")
+
+    def _traces(self, block_number: int, method: str) -> Optional[List[Dict[str, Any]]]:
+        archived = self.archive.traces(block_number)
+        if archived is None:
+            return []
+        if archived[0] != method:
+            raise RPCMethodUnsupportedError(f"archive holds {archived[0]} traces, not {method}")
+        return archived[1]
+
+    async def get_logs(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        address = params.get("address")
+        return self.archive.logs(
+            params["fromBlock"],
+            params["toBlock"],
+            topics=(params.get("topics") or [None])[0],
+            addresses=[address] if isinstance(address, str) else address,
+        )
+
+    async def get_code(self, addresses: Sequence[str], block: str = "latest") -> List[Optional[bytes]]:
+        if block != "latest":
+            return [None] * len(addresses)
+        return [_hexbytes(self.archive.code(address)) for address in addresses]
+
+    async def get_storage_at(self, slots: Sequence[Tuple[str, int]], block: str = "latest") -> List[Optional[bytes]]:
+        return [None] * len(slots)
+
+    async def eth_call(self, calls: Sequence[Tuple[str, str]], block: str = "latest") -> List[Optional[bytes]]:
+        return [None] * len(calls)
+
+
+def _prune_call_trace(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the frames of a callTracer result that lead to a CREATE/CREATE2."""
+    frame = item.get("result") or {}
+    return {
+        "txHash": item.get("txHash"),
+        "result": {"error": frame.get("error"), "calls": _creation_frames(frame.get("calls") or [])},
+    }
+
+
+def _creation_frames(frames: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    kept = []
+    for frame in frames:
+        children = _creation_frames(frame.get("calls") or [])
+        if children or frame.get("type") in ("CREATE", "CREATE2"):
+            kept.append({"type": frame.get("type"), "to": frame.get("to"),
+                         "error": frame.get("error"), "calls": children})
+    return kept
+
+
+def _prune_parity_trace(trace: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": trace.get("type"),
+        "error": trace.get("error"),
+        "traceAddress": trace.get("traceAddress"),
+        "transactionHash": trace.get("transactionHash"),
+        "result": {"address": (trace.get("result") or {}).get("address")},
+    }
+
+
+def _empty_entry() -> Dict[str, Any]:
+    return {"hash": None, "block": None, "transactions": [], "receipts": {}, "logs": {}, "traces": None}
+
+
+def _log(row: Dict[str, Any]) -> Dict[str, Any]:
+    return AttributeDict({
+        "blockNumber": row["block_number"],
+        "transactionIndex": row["transaction_index"],
+        "logIndex": row["log_index"],
+        "transactionHash": HexBytes(row["transaction_hash"]),
+        "address": _checksum(row["address"]),
+        "topics": [HexBytes(row[f"topic{i}"]) for i in range(4) if row[f"topic{i}"] is not None],
+        "data": HexBytes(row["data"]),
+        "removed": False,
+    })
+
+
+def _write_table(path: str, table: pa.Table):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _read_table(path: str) -> pa.Table:
+    # Zero-copy: columns point straight into the mapped file
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def _address_bytes(address: Optional[str]) -> Optional[bytes]:
+    if not address:
+        return None
+    return bytes.fromhex(address[2:]) if isinstance(address, str) else bytes(address)
+
+
+def _checksum(address: Optional[bytes]) -> Optional[str]:
+    return Web3.to_checksum_address(address) if address else None
+
+
+def _hexbytes(value: Optional[bytes]) -> Optional[HexBytes]:
+    return HexBytes(value) if value is not None else None
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return "0x" + bytes(value).hex()
+    if isinstance(value, AttributeDict):
+        return dict(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
@@ -0,0 +1,270 @@
+"""
+Sentinel Ledger — Parallel Historical Backfill
+
+Usage:
+    python -m indexer.backfill --chain base --from-block 0 [--to-block N]
+                               [--workers 4] [--shard-size 50000] [--no-analysis]
+
+Splits [from, to] into fixed-size shards and indexes them across a process
+pool; every worker opens its own RPC connections and DB pool. Each shard
+commits its progress to `backfill_shards` in the same transaction as the
+tokens it found, so re-running the same command after a crash resumes every
+unfinished shard where it stopped.
+
+Each shard also ingests the PoolCreated/PairCreated logs of its range
+before committing progress, so historical pools land in `dex_pools` just as
+live ones do. Pool liquidity is not rebuilt from history: shards finish out
+of order, so the live listener's reserve tracker owns it.
+
+`--to-block` defaults to the live listener's checkpoint (or the current head
+if the chain has never been indexed). When every shard is done the chain's
+live checkpoint is raised to `to` (never lowered), so the live listener
+continues from its high-water mark.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
+
+from config.settings import settings
+from config.chains import CHAINS, ChainConfig
+from dex.pool_registry import POOL_EVENTS, PoolRegistry
+from db.session import SessionLocal
+from db.models import BackfillShard, ProcessedBlock
+from indexer.archive import ArchivingRPC, BlockArchive
+from indexer.block_fetcher import BlockFetcher
+from indexer.block_processor import BlockProcessor
+from indexer.checkpoint import ShardCheckpoint
+from indexer.log_ingestor import LogIngestor
+from utils.rpc_batch import BatchRPC
+from utils.web3_client import close_shared_session, get_async_web3
+
+logger = logging.getLogger("indexer.backfill")
+
+
+def _setup_logging() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(processName)s %(name)s: %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Shard bookkeeping
+# ---------------------------------------------------------------------------
+def plan_shards(chain: str, from_block: int, to_block: int, shard_size: int) -> List[str]:
+    """Create (or reuse) the shard rows covering [from_block, to_block]."""
+    db = SessionLocal()
+    try:
+        shard_ids = []
+        for start in range(from_block, to_block + 1, shard_size):
+            end = min(to_block, start + shard_size - 1)
+            shard_id = f"{chain}:{start}-{end}"
+            if db.get(BackfillShard, shard_id) is None:
+                db.add(BackfillShard(
+                    id=shard_id,
+                    chain=chain,
+                    start_block=start,
+                    end_block=end,
+                    last_block=start - 1,
+                    status="pending",
+                ))
+            shard_ids.append(shard_id)
+        db.commit()
+        return shard_ids
+    finally:
+        db.close()
+
+
+def _set_status(shard_id: str, status: str) -> None:
+    db = SessionLocal()
+    try:
+        db.query(BackfillShard).filter(BackfillShard.id == shard_id).update(
+            {"status": status}, synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to mark shard {shard_id} {status}: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def raise_live_checkpoint(chain: str, block_number: int) -> None:
+    """Move the live listener's checkpoint up to block_number (never down)."""
+    db = SessionLocal()
+    try:
+        stmt = insert(ProcessedBlock).values(
+            chain=chain, block_number=block_number, processed_at=func.now()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProcessedBlock.chain],
+            set_={
+                "block_number": func.greatest(ProcessedBlock.block_number, stmt.excluded.block_number),
+                "processed_at": stmt.excluded.processed_at,
+            },
+        )
+        db.execute(stmt)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _live_checkpoint(chain: str) -> Optional[int]:
+    db = SessionLocal()
+    try:
+        record = db.query(ProcessedBlock).filter(ProcessedBlock.chain == chain).first()
+        return record.block_number if record else None
+    finally:
+        db.close()
+
+
+# ---------------------------------------------------------------------------
+# Worker (runs in a separate process)
+# ---------------------------------------------------------------------------
+async def _ingest_pools(log_ingestor: LogIngestor, registry: PoolRegistry, start_block: int, end_block: int) -> None:
+    """Register and persist the pools created in [start_block, end_block]."""
+    if start_block > end_block:
+        return
+    await log_ingestor.ingest(start_block, end_block)
+    if not registry.flush():
+        raise RuntimeError(f"could not persist pools of blocks {start_block} to {end_block}")
+
+
+async def _backfill_shard(shard_id: str, trigger_analysis: bool) -> None:
+    db = SessionLocal()
+    try:
+        shard = db.get(BackfillShard, shard_id)
+        chain_name, end_block, status = shard.chain, shard.end_block, shard.status
+    finally:
+        db.close()
+
+    if status == "done":
+        return
+
+    chain: ChainConfig = CHAINS[chain_name]
+    w3 = get_async_web3(chain.get_rpc_url(), poa=chain.poa, pool_size=chain.rpc_pool_size)
+    archive = BlockArchive(settings.ARCHIVE_DIR, chain_name) if settings.ARCHIVE_DIR else None
+    rpc = ArchivingRPC(w3, archive) if archive else BatchRPC(w3)
+    fetcher = BlockFetcher(w3, chain_name, concurrency=chain.fetch_concurrency, batch_size=chain.fetch_batch,
+                           rpc=rpc)
+    processor = BlockProcessor(w3, chain_name, rpc=rpc)
+    checkpoint = ShardCheckpoint(shard_id, chain_name, trigger_analysis=trigger_analysis)
+    registry = PoolRegistry(chain_name, chain.dex_factories)
+    log_ingestor = LogIngestor(w3, chain_name, events=POOL_EVENTS, rpc=rpc)
+    log_ingestor.subscribe(registry.on_event)
+
+    start_block = checkpoint.load() + 1
+    # Pools are persisted up to here; progress is never committed past it
+    ingested = start_block - 1
+    _set_status(shard_id, "running")
+    logger.info(f"Shard {shard_id}: blocks {start_block} to {end_block}")
+
+    try:
+        async for block_num, block in fetcher.iter_blocks(start_block, end_block):
+            # Never skip in a backfill: stop here and resume from the checkpoint
+            if block is None:
+                raise RuntimeError(f"could not fetch block {block_num}")
+
+            tokens = await processor.process_block(block_num, block)
+            checkpoint.advance(block_num, block.hash.hex(), tokens)
+            if checkpoint.due():
+                await _ingest_pools(log_ingestor, registry, ingested + 1, block_num)
+                ingested = block_num
+                if not checkpoint.flush():
+                    raise RuntimeError(f"checkpoint failed at block {block_num}")
+            if archive:
+                # History is final, so completed partitions can be written right away
+                archive.flush(through=block_num)
+
+        await _ingest_pools(log_ingestor, registry, ingested + 1, end_block)
+        if not checkpoint.flush():
+            raise RuntimeError("final checkpoint failed")
+    finally:
+        if archive:
+            archive.flush()
+        await close_shared_session()
+
+    _set_status(shard_id, "done")
+
+
+def _run_shard(shard_id: str, trigger_analysis: bool) -> Tuple[str, bool]:
+    """Process-pool entry point: backfill one shard on a fresh event loop."""
+    try:
+        asyncio.run(_backfill_shard(shard_id, trigger_analysis))
+        return shard_id, True
+    except Exception as e:
+        logger.error(f"Shard {shard_id} failed: {e}")
+        _set_status(shard_id, "failed")
+        return shard_id, False
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+async def _resolve_to_block(chain: ChainConfig) -> int:
+    checkpoint = _live_checkpoint(chain.name)
+    if checkpoint is not None:
+        return checkpoint
+    w3 = get_async_web3(chain.get_rpc_url(), poa=chain.poa)
+    try:
+        return await w3.eth.block_number
+    finally:
+        await close_shared_session()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parallel historical backfill")
+    parser.add_argument("--chain", choices=sorted(CHAINS), required=True)
+    parser.add_argument("--from-block", type=int, default=None)
+    parser.add_argument("--to-block", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=settings.BACKFILL_WORKERS)
+    parser.add_argument("--shard-size", type=int, default=settings.BACKFILL_SHARD_SIZE)
+    parser.add_argument("--no-analysis", action="store_true",
+                        help="don't enqueue analysis jobs for backfilled tokens")
+    args = parser.parse_args(argv)
+
+    _setup_logging()
+
+    chain = CHAINS[args.chain]
+    from_block = args.from_block if args.from_block is not None else chain.start_block
+    to_block = args.to_block if args.to_block is not None else asyncio.run(_resolve_to_block(chain))
+
+    if to_block < from_block:
+        logger.info(f"Nothing to backfill on {chain.name} ({from_block} > {to_block})")
+        return 0
+
+    shard_ids = plan_shards(chain.name, from_block, to_block, max(1, args.shard_size))
+    logger.info(
+        f"Backfilling {chain.name} blocks {from_block} to {to_block}: "
+        f"{len(shard_ids)} shards across {args.workers} workers"
+    )
+
+    # spawn, not fork: every worker must build its own DB pool and HTTP session
+    context = multiprocessing.get_context("spawn")
+    failed = []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers), mp_context=context,
+                             initializer=_setup_logging) as pool:
+        futures = [pool.submit(_run_shard, shard_id, not args.no_analysis) for shard_id in shard_ids]
+        for future in as_completed(futures):
+            shard_id, ok = future.result()
+            if not ok:
+                failed.append(shard_id)
+
+    if failed:
+        logger.error(f"{len(failed)} shards failed; re-run the same command to resume: {failed}")
+        return 1
+
+    raise_live_checkpoint(chain.name, to_block)
+    logger.info(f"Backfill of {chain.name} complete up to block {to_block}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+from web3 import AsyncWeb3
+
+from config.settings import settings
+from utils.rpc_batch import BatchRPC
+
+logger = logging.getLogger(__name__)
+
+
+class BlockFetcher:
+    """
+    Fetches a contiguous block range with a bounded number of in-flight
+    requests, yielding blocks strictly in block order.
+
+    Each in-flight request is a JSON-RPC batch of `batch_size` blocks, so a
+    catch-up window costs roughly range / batch_size round trips.
+    """
+
+    def __init__(self, w3: AsyncWeb3, chain: str, concurrency: Optional[int] = None,
+                 batch_size: Optional[int] = None, rpc: Optional[BatchRPC] = None):
+        self.w3 = w3
+        self.chain = chain
+        self.rpc = rpc or BatchRPC(w3)
+        self.concurrency = max(1, concurrency or settings.BLOCK_FETCH_CONCURRENCY)
+        self.batch_size = max(1, batch_size or settings.BLOCK_FETCH_BATCH)
+
+    async def _fetch(self, block_numbers: List[int]) -> List[Optional[Dict[str, Any]]]:
+        """Fetch a run of blocks with full transactions in one batch."""
+        return await self.rpc.get_blocks(block_numbers, full_transactions=True)
+
+    async def iter_blocks(
+        self, start_block: int, end_block: int
+    ) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """
+        Yield (block_number, block) for every block in [start_block, end_block].
+
+        Up to `concurrency` requests run ahead of the consumer; results are
+        handed back in order so processing and checkpointing stay sequential.
+        A block that fails to fetch is yielded as None.
+        """
+        pending: Deque[Tuple[List[int], asyncio.Task]] = deque()
+        next_block = start_block
+
+        try:
+            while next_block <= end_block or pending:
+                while next_block <= end_block and len(pending) < self.concurrency:
+                    chunk_end = min(end_block, next_block + self.batch_size - 1)
+                    block_numbers = list(range(next_block, chunk_end + 1))
+                    task = asyncio.create_task(self._fetch(block_numbers))
+                    pending.append((block_numbers, task))
+                    next_block = chunk_end + 1
+
+                block_numbers, task = pending.popleft()
+                try:
+                    blocks = await task
+                except Exception as e:
+                    logger.error(
+                        f"Error fetching {self.chain} blocks "
+                        f"{block_numbers[0]}-{block_numbers[-1]}: {e}"
+                    )
+                    blocks = [None] * len(block_numbers)
+
+                for block_num, block in zip(block_numbers, blocks):
+                    if block is None:
+                        logger.error(f"Error fetching {self.chain} block {block_num}")
+                    yield block_num, block
+        finally:
+            for _, task in pending:
+                task.cancel()
@@ -1,51 +1,173 @@
 import logging
-from typing import Dict, Any
-from web3 import Web3
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from web3 import AsyncWeb3
 
+from config.settings import settings
+from db.models import Token
 from indexer.contract_detector import ContractDetector
+from indexer.internal_creates import InternalCreateFinder
+from utils.rpc_batch import BatchRPC, RPCMethodUnsupportedError
 
 logger = logging.getLogger(__name__)
 
+# Number of recent blocks whose receipts stay cached for later stages
+RECEIPT_CACHE_BLOCKS = 64
+
 class BlockProcessor:
-    def __init__(self, w3: Web3, chain: str):
+    def __init__(self, w3: AsyncWeb3, chain: str, rpc: Optional[BatchRPC] = None):
         self.w3 = w3
         self.chain = chain
+        # An archiving or archive-backed RPC can stand in for the node's
+        self.rpc = rpc or BatchRPC(w3)
         self.contract_detector = ContractDetector(w3, chain)
-    
-    async def process_block(self, block_number: int, block: Dict[str, Any]):
-        """Process a single block"""
+        self.block_receipts_supported = True
+        self._receipt_cache: "OrderedDict[int, Dict[str, Dict[str, Any]]]" = OrderedDict()
+        self.internal_creates = (
+            InternalCreateFinder(w3, chain, settings.INTERNAL_CREATE_DETECTION, self.get_receipts, rpc=self.rpc)
+            if settings.INTERNAL_CREATE_DETECTION != "off" else None
+        )
+
+    async def process_block(self, block_number: int, block: Dict[str, Any]) -> List[Token]:
+        """Process a single block, returning the ERC20 tokens detected in it"""
         logger.debug(f"Processing block {block_number} on {self.chain}")
-        
+
         transactions = block.get("transactions", [])
-        
-        for tx in transactions:
-            # Check if this is a contract creation transaction
-            if tx.get("to") is None:
-                await self._process_contract_creation(tx, block_number)
-    
-    async def _process_contract_creation(self, tx: Dict[str, Any], block_number: int):
+
+        # Contract creation transactions have no recipient
+        creations = [tx for tx in transactions if tx.get("to") is None]
+        tokens = await self._process_contract_creations(creations, block_number) if creations else []
+
+        # Factory and launchpad deploys happen inside ordinary transactions
+        if self.internal_creates is not None:
+            tokens.extend(await self._process_internal_creations(block_number, block))
+
+        return tokens
+
+    async def get_receipts(self, block_number: int, tx_hashes: List[Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Return receipts of a block keyed by lowercase tx hash, covering at
+        least `tx_hashes`.
+
+        Uses a single eth_getBlockReceipts call when the node supports it and
+        falls back to one batched eth_getTransactionReceipt request otherwise.
+        Results are cached per block so later stages can reuse them.
+        """
+        cached = self._receipt_cache.get(block_number, {})
+        missing = [h for h in tx_hashes if _hash_key(h) not in cached]
+        if not missing:
+            return cached
+
+        receipts: Optional[List[Dict[str, Any]]] = None
+        if self.block_receipts_supported:
+            try:
+                receipts = await self.rpc.get_block_receipts(block_number)
+            except RPCMethodUnsupportedError as e:
+                logger.info(f"{self.chain} node lacks eth_getBlockReceipts, using batched receipts: {e}")
+                self.block_receipts_supported = False
+
+        if receipts is None:
+            receipts = [r for r in await self.rpc.get_transaction_receipts(missing) if r]
+
+        cached = dict(cached)
+        for receipt in receipts:
+            cached[_hash_key(receipt.get("transactionHash"))] = receipt
+
+        self._receipt_cache[block_number] = cached
+        self._receipt_cache.move_to_end(block_number)
+        while len(self._receipt_cache) > RECEIPT_CACHE_BLOCKS:
+            self._receipt_cache.popitem(last=False)
+
+        return cached
+
+    def cached_receipts(self, block_number: int) -> Dict[str, Dict[str, Any]]:
+        """Receipts already fetched for a block, keyed by lowercase tx hash."""
+        return self._receipt_cache.get(block_number, {})
+
+    def forget_receipts_after(self, block_number: int):
+        """Drop cached receipts of blocks above block_number (orphaned by a reorg)."""
+        for n in [n for n in self._receipt_cache if n > block_number]:
+            del self._receipt_cache[n]
+
+    async def _process_contract_creations(self, txs: List[Dict[str, Any]], block_number: int) -> List[Token]:
+        """Process all contract creation transactions of a block"""
+        try:
+            receipts_by_hash = await self.get_receipts(block_number, [tx.get("hash") for tx in txs])
+        except Exception as e:
+            logger.error(f"Error fetching creation receipts for block {block_number}: {e}")
+            return []
+
+        receipts = [receipts_by_hash.get(_hash_key(tx.get("hash"))) for tx in txs]
+
+        created = []
+        for tx, receipt in zip(txs, receipts):
+            contract_address = receipt.get("contractAddress") if receipt else None
+            if contract_address:
+                created.append((tx, contract_address))
+
+        return await self._detect_tokens(created, block_number)
+
+    async def _process_internal_creations(self, block_number: int, block: Dict[str, Any]) -> List[Token]:
+        """Process contracts created by internal CREATE/CREATE2 calls in a block"""
+        try:
+            internal = await self.internal_creates.find(block_number, block)
+        except Exception as e:
+            logger.error(f"Error finding internal creations in block {block_number}: {e}")
+            return []
+
+        txs_by_hash = {_hash_key(tx.get("hash")): tx for tx in block.get("transactions", [])}
+        seen = set()
+        created = []
+        for tx_hash, contract_address in internal:
+            tx = txs_by_hash.get(tx_hash)
+            if tx is not None and contract_address not in seen:
+                seen.add(contract_address)
+                created.append((tx, contract_address))
+
+        return await self._detect_tokens(created, block_number)
+
+    async def _detect_tokens(self, created: List[Tuple[Dict[str, Any], str]], block_number: int) -> List[Token]:
+        """Classify (tx, contract_address) deployments, returning the ERC20 tokens"""
+        if not created:
+            return []
+
+        # Resolve every deployed bytecode in one batch
+        try:
+            bytecodes = await self.rpc.get_code([address for _, address in created])
+        except Exception as e:
+            logger.error(f"Error fetching bytecode for block {block_number}: {e}")
+            bytecodes = [None] * len(created)
+
+        tokens = []
+        for (tx, contract_address), bytecode in zip(created, bytecodes):
+            token = await self._process_contract_creation(tx, contract_address, bytecode, block_number)
+            if token is not None:
+                tokens.append(token)
+        return tokens
+
+    async def _process_contract_creation(self, tx: Dict[str, Any], contract_address: str,
+                                         bytecode, block_number: int) -> Optional[Token]:
         """Process a contract creation transaction"""
         tx_hash = tx.get("hash")
-        
+
         try:
-            # Get transaction receipt to get contract address
-            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
-            contract_address = receipt.get("contractAddress")
-            
-            if not contract_address:
-                return
-            
             deployer = tx.get("from")
-            
+
             logger.info(f"New contract detected: {contract_address} on {self.chain} from {deployer}")
-            
+
             # Process the contract
-            await self.contract_detector.process_contract(
+            return await self.contract_detector.process_contract(
                 contract_address=contract_address,
                 deployer=deployer,
                 block_number=block_number,
-                tx_hash=tx_hash.hex() if hasattr(tx_hash, 'hex') else tx_hash
+                tx_hash=tx_hash.hex() if hasattr(tx_hash, 'hex') else tx_hash,
+                bytecode=bytecode
             )
-            
+
         except Exception as e:
-            logger.error(f"Error processing contract creation for tx {tx_hash}: {e}")
\ No newline at end of file
+            logger.error(f"Error processing contract creation for tx {tx_hash}: {e}")
+            return None
+
+
+def _hash_key(tx_hash: Any) -> str:
+    return (tx_hash.hex() if hasattr(tx_hash, "hex") else str(tx_hash)).lower()
@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import time
+from contextlib import aclosing
+
+from config.settings import settings
+from config.chains import ChainConfig
+from dex.pool_registry import POOL_EVENTS, PoolRegistry
+from dex.price_oracle import get_price_oracle
+from dex.reserve_tracker import RESERVE_EVENTS, ReserveTracker
+from indexer.archive import ArchivingRPC, BlockArchive
+from indexer.block_processor import BlockProcessor
+from indexer.checkpoint import CheckpointWriter
+from indexer.block_fetcher import BlockFetcher
+from indexer.head_subscriber import HeadSubscriber
+from indexer.log_ingestor import LogIngestor
+from indexer.reorg import BlockHashWindow, rollback_to
+from utils.rpc_batch import BatchRPC
+from utils.web3_client import get_async_web3
+
+logger = logging.getLogger(__name__)
+
+
+class ChainListener:
+    """
+    Listens to and indexes the blocks of one chain, driven by its ChainConfig.
+
+    Any number of listeners run concurrently on one event loop. Each has its
+    own RPC client, connection pool (when `rpc_pool_size` is set) and bounded
+    fetch window, so a slow node only ever stalls its own chain.
+    """
+
+    def __init__(self, chain: ChainConfig):
+        self.chain = chain
+        self.name = chain.name
+        self.w3 = get_async_web3(chain.get_rpc_url(), poa=chain.poa, pool_size=chain.rpc_pool_size)
+        # With ARCHIVE_DIR set, everything the pipeline fetches is also archived for replay
+        self.archive = BlockArchive(settings.ARCHIVE_DIR, chain.name) if settings.ARCHIVE_DIR else None
+        rpc = ArchivingRPC(self.w3, self.archive) if self.archive else BatchRPC(self.w3)
+        self.block_processor = BlockProcessor(self.w3, chain.name, rpc=rpc)
+        self.block_fetcher = BlockFetcher(
+            self.w3, chain.name, concurrency=chain.fetch_concurrency, batch_size=chain.fetch_batch, rpc=rpc
+        )
+        self.checkpoint = CheckpointWriter(
+            chain.name, chain.start_block, hash_window=chain.reorg_depth
+        )
+        self.hash_window = BlockHashWindow(self.w3, chain.name, chain.reorg_depth)
+        # Pool and liquidity consumers subscribe to the decoded event stream
+        self.log_ingestor = LogIngestor(self.w3, chain.name, rpc=rpc)
+        self.pool_registry = PoolRegistry(chain.name, chain.dex_factories)
+        self.log_ingestor.subscribe(self.pool_registry.on_event, POOL_EVENTS)
+        self.price_oracle = get_price_oracle(self.w3, chain.name)
+        self.reserve_tracker = ReserveTracker(
+            chain.name, self.pool_registry, self.price_oracle, reorg_depth=chain.reorg_depth
+        )
+        self.log_ingestor.subscribe(self.reserve_tracker.on_event, RESERVE_EVENTS)
+        ws_url = chain.get_ws_url()
+        self.head_subscriber = HeadSubscriber(ws_url, chain.name) if ws_url else None
+        self.max_block_batch = chain.max_block_batch or settings.MAX_BLOCK_BATCH
+        self.last_block = 0
+        self._ws_retry_at = 0.0
+        self.running = False
+
+    def get_last_processed_block(self) -> int:
+        """Get last committed block from database."""
+        return self.checkpoint.load()
+
+    async def run(self):
+        """Main listener loop."""
+        self.running = True
+        self.last_block = self.get_last_processed_block()
+        self.hash_window.load()
+        self.pool_registry.load()
+        self.reserve_tracker.follow_from(self.last_block + 1)
+
+        logger.info(f"Starting {self.chain.label} listener from block {self.last_block}")
+
+        try:
+            while self.running:
+                try:
+                    # Prefer pushed heads; poll while the socket is down
+                    if self.head_subscriber and time.monotonic() >= self._ws_retry_at:
+                        await self._follow_heads()
+                        continue
+
+                    current_block = await self.w3.eth.block_number
+
+                    if current_block <= self.last_block:
+                        await asyncio.sleep(self.chain.poll_interval)
+                        continue
+
+                    await self._process_batch(current_block)
+
+                    # Small delay between batches
+                    await asyncio.sleep(self.chain.batch_delay)
+
+                except Exception as e:
+                    logger.error(f"{self.chain.label} listener error: {e}")
+                    await asyncio.sleep(self.chain.error_backoff)
+        finally:
+            self.checkpoint.flush()
+            self.pool_registry.flush()
+            await self.reserve_tracker.flush()
+            if self.archive:
+                self.archive.close(through=self.last_block - self.chain.reorg_depth)
+
+    async def _process_batch(self, current_block: int):
+        """Process the next batch of blocks after the checkpoint, up to current_block."""
+        start_block = self.last_block + 1
+        end_block = min(current_block, start_block + self.max_block_batch)
+
+        logger.info(f"{self.chain.label}: processing blocks {start_block} to {end_block}")
+
+        async with aclosing(self.block_fetcher.iter_blocks(start_block, end_block)) as blocks:
+            async for block_num, block in blocks:
+                if block is None:
+                    logger.warning(f"{self.chain.label}: could not fetch block {block_num}, retrying from there")
+                    end_block = block_num - 1
+                    break
+                if not self.hash_window.is_continuous(block_num, block):
+                    await self._handle_reorg(block_num)
+                    # Blocks of this batch up to the fork are canonical and processed; only their logs are missing
+                    if self.last_block >= start_block:
+                        await self._apply_batch_logs(start_block, self.last_block)
+                    return
+                block_hash = block.hash.hex()
+                self.hash_window.record(block_num, block_hash)
+                self.reserve_tracker.note_block(block_num, block["timestamp"])
+                try:
+                    tokens = await self.block_processor.process_block(block_num, block)
+                    # Committed with the checkpoint once the batch's logs are in
+                    self.checkpoint.advance(block_num, block_hash, tokens)
+                except Exception as e:
+                    # Later blocks may depend on this one; stop here and retry it next batch
+                    logger.error(f"Error processing {self.chain.label} block {block_num}: {e}")
+                    self.hash_window.truncate(block_num - 1)
+                    self.block_processor.forget_receipts_after(block_num - 1)
+                    end_block = block_num - 1
+                    break
+
+        if end_block < start_block:
+            return
+        await self._apply_batch_logs(start_block, end_block)
+        self.last_block = end_block
+        if self.archive:
+            # Only partitions out of reorg reach are final
+            self.archive.flush(through=end_block - self.chain.reorg_depth)
+        if self.checkpoint.due(at_head=end_block >= current_block):
+            self.checkpoint.flush()
+
+    async def _apply_batch_logs(self, start_block: int, end_block: int):
+        """
+        `_apply_logs` for the batch's processed blocks. If the logs can't be
+        ingested, the batch's in-memory progress is undone and the error
+        raised, so the whole batch is retried instead of skipping its events.
+        """
+        try:
+            await self._apply_logs(start_block, end_block)
+        except Exception:
+            self._abandon_batch(start_block - 1)
+            raise
+
+    def _abandon_batch(self, block_number: int):
+        """Drop in-memory progress above block_number, whose blocks will be processed again."""
+        self.checkpoint.rewind(block_number, self.hash_window.hashes.get(block_number))
+        self.hash_window.truncate(block_number)
+        self.pool_registry.rewind(block_number)
+        self.reserve_tracker.rewind(block_number)
+        self.block_processor.forget_receipts_after(block_number)
+        self.last_block = block_number
+
+    async def _apply_logs(self, start_block: int, end_block: int):
+        """Ingest the range's events, then persist the pools and liquidity they changed."""
+        await self._ingest_logs(start_block, end_block)
+        self.pool_registry.flush()
+        await self.price_oracle.refresh(end_block)
+        await self.reserve_tracker.flush()
+
+    async def _ingest_logs(self, start_block: int, end_block: int):
+        """Stream the range's pool and token events to the log ingestor's consumers."""
+        try:
+            count = await self.log_ingestor.ingest(start_block, end_block)
+        except Exception as e:
+            raise RuntimeError(f"could not ingest logs of blocks {start_block} to {end_block}: {e}") from e
+        if count:
+            logger.debug(f"{self.chain.label}: {count} events in blocks {start_block} to {end_block}")
+
+    async def _handle_reorg(self, block_num: int):
+        """
+        Roll back to the last block still on the canonical chain; the next
+        batch then re-processes only the orphaned range.
+        """
+        fork_block, fork_hash = await self.hash_window.find_fork_point(block_num)
+        logger.warning(f"{self.chain.label} reorg detected at block {block_num}, rolling back to block {fork_block}")
+
+        self.checkpoint.rewind(fork_block, fork_hash)
+        self.checkpoint.flush()
+        removed = rollback_to(self.name, fork_block, fork_hash)
+
+        self.hash_window.truncate(fork_block)
+        self.pool_registry.rewind(fork_block)
+        self.reserve_tracker.rewind(fork_block)
+        self.block_processor.forget_receipts_after(fork_block)
+        self.last_block = fork_block
+        logger.info(f"{self.chain.label} rollback to block {fork_block} removed {removed} orphaned tokens")
+
+    async def _follow_heads(self):
+        """
+        Process blocks as newHeads arrive. Each head first backfills any gap
+        since the checkpoint; if the socket drops, polling takes over until
+        the reconnect delay has passed.
+        """
+        try:
+            async for head in self.head_subscriber.heads():
+                while self.running and self.last_block < head:
+                    await self._process_batch(head)
+                if not self.running:
+                    break
+        except Exception as e:
+            logger.warning(f"{self.chain.label} newHeads subscription dropped: {e}")
+
+        if self.running:
+            logger.info(
+                f"{self.chain.label} listener polling for {settings.WS_RECONNECT_SECONDS}s before resubscribing"
+            )
+            self._ws_retry_at = time.monotonic() + settings.WS_RECONNECT_SECONDS
+
+    def stop(self):
+        """Stop the listener."""
+        self.running = False
+        logger.info(f"{self.chain.label} listener stopped")
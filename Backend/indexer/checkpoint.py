@@ -0,0 +1,276 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from celery import group
+from sqlalchemy import case
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
+
+from config.settings import settings
+from db.session import SessionLocal
+from db.models import BackfillShard, BlockHash, ProcessedBlock, Token
+from tasks.job_runner import trigger_token_analysis
+from utils.analysis_cache import analysis_cache
+
+logger = logging.getLogger(__name__)
+
+# Rows per multi-row INSERT, well under Postgres' 65535 bind parameter limit
+TOKEN_INSERT_CHUNK = 1000
+
+
+class CheckpointWriter:
+    """
+    Amortized high-water-mark checkpointing for a chain listener.
+
+    Blocks are recorded in memory as they are processed, together with the
+    tokens detected in them. Every `every_blocks` blocks or `every_seconds`
+    seconds the buffered tokens and the new high-water mark are written in
+    a single transaction, so after a crash the listener resumes from the
+    last committed block and re-detects exactly the tokens that were lost.
+
+    With `hash_window` set, the hashes of the last `hash_window` blocks are
+    persisted in the same transaction so reorg detection survives restarts.
+    """
+
+    def __init__(self, chain: str, start_block: int = 0,
+                 every_blocks: Optional[int] = None, every_seconds: Optional[float] = None,
+                 trigger_analysis: bool = True, hash_window: int = 0):
+        self.chain = chain
+        self.start_block = start_block
+        self.trigger_analysis = trigger_analysis
+        self.hash_window = hash_window
+        self.every_blocks = max(1, every_blocks or settings.CHECKPOINT_EVERY_BLOCKS)
+        self.every_seconds = every_seconds or settings.CHECKPOINT_EVERY_SECONDS
+
+        self.pending_block: Optional[int] = None
+        self.pending_hash: Optional[str] = None
+        self.pending_tokens: List[Token] = []
+        self.pending_hashes: List[Tuple[int, str]] = []
+        self._blocks_since_flush = 0
+        self._last_flush = time.monotonic()
+
+    def load(self) -> int:
+        """Return the last committed block for this chain (or the chain's start block)."""
+        db = SessionLocal()
+        try:
+            record = db.query(ProcessedBlock).filter(ProcessedBlock.chain == self.chain).first()
+            if record:
+                return record.block_number
+            return self.start_block
+        finally:
+            db.close()
+
+    def advance(self, block_number: int, block_hash: str, tokens: Optional[List[Token]] = None):
+        """Record a processed block and the tokens detected in it."""
+        self.pending_block = block_number
+        self.pending_hash = block_hash
+        if tokens:
+            self.pending_tokens.extend(tokens)
+        if self.hash_window:
+            self.pending_hashes.append((block_number, block_hash))
+        self._blocks_since_flush += 1
+
+    def rewind(self, block_number: int, block_hash: Optional[str]):
+        """
+        Drop everything buffered above block_number after a reorg. Buffered
+        blocks at or below it stay pending, with the high-water mark moved
+        back to block_number.
+        """
+        if self.pending_block is None or self.pending_block <= block_number:
+            return
+
+        kept = [(n, h) for n, h in self.pending_hashes if n <= block_number]
+        self.pending_tokens = [t for t in self.pending_tokens if t.deployed_block <= block_number]
+        self.pending_hashes = kept
+        if kept:
+            self.pending_block = block_number
+            self.pending_hash = block_hash
+        else:
+            self.pending_block = None
+            self.pending_hash = None
+            self._blocks_since_flush = 0
+
+    def due(self, at_head: bool = False) -> bool:
+        """
+        True once enough blocks or time have accumulated since the last flush.
+        At the chain head, newly detected tokens are flushed right away so
+        alerting latency isn't bounded by the checkpoint interval.
+        """
+        if self.pending_block is None:
+            return False
+        return (
+            (at_head and bool(self.pending_tokens))
+            or self._blocks_since_flush >= self.every_blocks
+            or time.monotonic() - self._last_flush >= self.every_seconds
+        )
+
+    def flush(self) -> bool:
+        """
+        Commit buffered tokens, the detector's buffered bytecode analyses and
+        the high-water mark in one transaction, then enqueue analysis for the
+        newly inserted tokens in one publish.
+
+        On failure everything stays buffered and is retried on the next flush.
+        """
+        if self.pending_block is None:
+            return True
+
+        tokens = self.pending_tokens
+        rows = _token_rows(tokens)
+        chains = {token.address: token.chain for token in tokens}
+        committed = []
+        analyses = {}
+
+        db = SessionLocal()
+        try:
+            analyses = analysis_cache.write_buffered(db)
+            for i in range(0, len(rows), TOKEN_INSERT_CHUNK):
+                # Tokens already stored (e.g. by an overlapping backfill) are skipped
+                stmt = (
+                    insert(Token)
+                    .values(rows[i:i + TOKEN_INSERT_CHUNK])
+                    .on_conflict_do_nothing(index_elements=[Token.address])
+                    .returning(Token.address)
+                )
+                committed.extend((address, chains[address]) for address in db.scalars(stmt))
+            self._write_progress(db)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to write {self.chain} checkpoint at block {self.pending_block}: {e}")
+            db.rollback()
+            analysis_cache.requeue(analyses)
+            return False
+        finally:
+            db.close()
+
+        logger.debug(
+            f"{self.chain} checkpoint at block {self.pending_block} "
+            f"({len(committed)}/{len(tokens)} tokens inserted, {self._blocks_since_flush} blocks)"
+        )
+
+        self.pending_block = None
+        self.pending_hash = None
+        self.pending_tokens = []
+        self.pending_hashes = []
+        self._blocks_since_flush = 0
+        self._last_flush = time.monotonic()
+
+        if self.trigger_analysis:
+            self._trigger_analyses(committed)
+        return True
+
+    def _write_progress(self, db):
+        """
+        Upsert the chain's high-water mark with a single statement. It only
+        moves up, so a backfill that raised it isn't undone; reorgs lower it
+        through `rollback_to`.
+        """
+        stmt = insert(ProcessedBlock).values(
+            chain=self.chain,
+            block_number=self.pending_block,
+            hash=self.pending_hash,
+            processed_at=func.now(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProcessedBlock.chain],
+            set_={
+                "block_number": func.greatest(ProcessedBlock.block_number, stmt.excluded.block_number),
+                "hash": case(
+                    (stmt.excluded.block_number >= ProcessedBlock.block_number, stmt.excluded.hash),
+                    else_=ProcessedBlock.hash,
+                ),
+                "processed_at": stmt.excluded.processed_at,
+            },
+        )
+        db.execute(stmt)
+
+        if self.hash_window and self.pending_hashes:
+            self._write_hashes(db)
+
+    def _write_hashes(self, db):
+        """Upsert the buffered block hashes and prune the persisted window."""
+        stmt = insert(BlockHash).values([
+            {"chain": self.chain, "block_number": n, "hash": h}
+            for n, h in self.pending_hashes[-self.hash_window:]
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BlockHash.chain, BlockHash.block_number],
+            set_={"hash": stmt.excluded.hash},
+        )
+        db.execute(stmt)
+        db.query(BlockHash).filter(
+            BlockHash.chain == self.chain,
+            BlockHash.block_number <= self.pending_block - self.hash_window,
+        ).delete(synchronize_session=False)
+
+    def _trigger_analyses(self, tokens):
+        """Publish every analysis job over one broker connection."""
+        if not tokens:
+            return
+        try:
+            group(
+                trigger_token_analysis.s(token_address=address, chain=chain)
+                for address, chain in tokens
+            ).apply_async()
+        except Exception as e:
+            # Unanalyzed tokens are picked up again by the scheduler's pending sweep
+            logger.error(f"Failed to enqueue analysis for {len(tokens)} {self.chain} tokens: {e}")
+
+
+class ShardCheckpoint(CheckpointWriter):
+    """
+    Checkpoint for one backfill shard: progress goes to the shard's row in
+    `backfill_shards` instead of the chain's live high-water mark.
+    """
+
+    def __init__(self, shard_id: str, chain: str, **kwargs):
+        super().__init__(chain, **kwargs)
+        self.shard_id = shard_id
+
+    def load(self) -> int:
+        """Return the last committed block of the shard."""
+        db = SessionLocal()
+        try:
+            return db.get(BackfillShard, self.shard_id).last_block
+        finally:
+            db.close()
+
+    def _write_progress(self, db):
+        db.query(BackfillShard).filter(BackfillShard.id == self.shard_id).update(
+            {"last_block": self.pending_block}, synchronize_session=False
+        )
+
+
+class ReplayCheckpoint(CheckpointWriter):
+    """
+    Checkpoint for an archive replay: detected tokens are written as usual,
+    but no high-water mark is kept, so the live listener is unaffected.
+    """
+
+    def load(self) -> int:
+        return self.start_block
+
+    def _write_progress(self, db):
+        pass
+
+
+def _token_rows(tokens: List[Token]) -> List[Dict[str, Any]]:
+    """
+    Turn unsaved Token objects into uniform row dicts for a multi-row INSERT,
+    applying the column defaults the ORM would have filled in.
+    """
+    columns = Token.__table__.columns
+    rows = []
+    for token in tokens:
+        row = {}
+        for column in columns:
+            value = getattr(token, column.key)
+            if value is None and column.default is not None and column.default.is_scalar:
+                value = column.default.arg
+            if value is not None:
+                row[column.key] = value
+        rows.append(row)
+
+    # Every row needs the same keys; columns nobody set keep their server defaults
+    keys = {key for row in rows for key in row}
+    return [{key: row.get(key) for key in keys} for row in rows]
@@ -1,71 +1,145 @@
+import asyncio
 import logging
 from typing import Optional
-from web3 import Web3
+from web3 import AsyncWeb3, Web3
 
 from db.session import SessionLocal
 from db.models import Token
 from indexer.erc20_classifier import ERC20Classifier
-from tasks.job_runner import trigger_token_analysis
+from indexer.known_tokens import get_known_tokens
+from intelligence.clone_index import bytecode_signature, clone_index
+from utils.analysis_cache import analysis_cache
+from utils.proxy import ProxyResolver
 
 logger = logging.getLogger(__name__)
 
 class ContractDetector:
-    def __init__(self, w3: Web3, chain: str):
+    def __init__(self, w3: AsyncWeb3, chain: str):
         self.w3 = w3
         self.chain = chain
         self.erc20_classifier = ERC20Classifier(w3)
+        self.proxy_resolver = ProxyResolver(w3, chain)
+        self.known_tokens = get_known_tokens(chain)
     
-    async def process_contract(self, contract_address: str, deployer: str, block_number: int, tx_hash: str):
-        """Process a newly deployed contract"""
+    async def process_contract(self, contract_address: str, deployer: str, block_number: int, tx_hash: str,
+                               bytecode: Optional[bytes] = None) -> Optional[Token]:
+        """
+        Process a newly deployed contract (bytecode may be prefetched by the block processor).
+
+        Returns the new Token if the contract is an ERC20; it is persisted by the
+        listener's checkpoint together with the block range it was found in.
+        """
         
-        # Check if already processed
-        db = SessionLocal()
         try:
-            existing = db.query(Token).filter(
-                Token.address == contract_address.lower(),
-                Token.chain == self.chain
-            ).first()
-            
-            if existing:
+            # Check if already processed
+            if self._already_processed(contract_address):
                 logger.debug(f"Contract {contract_address} already processed")
-                return
+                return None
             
-            # Get bytecode
-            bytecode = self.w3.eth.get_code(Web3.to_checksum_address(contract_address))
+            # Get bytecode unless it was already fetched in the block's batch
+            if bytecode is None:
+                bytecode = await self.w3.eth.get_code(Web3.to_checksum_address(contract_address))
             
             if not bytecode or bytecode.hex() == "0x":
                 logger.debug(f"Contract {contract_address} has no bytecode")
-                return
+                return None
             
-            # Classify as ERC20
-            is_erc20 = self.erc20_classifier.is_erc20(bytecode.hex())
+            bytecode_hash = Web3.keccak(bytecode).hex()
+            is_erc20 = self._classify(bytecode_hash, bytecode)
+            proxy = None
+            
+            # A proxy's own code has no ERC20 dispatcher; classify what it delegates to
+            if not is_erc20:
+                proxy = await self.proxy_resolver.resolve(contract_address, bytecode)
+                if proxy is not None:
+                    implementation_hash, implementation_code = await self.proxy_resolver.implementation_code(
+                        proxy.implementation
+                    )
+                    if implementation_code is not None:
+                        is_erc20 = self._classify(implementation_hash, implementation_code)
+                        logger.debug(
+                            f"Contract {contract_address} is an {proxy.kind} proxy for {proxy.implementation}"
+                        )
+                        # Analyses and clone families follow the code that actually runs
+                        bytecode_hash, bytecode = implementation_hash, implementation_code
             
             if not is_erc20:
                 logger.debug(f"Contract {contract_address} is not ERC20")
-                return
+                return None
             
-            # Store token
             token = Token(
                 address=contract_address.lower(),
                 chain=self.chain,
                 deployer=deployer.lower(),
                 deployed_block=block_number,
-                bytecode_hash=Web3.keccak(bytecode).hex()
+                bytecode_hash=bytecode_hash,
+                proxy_kind=proxy.kind if proxy else None,
+                implementation=proxy.implementation if proxy else None
             )
-            
-            db.add(token)
-            db.commit()
+            await self._assign_family(token, bytecode)
+            self.known_tokens.add(token.address)
             
             logger.info(f"New ERC20 token detected: {contract_address} on {self.chain}")
-            
-            # Trigger async analysis
-            trigger_token_analysis.delay(
-                token_address=contract_address.lower(),
-                chain=self.chain
-            )
+            return token
             
         except Exception as e:
             logger.error(f"Error processing contract {contract_address}: {e}")
-            db.rollback()
+            return None
+
+    def _already_processed(self, contract_address: str) -> bool:
+        """Only Bloom filter hits (possibly false positives) are checked against the database"""
+        if not self.known_tokens.might_contain(contract_address):
+            return False
+        
+        db = SessionLocal()
+        try:
+            existing = db.query(Token.address).filter(
+                Token.address == contract_address.lower(),
+                Token.chain == self.chain
+            ).first()
+            return existing is not None
         finally:
-            db.close()
\ No newline at end of file
+            db.close()
+
+    def _classify(self, bytecode_hash: str, bytecode: bytes) -> bool:
+        """Classify as ERC20, once per distinct bytecode"""
+        cached = analysis_cache.get(bytecode_hash)
+        if cached is not None and "is_erc20" in cached:
+            return cached["is_erc20"]
+        
+        # One dispatcher scan answers every selector family
+        profile = self.erc20_classifier.classify(bytecode)
+        is_erc20 = self.erc20_classifier.is_erc20(bytecode, profile)
+        # Written with the listener's next checkpoint
+        analysis_cache.buffer(
+            bytecode_hash,
+            is_erc20=is_erc20,
+            selectors=sorted(profile.selectors),
+            dangerous_functions=profile.names("dangerous"),
+        )
+        return is_erc20
+
+    async def _assign_family(self, token: Token, bytecode: bytes):
+        """
+        Place the token in its clone family and give it the family's risk
+        profile as a provisional score until its own analysis completes.
+        """
+        try:
+            signature = None
+            if clone_index.family_of(token.bytecode_hash) is None:
+                # MinHash of new code takes ~100ms; keep it off the event loop
+                signature = await asyncio.get_running_loop().run_in_executor(None, bytecode_signature, bytecode)
+            token.family_id = clone_index.assign(token.bytecode_hash, bytecode, signature)
+            profile = clone_index.family_profile(token.family_id)
+        except Exception as e:
+            logger.error(f"Error assigning clone family for {token.address}: {e}")
+            return
+        
+        if profile:
+            token.contract_score = profile["contract_score"]
+            token.final_score = profile["final_score"]
+            token.risk_level = profile["risk_level"]
+            token.flags = [
+                f"Clone of family {token.family_id[:10]} "
+                f"({profile['analyzed_tokens']} analyzed, avg score {profile['final_score']:.0f})"
+            ]
\ No newline at end of file
@@ -1,64 +1,49 @@
 import logging
-from typing import Set
-from web3 import Web3
+from typing import Optional, Set
+from web3 import AsyncWeb3
+
+from utils.bytecode import Bytecode
+from utils.selectors import (
+    ERC20_METADATA_SELECTORS,
+    ERC20_SELECTORS,
+    SELECTOR_MATCHER,
+    SelectorProfile,
+)
 
 logger = logging.getLogger(__name__)
 
 class ERC20Classifier:
     # ERC20 required function selectors
-    ERC20_SELECTORS = {
-        "18160ddd",  # totalSupply()
-        "70a08231",  # balanceOf(address)
-        "a9059cbb",  # transfer(address,uint256)
-        "095ea7b3",  # approve(address,uint256)
-        "23b872dd",  # transferFrom(address,address,uint256)
-    }
+    ERC20_SELECTORS = ERC20_SELECTORS
     
     # Common optional selectors
-    OPTIONAL_SELECTORS = {
-        "06fdde03",  # name()
-        "95d89b41",  # symbol()
-        "313ce567",  # decimals()
-    }
+    OPTIONAL_SELECTORS = ERC20_METADATA_SELECTORS
     
-    def __init__(self, w3: Web3):
+    def __init__(self, w3: AsyncWeb3):
         self.w3 = w3
     
-    def is_erc20(self, bytecode: str) -> bool:
+    def classify(self, bytecode: Bytecode) -> SelectorProfile:
+        """
+        Decode the dispatcher once and match it against every selector family
+        (ERC20, ownership, dangerous functions, fees, proxy)
         """
-        Determine if contract is ERC20 by checking for required function selectors
+        return SELECTOR_MATCHER.match(bytecode)
+    
+    def is_erc20(self, bytecode: Bytecode, profile: Optional[SelectorProfile] = None) -> bool:
+        """
+        Determine if contract is ERC20 by checking its dispatcher for required function selectors
         """
         if not bytecode or bytecode == "0x":
             return False
         
-        # Convert to lowercase for matching
-        bytecode = bytecode.lower()
-        
-        # Count required selectors
-        required_matches = 0
-        for selector in self.ERC20_SELECTORS:
-            if selector in bytecode:
-                required_matches += 1
+        if profile is None:
+            profile = self.classify(bytecode)
         
         # At least 3 of 5 required selectors must be present
-        return required_matches >= 3
+        return profile.count("erc20") >= 3
     
-    def extract_selectors(self, bytecode: str) -> Set[str]:
+    def extract_selectors(self, bytecode: Bytecode) -> Set[str]:
         """
-        Extract all function selectors from bytecode
+        Extract the dispatcher's function selectors from bytecode
         """
-        selectors = set()
-        if not bytecode or bytecode == "0x":
-            return selectors
-        
-        bytecode = bytecode.lower().replace("0x", "")
-        
-        # Look for function selectors (4-byte signatures)
-        # Common pattern: 63xxxxxx (PUSH4) followed by selector
-        for i in range(0, len(bytecode) - 10, 2):
-            if bytecode[i:i+2] == "63":  # PUSH4 opcode
-                selector = bytecode[i+2:i+10]
-                if len(selector) == 8:
-                    selectors.add(selector)
-        
-        return selectors
\ No newline at end of file
+        return self.classify(bytecode).selectors
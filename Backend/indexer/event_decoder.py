@@ -1,88 +1,366 @@
-from typing import Dict, Any, List, Optional
+import struct
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
 from web3 import Web3
 import logging
 
+from config.chains import (
+    AERODROME_BURN_EVENT,
+    AERODROME_POOL_CREATED_EVENT,
+    AERODROME_SYNC_EVENT,
+    BURN_EVENT,
+    MINT_EVENT,
+    PAIR_CREATED_EVENT,
+    POOL_CREATED_EVENT,
+    SYNC_EVENT,
+    TRANSFER_EVENT,
+    V3_BURN_EVENT,
+    V3_INITIALIZE_EVENT,
+    V3_MINT_EVENT,
+    V3_SWAP_EVENT,
+)
+
 logger = logging.getLogger(__name__)
 
+APPROVAL_EVENT = "0x8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925"
+
+# Common event signatures
+EVENT_SIGNATURES = {
+    TRANSFER_EVENT: "Transfer",
+    APPROVAL_EVENT: "Approval",
+    SYNC_EVENT: "Sync",
+    MINT_EVENT: "Mint",
+    BURN_EVENT: "Burn",
+    POOL_CREATED_EVENT: "PoolCreated",
+    AERODROME_POOL_CREATED_EVENT: "PoolCreated",
+    PAIR_CREATED_EVENT: "PairCreated",
+    AERODROME_SYNC_EVENT: "Sync",
+    AERODROME_BURN_EVENT: "Burn",
+    V3_INITIALIZE_EVENT: "Initialize",
+    V3_SWAP_EVENT: "Swap",
+    V3_MINT_EVENT: "Mint",
+    V3_BURN_EVENT: "Burn",
+}
+
+# Event parameters in declaration order, keyed by topic0 (events sharing a
+# name, like Uniswap V3 and Aerodrome PoolCreated or V2 and V3 Mint, differ
+# in their layout)
+EVENT_PARAMS = {
+    TRANSFER_EVENT: [
+        {"name": "from", "type": "address", "indexed": True},
+        {"name": "to", "type": "address", "indexed": True},
+        {"name": "value", "type": "uint256", "indexed": False},
+    ],
+    APPROVAL_EVENT: [
+        {"name": "owner", "type": "address", "indexed": True},
+        {"name": "spender", "type": "address", "indexed": True},
+        {"name": "value", "type": "uint256", "indexed": False},
+    ],
+    SYNC_EVENT: [
+        {"name": "reserve0", "type": "uint112", "indexed": False},
+        {"name": "reserve1", "type": "uint112", "indexed": False},
+    ],
+    MINT_EVENT: [
+        {"name": "sender", "type": "address", "indexed": True},
+        {"name": "amount0", "type": "uint256", "indexed": False},
+        {"name": "amount1", "type": "uint256", "indexed": False},
+    ],
+    BURN_EVENT: [
+        {"name": "sender", "type": "address", "indexed": True},
+        {"name": "amount0", "type": "uint256", "indexed": False},
+        {"name": "amount1", "type": "uint256", "indexed": False},
+        {"name": "to", "type": "address", "indexed": True},
+    ],
+    POOL_CREATED_EVENT: [
+        {"name": "token0", "type": "address", "indexed": True},
+        {"name": "token1", "type": "address", "indexed": True},
+        {"name": "fee", "type": "uint24", "indexed": True},
+        {"name": "tickSpacing", "type": "int24", "indexed": False},
+        {"name": "pool", "type": "address", "indexed": False},
+    ],
+    AERODROME_POOL_CREATED_EVENT: [
+        {"name": "token0", "type": "address", "indexed": True},
+        {"name": "token1", "type": "address", "indexed": True},
+        {"name": "stable", "type": "bool", "indexed": True},
+        {"name": "pool", "type": "address", "indexed": False},
+        {"name": "index", "type": "uint256", "indexed": False},
+    ],
+    PAIR_CREATED_EVENT: [
+        {"name": "token0", "type": "address", "indexed": True},
+        {"name": "token1", "type": "address", "indexed": True},
+        {"name": "pair", "type": "address", "indexed": False},
+        {"name": "index", "type": "uint256", "indexed": False},
+    ],
+    AERODROME_SYNC_EVENT: [
+        {"name": "reserve0", "type": "uint256", "indexed": False},
+        {"name": "reserve1", "type": "uint256", "indexed": False},
+    ],
+    AERODROME_BURN_EVENT: [
+        {"name": "sender", "type": "address", "indexed": True},
+        {"name": "to", "type": "address", "indexed": True},
+        {"name": "amount0", "type": "uint256", "indexed": False},
+        {"name": "amount1", "type": "uint256", "indexed": False},
+    ],
+    V3_INITIALIZE_EVENT: [
+        {"name": "sqrtPriceX96", "type": "uint160", "indexed": False},
+        {"name": "tick", "type": "int24", "indexed": False},
+    ],
+    V3_SWAP_EVENT: [
+        {"name": "sender", "type": "address", "indexed": True},
+        {"name": "recipient", "type": "address", "indexed": True},
+        {"name": "amount0", "type": "int256", "indexed": False},
+        {"name": "amount1", "type": "int256", "indexed": False},
+        {"name": "sqrtPriceX96", "type": "uint160", "indexed": False},
+        {"name": "liquidity", "type": "uint128", "indexed": False},
+        {"name": "tick", "type": "int24", "indexed": False},
+    ],
+    V3_MINT_EVENT: [
+        {"name": "sender", "type": "address", "indexed": False},
+        {"name": "owner", "type": "address", "indexed": True},
+        {"name": "tickLower", "type": "int24", "indexed": True},
+        {"name": "tickUpper", "type": "int24", "indexed": True},
+        {"name": "amount", "type": "uint128", "indexed": False},
+        {"name": "amount0", "type": "uint256", "indexed": False},
+        {"name": "amount1", "type": "uint256", "indexed": False},
+    ],
+    V3_BURN_EVENT: [
+        {"name": "owner", "type": "address", "indexed": True},
+        {"name": "tickLower", "type": "int24", "indexed": True},
+        {"name": "tickUpper", "type": "int24", "indexed": True},
+        {"name": "amount", "type": "uint128", "indexed": False},
+        {"name": "amount0", "type": "uint256", "indexed": False},
+        {"name": "amount1", "type": "uint256", "indexed": False},
+    ],
+}
+
+WORD = 32
+
+_from_bytes = int.from_bytes
+
+
+def _address(word: bytes) -> str:
+    return "0x" + word[12:].hex()
+
+
+def _uint(word: bytes) -> int:
+    return _from_bytes(word, "big")
+
+
+def _int(word: bytes) -> int:
+    return _from_bytes(word, "big", signed=True)
+
+
+def _bool(word: bytes) -> bool:
+    return any(word)
+
+
+def _converter(abi_type: str) -> Callable[[bytes], Any]:
+    if abi_type == "address":
+        return _address
+    if abi_type == "bool":
+        return _bool
+    if abi_type.startswith("uint"):
+        return _uint
+    if abi_type.startswith("int"):
+        return _int
+    raise ValueError(f"Unsupported event parameter type {abi_type}")
+
+
+def _column(buf: bytes, buf_hex: str, stride: int, offset: int, abi_type: str) -> Sequence[Any]:
+    """
+    One field of every record in a buffer of fixed-size records: the word at
+    `offset` of each `stride`-byte record.
+    """
+    if abi_type == "address":
+        return ["0x" + buf_hex[i + 24:i + 64] for i in range(offset * 2, len(buf_hex), stride * 2)]
+    if abi_type == "bool":
+        # Python bools, as decode_log returns them
+        return [_bool(buf[i:i + WORD]) for i in range(offset, len(buf), stride)]
+
+    bits = int(abi_type[abi_type.index("int") + 3:] or 256)
+    signed = abi_type.startswith("int")
+    if bits <= 64:
+        # Narrow fields unpack straight from the buffer as 64-bit words
+        code = "q" if signed else "Q"
+        record = struct.Struct(f">{offset + 24}x{code}{stride - offset - WORD}x")
+        return array(code, (value for (value,) in record.iter_unpack(buf)))
+    return [_from_bytes(buf[i:i + WORD], "big", signed=signed) for i in range(offset, len(buf), stride)]
+
+
+@dataclass
+class EventColumns:
+    """A batch of one event decoded column-wise: one sequence per field, in log order."""
+    name: str
+    topic: str
+    block_number: array
+    transaction_index: array
+    log_index: array
+    address: List[str]
+    params: Dict[str, Sequence[Any]]
+
+    def __len__(self) -> int:
+        return len(self.block_number)
+
+
+def _int_column(code: str, values: List[Union[int, str, None]]) -> array:
+    """Block/log positions as an array, from formatted ints or raw hex quantities."""
+    if values and not isinstance(values[0], int):
+        values = [int(value, 16) if value else 0 for value in values]
+    return array(code, values)
+
+
+class _Decoder:
+    """An event layout compiled to (name, converter) slots for topics and data words."""
+
+    def __init__(self, name: str, topic: str, params: List[Dict[str, Any]]):
+        self.name = name
+        self.topic = topic
+        self.topic_fields = [(p["name"], p["type"]) for p in params if p["indexed"]]
+        self.data_fields = [(p["name"], p["type"]) for p in params if not p["indexed"]]
+        self.topics = tuple((name, _converter(t)) for name, t in self.topic_fields)
+        self.data = tuple((name, _converter(t)) for name, t in self.data_fields)
+        self.data_size = len(self.data) * WORD
+
+    def decode(self, topics: List[bytes], data: bytes) -> Optional[Dict[str, Any]]:
+        # ERC721 Transfer shares ERC20's topic0 but indexes the third argument
+        if len(topics) != len(self.topics) + 1 or len(data) < self.data_size:
+            return None
+        params = {name: convert(topic) for (name, convert), topic in zip(self.topics, topics[1:])}
+        for i, (name, convert) in enumerate(self.data):
+            params[name] = convert(data[i * WORD:(i + 1) * WORD])
+        return params
+
+    def decode_columns(self, logs: Sequence[Dict[str, Any]]) -> EventColumns:
+        """
+        Decode a batch of this event's logs column-wise. Each topic position
+        and the data words are joined into one buffer that every column is
+        sliced from, so no per-log dict is built.
+        """
+        n_topics = len(self.topics) + 1
+        hex_size = 2 + 2 * self.data_size
+        logs = [
+            log for log in logs
+            if len(log["topics"]) == n_topics
+            and len(log["data"]) >= (hex_size if isinstance(log["data"], str) else self.data_size)
+        ]
+
+        params: Dict[str, Sequence[Any]] = {}
+        for position, (name, abi_type) in enumerate(self.topic_fields, start=1):
+            buf = _join([log["topics"][position] for log in logs])
+            params[name] = _column(buf, buf.hex(), WORD, 0, abi_type)
+        if self.data_fields:
+            buf = _join([log["data"] for log in logs], self.data_size)
+            buf_hex = buf.hex() if any(t == "address" for _, t in self.data_fields) else ""
+            for i, (name, abi_type) in enumerate(self.data_fields):
+                params[name] = _column(buf, buf_hex, self.data_size, i * WORD, abi_type)
+
+        return EventColumns(
+            name=self.name,
+            topic=self.topic,
+            block_number=_int_column("Q", [log.get("blockNumber") for log in logs]),
+            transaction_index=_int_column("L", [log.get("transactionIndex") for log in logs]),
+            log_index=_int_column("L", [log.get("logIndex") for log in logs]),
+            address=[(log.get("address") or "").lower() for log in logs],
+            params=params,
+        )
+
+
+def _compile(event_params: Dict[str, List[Dict[str, Any]]]) -> Dict[bytes, _Decoder]:
+    return {
+        bytes.fromhex(topic[2:]): _Decoder(EVENT_SIGNATURES[topic], topic, params)
+        for topic, params in event_params.items()
+    }
+
+
+# topic0 -> decoder, built once at import
+DECODERS = _compile(EVENT_PARAMS)
+
+
+def _as_bytes(value: Union[bytes, str]) -> bytes:
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    # HexBytes.hex() would add a 0x prefix to every sliced word
+    return bytes(value)
+
+
+def _join(values: List[Union[bytes, str]], size: Optional[int] = None) -> bytes:
+    """
+    Concatenate topics or data fields into one buffer (each cut to `size`
+    bytes if given). Raw hex strings are joined first and parsed once.
+    """
+    if values and isinstance(values[0], str):
+        end = None if size is None else 2 + 2 * size
+        return bytes.fromhex("".join(value[2:end] for value in values))
+    if size is None:
+        return b"".join(values)
+    # Slicing HexBytes is costly; most data fields are already exactly `size`
+    return b"".join(value if len(value) == size else bytes(value)[:size] for value in values)
+
+
 class EventDecoder:
-    def __init__(self, w3: Web3):
+    """
+    Decodes the logs of known events into typed parameters: ints for
+    (u)int types, bools, and lowercase hex for addresses. Every event is a
+    fixed list of 32-byte words, so decoding is a topic0 lookup in the
+    precompiled table plus one slice per field, without an ABI codec.
+
+    `decode_batch` decodes many logs at once into columns instead, for
+    consumers that aggregate over a range rather than react per event.
+    """
+
+    EVENT_SIGNATURES = EVENT_SIGNATURES
+    EVENT_PARAMS = EVENT_PARAMS
+
+    def __init__(self, w3: Optional[Web3] = None):
         self.w3 = w3
-        
-        # Common event signatures
-        self.EVENT_SIGNATURES = {
-            "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef": "Transfer",
-            "0x8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925": "Approval",
-            "0x1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1": "Sync",
-            "0x4c209b5fc8ad50758f13e2e1088ba56a560dff690a1c6fef26394f4c03821c4f": "Mint",
-            "0xdccd412f0b1252819cb1fd330b93224ca42612892bb3f4f789976e6d81936496": "Burn",
-            "0x783cca1c0412dd0d695e784568c96da2e9c22ff989357a2e8b1d9b2b4e6b7118": "PoolCreated",
-        }
-        
-        # Event parameter types
-        self.EVENT_PARAMS = {
-            "Transfer": [
-                {"name": "from", "type": "address", "indexed": True},
-                {"name": "to", "type": "address", "indexed": True},
-                {"name": "value", "type": "uint256", "indexed": False},
-            ],
-            "Approval": [
-                {"name": "owner", "type": "address", "indexed": True},
-                {"name": "spender", "type": "address", "indexed": True},
-                {"name": "value", "type": "uint256", "indexed": False},
-            ],
-            "Sync": [
-                {"name": "reserve0", "type": "uint112", "indexed": False},
-                {"name": "reserve1", "type": "uint112", "indexed": False},
-            ],
-            "Mint": [
-                {"name": "sender", "type": "address", "indexed": True},
-                {"name": "amount0", "type": "uint256", "indexed": False},
-                {"name": "amount1", "type": "uint256", "indexed": False},
-            ],
-            "Burn": [
-                {"name": "sender", "type": "address", "indexed": True},
-                {"name": "amount0", "type": "uint256", "indexed": False},
-                {"name": "amount1", "type": "uint256", "indexed": False},
-                {"name": "to", "type": "address", "indexed": True},
-            ],
-        }
-    
+
+    @staticmethod
+    def topics(*names: str) -> List[str]:
+        """topic0 values of the named events (all known events if none are named)."""
+        return [topic for topic, name in EVENT_SIGNATURES.items() if not names or name in names]
+
     def decode_log(self, log: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Decode a log entry"""
-        topics = log.get("topics", [])
-        data = log.get("data", "0x")
-        
-        if not topics:
+        """Decode a log entry (None for unknown events and mismatched layouts)"""
+        topics = log.get("topics") or []
+        if not topics or log.get("removed"):
             return None
-        
-        event_signature = topics[0].hex() if hasattr(topics[0], 'hex') else topics[0]
-        event_name = self.EVENT_SIGNATURES.get(event_signature)
-        
-        if not event_name:
+
+        topics = [_as_bytes(topic) for topic in topics]
+        decoder = DECODERS.get(topics[0])
+        if decoder is None:
+            return None
+
+        params = decoder.decode(topics, _as_bytes(log.get("data") or b""))
+        if params is None:
             return None
-        
-        decoded = {
-            "name": event_name,
-            "address": log.get("address"),
+
+        transaction_hash = log.get("transactionHash")
+        return {
+            "name": decoder.name,
+            "address": (log.get("address") or "").lower(),
             "block_number": log.get("blockNumber"),
-            "transaction_hash": log.get("transactionHash"),
-            "params": {}
+            "transaction_hash": transaction_hash.hex() if hasattr(transaction_hash, "hex") else transaction_hash,
+            "log_index": log.get("logIndex"),
+            "params": params,
         }
-        
-        # Decode parameters (simplified - in production use contract ABI)
-        if event_name in self.EVENT_PARAMS:
-            params = self.EVENT_PARAMS[event_name]
-            topic_index = 1
-            
-            for param in params:
-                if param["indexed"]:
-                    if topic_index < len(topics):
-                        value = topics[topic_index].hex()
-                        decoded["params"][param["name"]] = value
-                        topic_index += 1
-            
-            # Non-indexed params are in data
-            if data and data != "0x":
-                decoded["params"]["data"] = data
-        
-        return decoded
\ No newline at end of file
+
+    def decode_batch(self, logs: Iterable[Dict[str, Any]]) -> Dict[str, EventColumns]:
+        """
+        Decode logs column-wise, one EventColumns per event signature (keyed
+        by topic0). Unknown events and mismatched layouts are dropped.
+        """
+        groups: Dict[Union[bytes, str], List[Dict[str, Any]]] = defaultdict(list)
+        for log in logs:
+            topics = log.get("topics")
+            if topics and not log.get("removed"):
+                topic = topics[0]
+                groups[topic.lower() if isinstance(topic, str) else topic].append(log)
+
+        batches = {}
+        for topic, group in groups.items():
+            decoder = DECODERS.get(_as_bytes(topic))
+            if decoder is not None:
+                batches[decoder.topic] = decoder.decode_columns(group)
+        return batches
@@ -0,0 +1,34 @@
+import logging
+from typing import AsyncIterator
+from web3 import AsyncWeb3
+from web3.providers import WebsocketProviderV2
+
+logger = logging.getLogger(__name__)
+
+
+class HeadSubscriber:
+    """
+    Streams new block numbers from an `eth_subscribe("newHeads")` WebSocket
+    subscription.
+
+    `heads()` returns when the connection closes and raises on socket
+    errors; the listener is expected to fall back to polling and backfill
+    whatever it missed.
+    """
+
+    def __init__(self, ws_url: str, chain: str):
+        self.ws_url = ws_url
+        self.chain = chain
+
+    async def heads(self) -> AsyncIterator[int]:
+        """Yield the number of every new head as soon as the node announces it."""
+        async with AsyncWeb3.persistent_websocket(WebsocketProviderV2(self.ws_url)) as w3:
+            subscription_id = await w3.eth.subscribe("newHeads")
+            logger.info(f"Subscribed to {self.chain} newHeads ({subscription_id})")
+
+            async for message in w3.ws.process_subscriptions():
+                head = message.get("result") or {}
+                number = head.get("number")
+                if number is None:
+                    continue
+                yield int(number, 16) if isinstance(number, str) else number
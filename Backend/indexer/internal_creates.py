@@ -0,0 +1,142 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from web3 import AsyncWeb3
+
+from config.chains import TRANSFER_EVENT
+from utils.rpc_batch import BatchRPC, RPCMethodUnsupportedError
+
+logger = logging.getLogger(__name__)
+
+# Strategies in the order "auto" tries them
+STRATEGIES = ("debug", "parity", "logs")
+
+CREATE_FRAME_TYPES = ("CREATE", "CREATE2")
+
+# (lowercase tx hash, lowercase contract address)
+InternalCreate = Tuple[str, str]
+
+
+class InternalCreateFinder:
+    """
+    Finds contracts deployed from inside a transaction (factory and
+    launchpad CREATE/CREATE2), which never show up as `to is None` txs.
+
+    Costs one call per block: geth `debug_traceBlockByNumber` with the
+    callTracer, else parity `trace_block`. When the node offers neither,
+    it falls back to a log heuristic: tokens minted (Transfer from 0x0) by
+    a contract that had no code at the previous block.
+    """
+
+    def __init__(self, w3: AsyncWeb3, chain: str, mode: str,
+                 get_receipts: Callable[[int, List[Any]], Awaitable[Dict[str, Dict[str, Any]]]],
+                 rpc: Optional[BatchRPC] = None):
+        self.chain = chain
+        self.rpc = rpc or BatchRPC(w3)
+        self.get_receipts = get_receipts
+        self.strategies = list(STRATEGIES) if mode == "auto" else [mode]
+
+    async def find(self, block_number: int, block: Dict[str, Any]) -> List[InternalCreate]:
+        """Return the contracts created by internal calls in a block."""
+        while self.strategies:
+            strategy = self.strategies[0]
+            try:
+                if strategy == "debug":
+                    return await self._from_call_tracer(block_number, block)
+                if strategy == "parity":
+                    return await self._from_trace_block(block_number)
+                return await self._from_logs(block_number, block)
+            except RPCMethodUnsupportedError as e:
+                self.strategies.pop(0)
+                fallback = self.strategies[0] if self.strategies else "none"
+                logger.info(f"{self.chain} node can't serve {strategy} traces ({e}); falling back to {fallback}")
+        return []
+
+    async def _from_call_tracer(self, block_number: int, block: Dict[str, Any]) -> List[InternalCreate]:
+        traces = await self.rpc.debug_trace_block(block_number)
+        if traces is None:
+            logger.error(f"Failed to trace {self.chain} block {block_number}")
+            return []
+
+        transactions = block.get("transactions", [])
+        found: List[InternalCreate] = []
+        for i, item in enumerate(traces):
+            tx_hash = item.get("txHash")
+            if tx_hash is None and i < len(transactions):
+                tx_hash = transactions[i].get("hash")
+            frame = item.get("result") or {}
+            # The top frame is the tx itself; top-level deploys are handled elsewhere
+            if frame.get("error"):
+                continue
+            for child in frame.get("calls") or []:
+                _walk_call_frame(child, _key(tx_hash), found)
+        return found
+
+    async def _from_trace_block(self, block_number: int) -> List[InternalCreate]:
+        traces = await self.rpc.trace_block(block_number)
+        if traces is None:
+            logger.error(f"Failed to trace {self.chain} block {block_number}")
+            return []
+
+        # A create inside a reverted call is reverted too
+        failed: Set[Tuple[str, Tuple[int, ...]]] = {
+            (_key(t.get("transactionHash")), tuple(t.get("traceAddress") or []))
+            for t in traces if t.get("error")
+        }
+
+        found: List[InternalCreate] = []
+        for trace in traces:
+            path = tuple(trace.get("traceAddress") or [])
+            if trace.get("type") != "create" or not path or trace.get("error"):
+                continue
+            tx_hash = _key(trace.get("transactionHash"))
+            if any((tx_hash, path[:depth]) in failed for depth in range(len(path))):
+                continue
+            address = (trace.get("result") or {}).get("address")
+            if address:
+                found.append((tx_hash, address.lower()))
+        return found
+
+    async def _from_logs(self, block_number: int, block: Dict[str, Any]) -> List[InternalCreate]:
+        calls = [tx.get("hash") for tx in block.get("transactions", []) if tx.get("to") is not None]
+        if not calls:
+            return []
+
+        receipts = await self.get_receipts(block_number, calls)
+        candidates: Dict[str, str] = {}
+        for tx_hash in calls:
+            receipt = receipts.get(_key(tx_hash))
+            for log in (receipt or {}).get("logs", []):
+                if _is_mint(log.get("topics") or []):
+                    candidates.setdefault(log["address"].lower(), _key(tx_hash))
+
+        if not candidates:
+            return []
+
+        # Only contracts that didn't exist before this block were created in it
+        addresses = list(candidates)
+        previous = await self.rpc.get_code(addresses, block=hex(block_number - 1))
+        return [
+            (candidates[address], address)
+            for address, code in zip(addresses, previous)
+            if code is not None and len(code) == 0
+        ]
+
+
+def _walk_call_frame(frame: Dict[str, Any], tx_hash: str, found: List[InternalCreate]):
+    if frame.get("error"):
+        return  # reverted, along with everything it created
+    if frame.get("type") in CREATE_FRAME_TYPES and frame.get("to"):
+        found.append((tx_hash, frame["to"].lower()))
+    for child in frame.get("calls") or []:
+        _walk_call_frame(child, tx_hash, found)
+
+
+def _is_mint(topics: Sequence[Any]) -> bool:
+    if len(topics) < 3 or _key(topics[0]) != TRANSFER_EVENT:
+        return False
+    sender = topics[1]
+    return int(sender.hex() if hasattr(sender, "hex") else sender, 16) == 0
+
+
+def _key(value: Any) -> str:
+    return (value.hex() if hasattr(value, "hex") else str(value)).lower()
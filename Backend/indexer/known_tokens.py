@@ -0,0 +1,50 @@
+import logging
+from typing import Dict
+
+from config.settings import settings
+from db.session import SessionLocal
+from db.models import Token
+from utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+class KnownTokens:
+    """
+    Per-chain Bloom filter of token addresses already in the `tokens` table.
+
+    A miss means the address is definitely new, so the detector skips the
+    existence query; only possible hits go to the database.
+    """
+
+    def __init__(self, chain: str):
+        self.chain = chain
+        self.filter = BloomFilter(settings.KNOWN_TOKENS_CAPACITY, settings.KNOWN_TOKENS_ERROR_RATE)
+        self._load()
+
+    def _load(self):
+        db = SessionLocal()
+        try:
+            rows = db.query(Token.address).filter(Token.chain == self.chain).yield_per(10000)
+            for (address,) in rows:
+                self.filter.add(address)
+        finally:
+            db.close()
+        logger.info(f"Loaded {self.filter.count} known {self.chain} tokens into the Bloom filter")
+
+    def might_contain(self, address: str) -> bool:
+        return address.lower() in self.filter
+
+    def add(self, address: str):
+        self.filter.add(address.lower())
+
+
+_known: Dict[str, KnownTokens] = {}
+
+
+def get_known_tokens(chain: str) -> KnownTokens:
+    """The process-wide filter of a chain, warmed from the database on first use."""
+    known = _known.get(chain)
+    if known is None:
+        known = _known[chain] = KnownTokens(chain)
+    return known
@@ -0,0 +1,161 @@
+import asyncio
+import inspect
+import logging
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple, Union
+from web3 import AsyncWeb3
+
+from config.settings import settings
+from indexer.event_decoder import EventColumns, EventDecoder
+from utils.rpc_batch import BatchRPC
+
+logger = logging.getLogger(__name__)
+
+# Events the ingestion stage pulls by default
+DEFAULT_EVENTS = ("Transfer", "Sync", "Mint", "Burn", "Swap", "Initialize", "PoolCreated", "PairCreated")
+
+# Fragments of the errors nodes return when a getLogs range is too large
+# ("query returned more than 10000 results", "block range too large",
+# "Log response size exceeded", "exceed maximum block range", ...)
+_RANGE_ERROR_MARKERS = (
+    "block range",
+    "query returned more than",
+    "response size exceeded",
+    "too many results",
+    "-32005",
+)
+# Infura / Alchemy "limit exceeded"
+LIMIT_EXCEEDED = -32005
+
+Consumer = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+def _is_range_error(error: Exception) -> bool:
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    payload = error.args[0] if error.args else None
+    if isinstance(payload, dict) and payload.get("code") == LIMIT_EXCEEDED:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in _RANGE_ERROR_MARKERS)
+
+
+class LogIngestor:
+    """
+    Pulls eth_getLogs for a set of events over block ranges and streams the
+    decoded events, in (block, log index) order, to the consumers subscribed
+    to them.
+
+    Ranges are requested in windows of up to `max_range` blocks. When a node
+    refuses a window for returning too many results, it is split in half and
+    retried; the smaller window is kept and grown back gradually, so busy
+    stretches don't keep paying for rejected requests.
+    """
+
+    def __init__(self, w3: AsyncWeb3, chain: str, events: Sequence[str] = DEFAULT_EVENTS,
+                 addresses: Optional[List[str]] = None, max_range: Optional[int] = None,
+                 rpc: Optional[BatchRPC] = None):
+        self.w3 = w3
+        self.chain = chain
+        self.rpc = rpc or BatchRPC(w3)
+        self.decoder = EventDecoder(w3)
+        self.events = tuple(events)
+        self.addresses = [AsyncWeb3.to_checksum_address(a) for a in addresses] if addresses else None
+        self.max_range = max(1, max_range or settings.LOG_RANGE_BLOCKS)
+        self.range = self.max_range
+        self.consumers: List[Tuple[Consumer, FrozenSet[str]]] = []
+        self.topics: List[str] = []
+
+    def subscribe(self, consumer: Consumer, events: Optional[Sequence[str]] = None):
+        """
+        Register a (sync or async) callable for the named events (default: all
+        of the ingestor's events). Only topics some consumer wants are fetched.
+        """
+        wanted = frozenset(events or self.events) & frozenset(self.events)
+        self.consumers.append((consumer, wanted))
+        subscribed = set().union(*(names for _, names in self.consumers))
+        self.topics = self.decoder.topics(*subscribed)
+
+    async def ingest(self, start_block: int, end_block: int) -> int:
+        """Stream the events of [start_block, end_block] to their consumers; returns the event count."""
+        if not self.topics:
+            return 0
+
+        count = 0
+        async with aclosing(self.stream(start_block, end_block)) as events:
+            async for event in events:
+                for consumer, names in self.consumers:
+                    if event["name"] not in names:
+                        continue
+                    result = consumer(event)
+                    if inspect.isawaitable(result):
+                        await result
+                count += 1
+        return count
+
+    async def stream(self, start_block: int, end_block: int) -> AsyncIterator[Dict[str, Any]]:
+        """Yield decoded events in [start_block, end_block]."""
+        async with aclosing(self._windows(start_block, end_block)) as windows:
+            async for logs in windows:
+                for log in logs:
+                    event = self.decoder.decode_log(log)
+                    if event is not None:
+                        yield event
+
+    async def batches(self, start_block: int, end_block: int) -> AsyncIterator[Dict[str, EventColumns]]:
+        """Yield each window of [start_block, end_block] decoded column-wise, keyed by topic0."""
+        async with aclosing(self._windows(start_block, end_block)) as windows:
+            async for logs in windows:
+                yield self.decoder.decode_batch(logs)
+
+    async def _windows(self, start_block: int, end_block: int) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Raw logs of [start_block, end_block], one list per window. The next
+        window is fetched while the consumer works through the current one.
+        """
+        next_block = start_block
+        pending: Optional[asyncio.Task] = None
+
+        def schedule() -> Optional[asyncio.Task]:
+            nonlocal next_block
+            if next_block > end_block:
+                return None
+            window_end = min(end_block, next_block + self.range - 1)
+            task = asyncio.create_task(self._get_logs(next_block, window_end))
+            next_block = window_end + 1
+            return task
+
+        try:
+            pending = schedule()
+            while pending is not None:
+                logs = await pending
+                pending = schedule()
+                yield logs
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def _get_logs(self, start_block: int, end_block: int) -> List[Dict[str, Any]]:
+        """Logs of one window, split recursively while the node caps the response."""
+        params: Dict[str, Any] = {"fromBlock": start_block, "toBlock": end_block, "topics": [self.topics or self.decoder.topics(*self.events)]}
+        if self.addresses:
+            params["address"] = self.addresses
+
+        try:
+            logs = await self.rpc.get_logs(params)
+        except Exception as e:
+            if start_block == end_block or not _is_range_error(e):
+                raise
+            span = end_block - start_block + 1
+            self.range = max(1, min(self.range, span // 2))
+            logger.debug(
+                f"{self.chain} getLogs {start_block}-{end_block} refused ({e}); "
+                f"splitting, window now {self.range} blocks"
+            )
+            middle = start_block + span // 2 - 1
+            return await self._get_logs(start_block, middle) + await self._get_logs(middle + 1, end_block)
+
+        # Grow back towards the configured window after a full-size success
+        if end_block - start_block + 1 >= self.range and self.range < self.max_range:
+            self.range = min(self.max_range, self.range + max(1, self.range // 4))
+        return logs
@@ -0,0 +1,136 @@
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from web3 import AsyncWeb3
+
+from db.session import SessionLocal
+from db.models import BlockHash, ContractAnalysis, DexPool, ProcessedBlock, Token
+from utils.rpc_batch import BatchRPC
+
+logger = logging.getLogger(__name__)
+
+# Block headers fetched per request while searching for the fork point
+FORK_SEARCH_BATCH = 16
+
+
+class BlockHashWindow:
+    """
+    Rolling window of the last `depth` block hashes seen by a listener.
+
+    Every new block's parentHash is checked against the hash recorded for
+    the block before it. On a mismatch the window is walked back against
+    the node's canonical chain to find the highest block both agree on.
+    """
+
+    def __init__(self, w3: AsyncWeb3, chain: str, depth: int):
+        self.chain = chain
+        self.depth = max(1, depth)
+        self.rpc = BatchRPC(w3)
+        self.hashes: "OrderedDict[int, str]" = OrderedDict()
+
+    def load(self):
+        """Warm the window from the hashes persisted with the last checkpoint."""
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(BlockHash)
+                .filter(BlockHash.chain == self.chain)
+                .order_by(BlockHash.block_number.desc())
+                .limit(self.depth)
+                .all()
+            )
+            self.hashes = OrderedDict((row.block_number, row.hash) for row in reversed(rows))
+        finally:
+            db.close()
+        logger.info(f"Loaded {len(self.hashes)} {self.chain} block hashes for reorg detection")
+
+    def is_continuous(self, block_number: int, block: Dict[str, Any]) -> bool:
+        """False if the block's parent differs from the hash recorded for block_number - 1."""
+        expected = self.hashes.get(block_number - 1)
+        if expected is None:
+            return True
+        return _hex(block.get("parentHash")) == expected
+
+    def record(self, block_number: int, block_hash: str):
+        self.hashes[block_number] = block_hash
+        self.hashes.move_to_end(block_number)
+        while len(self.hashes) > self.depth:
+            self.hashes.popitem(last=False)
+
+    def truncate(self, block_number: int):
+        """Forget every hash above block_number."""
+        for n in [n for n in self.hashes if n > block_number]:
+            del self.hashes[n]
+
+    async def find_fork_point(self, below: int) -> Tuple[int, Optional[str]]:
+        """
+        Return (block_number, hash) of the highest recorded block below `below`
+        that is still canonical.
+
+        If the reorg is deeper than the window, the block just under the
+        window is returned with an unknown hash.
+        """
+        candidates = sorted((n for n in self.hashes if n < below), reverse=True)
+        for i in range(0, len(candidates), FORK_SEARCH_BATCH):
+            numbers = candidates[i:i + FORK_SEARCH_BATCH]
+            headers = await self.rpc.get_blocks(numbers, full_transactions=False)
+            for n, header in zip(numbers, headers):
+                if header is None:
+                    raise RuntimeError(f"could not fetch {self.chain} block {n} during fork search")
+                if _hex(header.get("hash")) == self.hashes[n]:
+                    return n, self.hashes[n]
+
+        lowest = candidates[-1] if candidates else below
+        logger.error(
+            f"{self.chain} reorg is deeper than the {self.depth}-block window; "
+            f"rolling back to block {lowest - 1}"
+        )
+        return lowest - 1, None
+
+
+def rollback_to(chain: str, block_number: int, block_hash: Optional[str]) -> int:
+    """
+    Unwind persisted state above block_number: tokens deployed in orphaned
+    blocks (with their analyses), pools created in them, their block hashes
+    and the checkpoint.
+
+    Returns the number of tokens removed.
+    """
+    db = SessionLocal()
+    try:
+        tokens = db.query(Token).filter(
+            Token.chain == chain, Token.deployed_block > block_number
+        ).all()
+        addresses = [token.address for token in tokens]
+
+        if addresses:
+            db.query(ContractAnalysis).filter(
+                ContractAnalysis.token_address.in_(addresses)
+            ).delete(synchronize_session=False)
+        for token in tokens:
+            db.delete(token)  # cascades to pools and risk history
+
+        db.query(DexPool).filter(
+            DexPool.chain == chain, DexPool.created_at_block > block_number
+        ).delete(synchronize_session=False)
+        db.query(BlockHash).filter(
+            BlockHash.chain == chain, BlockHash.block_number > block_number
+        ).delete(synchronize_session=False)
+        db.query(ProcessedBlock).filter(
+            ProcessedBlock.chain == chain, ProcessedBlock.block_number > block_number
+        ).update({"block_number": block_number, "hash": block_hash}, synchronize_session=False)
+
+        db.commit()
+        return len(addresses)
+    except Exception as e:
+        logger.error(f"Failed to roll back {chain} to block {block_number}: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _hex(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return (value.hex() if hasattr(value, "hex") else str(value)).lower()
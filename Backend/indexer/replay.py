@@ -0,0 +1,96 @@
+"""
+Sentinel Ledger — Archive Replay
+
+Usage:
+    python -m indexer.replay --chain base [--from-block N] [--to-block M] [--no-analysis]
+
+Re-runs block processing over blocks stored in ARCHIVE_DIR (see
+indexer.archive) instead of fetching them from the node, e.g. after a
+classifier fix. Blocks, receipts, traces and bytecode are read from
+memory-mapped archive files; only what the archive doesn't hold (proxy
+storage, code of contracts it never saw) still goes to the node.
+
+The range defaults to everything archived for the chain. Detected tokens are
+inserted like the backfill's, but the live checkpoint is never moved.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from typing import List, Optional
+
+from config.settings import settings
+from config.chains import CHAINS, ChainConfig
+from indexer.archive import ArchiveRPC, BlockArchive
+from indexer.block_fetcher import BlockFetcher
+from indexer.block_processor import BlockProcessor
+from indexer.checkpoint import ReplayCheckpoint
+from utils.web3_client import close_shared_session, get_async_web3
+
+logger = logging.getLogger("indexer.replay")
+
+
+async def replay(chain: ChainConfig, archive: BlockArchive, from_block: int, to_block: int,
+                 trigger_analysis: bool) -> int:
+    """Process archived blocks [from_block, to_block]; returns the number of blocks replayed."""
+    rpc = ArchiveRPC(archive)
+    w3 = get_async_web3(chain.get_rpc_url(), poa=chain.poa, pool_size=chain.rpc_pool_size)
+    fetcher = BlockFetcher(w3, chain.name, concurrency=1, batch_size=chain.fetch_batch, rpc=rpc)
+    processor = BlockProcessor(w3, chain.name, rpc=rpc)
+    checkpoint = ReplayCheckpoint(chain.name, from_block, trigger_analysis=trigger_analysis)
+
+    replayed = 0
+    try:
+        async for block_num, block in fetcher.iter_blocks(from_block, to_block):
+            if block is None:
+                continue  # gap in the archive
+            tokens = await processor.process_block(block_num, block)
+            checkpoint.advance(block_num, block.hash.hex(), tokens)
+            if checkpoint.due() and not checkpoint.flush():
+                raise RuntimeError(f"checkpoint failed at block {block_num}")
+            replayed += 1
+
+        if not checkpoint.flush():
+            raise RuntimeError("final checkpoint failed")
+    finally:
+        await close_shared_session()
+    return replayed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay archived blocks through the block pipeline")
+    parser.add_argument("--chain", choices=sorted(CHAINS), required=True)
+    parser.add_argument("--from-block", type=int, default=None)
+    parser.add_argument("--to-block", type=int, default=None)
+    parser.add_argument("--no-analysis", action="store_true",
+                        help="don't enqueue analysis jobs for newly detected tokens")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+    if not settings.ARCHIVE_DIR:
+        logger.error("ARCHIVE_DIR is not set")
+        return 1
+
+    chain = CHAINS[args.chain]
+    archive = BlockArchive(settings.ARCHIVE_DIR, chain.name)
+    ranges = archive.ranges()
+    if not ranges:
+        logger.error(f"No archived {chain.name} blocks in {settings.ARCHIVE_DIR}")
+        return 1
+
+    from_block = args.from_block if args.from_block is not None else ranges[0][0]
+    to_block = args.to_block if args.to_block is not None else ranges[-1][1]
+
+    logger.info(f"Replaying archived {chain.name} blocks {from_block} to {to_block}")
+    replayed = asyncio.run(replay(chain, archive, from_block, to_block, not args.no_analysis))
+    logger.info(f"Replayed {replayed} {chain.name} blocks")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
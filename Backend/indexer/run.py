@@ -4,7 +4,7 @@ Sentinel Ledger — Indexer Entry Point
 Usage:
     python -m indexer.run
 
-Starts both the Base and Ethereum block listeners concurrently,
+Starts one block listener per chain in INDEXER_CHAINS concurrently,
 plus the background task scheduler for pending token analyses.
 """
 import asyncio
@@ -13,11 +13,12 @@ import signal
 import sys
 
 from config.settings import settings
-from indexer.base_listener import BaseListener
-from indexer.ethereum_listener import EthereumListener
+from config.chains import CHAINS
+from indexer.chain_listener import ChainListener
 from tasks.scheduler import Scheduler
 from tasks.job_runner import JobRunner
 from db.session import engine
+from utils.web3_client import close_shared_session
 from db.models import Base
 
 # ---------------------------------------------------------------------------
@@ -46,8 +47,10 @@ def init_db() -> None:
 async def main() -> None:
     init_db()
 
-    base_listener = BaseListener()
-    eth_listener = EthereumListener()
+    listeners = [
+        ChainListener(CHAINS[name.strip()])
+        for name in settings.INDEXER_CHAINS.split(",") if name.strip()
+    ]
     job_runner = JobRunner()
     scheduler = Scheduler()
 
@@ -63,8 +66,8 @@ async def main() -> None:
 
     def _handle_signal():
         logger.info("Shutdown signal received, stopping listeners…")
-        base_listener.stop()
-        eth_listener.stop()
+        for listener in listeners:
+            listener.stop()
         scheduler.stop()
 
     for sig in (signal.SIGINT, signal.SIGTERM):
@@ -72,11 +75,13 @@ async def main() -> None:
 
     logger.info("Starting Sentinel Ledger indexer…")
 
-    await asyncio.gather(
-        base_listener.run(),
-        eth_listener.run(),
-        scheduler.run_forever(),
-    )
+    try:
+        await asyncio.gather(
+            *(listener.run() for listener in listeners),
+            scheduler.run_forever(),
+        )
+    finally:
+        await close_shared_session()
 
 
 if __name__ == "__main__":
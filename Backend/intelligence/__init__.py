@@ -2,5 +2,6 @@ from intelligence.ownership_analyzer import OwnershipAnalyzer
 from intelligence.deployer_profiler import DeployerProfiler
 from intelligence.crosschain_analyzer import CrossChainAnalyzer
 from intelligence.wallet_graph import WalletGraph
+from intelligence.clone_index import CloneIndex
 
-__all__ = ["OwnershipAnalyzer", "DeployerProfiler", "CrossChainAnalyzer", "WalletGraph"]
\ No newline at end of file
+__all__ = ["OwnershipAnalyzer", "DeployerProfiler", "CrossChainAnalyzer", "WalletGraph", "CloneIndex"]
\ No newline at end of file
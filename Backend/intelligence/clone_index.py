@@ -0,0 +1,215 @@
+import logging
+import random
+import time
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import func
+from web3 import Web3
+
+from db.session import SessionLocal
+from db.models import BytecodeFingerprint, Token
+from utils.bytecode import Bytecode, normalize, opcodes
+
+logger = logging.getLogger(__name__)
+
+# MinHash / LSH parameters: 16 bands of 4 rows put two contracts in a common
+# bucket with ~50% probability at Jaccard 0.5 and >99% at 0.8
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+NGRAM = 4
+MIN_SIMILARITY = 0.8
+
+# Family risk profiles are re-aggregated from analyzed tokens this often
+PROFILE_REFRESH_SECONDS = 300
+
+_PRIME = (1 << 61) - 1
+# Fixed seed: signatures are persisted and must be comparable across processes
+_rng = random.Random(0x1167)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def shingles(bytecode: Bytecode) -> Set[int]:
+    """Opcode n-grams of the code (PUSH data and metadata ignored), as ints."""
+    ops = opcodes(bytecode)
+    return {int.from_bytes(ops[i:i + NGRAM], "big") for i in range(len(ops) - NGRAM + 1)}
+
+
+def minhash(features: Set[int]) -> array:
+    """MinHash signature of a feature set."""
+    if not features:
+        return array("Q", [0] * NUM_PERM)
+    return array("Q", [min((a * x + b) % _PRIME for x in features) for a, b in _PERMUTATIONS])
+
+
+def bytecode_signature(bytecode: Bytecode) -> array:
+    """MinHash signature of a bytecode; CPU-bound, so async callers run it in an executor."""
+    return minhash(shingles(bytecode))
+
+
+def similarity(a: array, b: array) -> float:
+    """Estimated Jaccard similarity of the sets behind two signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+@dataclass
+class FamilyMatch:
+    family_id: str
+    fingerprint: str
+    similarity: float  # 1.0 for exact normalized matches
+
+
+class CloneIndex:
+    """
+    Groups tokens into clone families.
+
+    A family is keyed by the hash of its first member's normalized bytecode
+    (metadata and immutables stripped). A new contract joins a family on an
+    exact normalized match, or when its MinHash signature is at least
+    MIN_SIMILARITY close to a member found through LSH band buckets;
+    otherwise it starts a family of its own. The index lives in memory and
+    is warmed from `bytecode_fingerprints` on first use.
+
+    Family risk profiles are kept in memory too: analyses finish in the
+    workers, so they are re-aggregated for all families at once every
+    PROFILE_REFRESH_SECONDS rather than queried per token.
+    """
+
+    def __init__(self):
+        self._loaded = False
+        self._families: Dict[str, str] = {}  # bytecode_hash -> family_id
+        self._fingerprints: Dict[str, str] = {}  # fingerprint -> family_id
+        self._signatures: Dict[str, array] = {}  # bytecode_hash -> MinHash
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = defaultdict(list)
+        self._profiles: Dict[str, Optional[Dict[str, Any]]] = {}  # family_id -> risk profile
+        self._profiles_at = float("-inf")
+
+    def load(self):
+        db = SessionLocal()
+        try:
+            for row in db.query(BytecodeFingerprint).yield_per(1000):
+                self._add(row.bytecode_hash, row.fingerprint, row.family_id, array("Q", bytes(row.minhash)))
+        finally:
+            db.close()
+        self._loaded = True
+        logger.info(f"Loaded {len(self._families)} bytecode fingerprints into the clone index")
+
+    def family_of(self, bytecode_hash: str) -> Optional[str]:
+        """Family of an already indexed bytecode, if any."""
+        if not self._loaded:
+            self.load()
+        return self._families.get(bytecode_hash)
+
+    def assign(self, bytecode_hash: str, bytecode: Bytecode, signature: Optional[array] = None) -> str:
+        """
+        Return the family of a bytecode, indexing it if it is new. Pass its
+        `bytecode_signature` if it was already computed off the event loop.
+        """
+        family_id = self.family_of(bytecode_hash)
+        if family_id is not None:
+            return family_id
+
+        if signature is None:
+            signature = bytecode_signature(bytecode)
+        match = self.nearest(bytecode, signature)
+        fingerprint = match.fingerprint
+        family_id = match.family_id or fingerprint
+
+        self._add(bytecode_hash, fingerprint, family_id, signature)
+        self._persist(bytecode_hash, fingerprint, family_id, signature)
+        return family_id
+
+    def nearest(self, bytecode: Bytecode, signature: Optional[array] = None) -> FamilyMatch:
+        """Find the family closest to a bytecode (empty family_id if none is close enough)."""
+        fingerprint = Web3.keccak(normalize(bytecode)).hex()
+        family_id = self._fingerprints.get(fingerprint)
+        if family_id is not None:
+            return FamilyMatch(family_id, fingerprint, 1.0)
+
+        if signature is None:
+            signature = bytecode_signature(bytecode)
+
+        best_id, best_score = "", 0.0
+        for candidate in self._candidates(signature):
+            score = similarity(signature, self._signatures[candidate])
+            if score > best_score:
+                best_id, best_score = self._families[candidate], score
+
+        if best_score >= MIN_SIMILARITY:
+            return FamilyMatch(best_id, fingerprint, best_score)
+        return FamilyMatch("", fingerprint, best_score)
+
+    def family_profile(self, family_id: str) -> Optional[Dict[str, Any]]:
+        """Aggregate risk of the already analyzed tokens of a family."""
+        if time.monotonic() - self._profiles_at >= PROFILE_REFRESH_SECONDS:
+            self._refresh_profiles()
+        return self._profiles.get(family_id)
+
+    def _refresh_profiles(self):
+        db = SessionLocal()
+        try:
+            analyzed = (Token.family_id.isnot(None), Token.analyzed_at.isnot(None))
+            totals = db.query(
+                Token.family_id, func.count(Token.address), func.avg(Token.contract_score), func.avg(Token.final_score)
+            ).filter(*analyzed).group_by(Token.family_id).all()
+            latest = dict(db.query(Token.family_id, Token.risk_level).filter(*analyzed).order_by(
+                Token.family_id, Token.analyzed_at.desc()
+            ).distinct(Token.family_id).all())
+        except Exception as e:
+            # Keep serving the previous profiles; retried on the next call
+            logger.error(f"Failed to refresh clone family profiles: {e}")
+            return
+        finally:
+            db.close()
+
+        self._profiles = {
+            family_id: {
+                "analyzed_tokens": count,
+                "contract_score": float(contract_score or 0.0),
+                "final_score": float(final_score or 0.0),
+                "risk_level": latest.get(family_id) or "UNKNOWN",
+            }
+            for family_id, count, contract_score, final_score in totals
+        }
+        # Families indexed since have no analyzed tokens yet
+        for family_id in set(self._families.values()):
+            self._profiles.setdefault(family_id, None)
+        self._profiles_at = time.monotonic()
+
+    def _candidates(self, signature: array) -> Set[str]:
+        candidates: Set[str] = set()
+        for band in range(BANDS):
+            key = (band, tuple(signature[band * ROWS:(band + 1) * ROWS]))
+            candidates.update(self._buckets.get(key, ()))
+        return candidates
+
+    def _add(self, bytecode_hash: str, fingerprint: str, family_id: str, signature: array):
+        self._families[bytecode_hash] = family_id
+        self._fingerprints.setdefault(fingerprint, family_id)
+        self._signatures[bytecode_hash] = signature
+        # A new family has nothing analyzed until the next refresh
+        self._profiles.setdefault(family_id, None)
+        for band in range(BANDS):
+            self._buckets[(band, tuple(signature[band * ROWS:(band + 1) * ROWS]))].append(bytecode_hash)
+
+    def _persist(self, bytecode_hash: str, fingerprint: str, family_id: str, signature: array):
+        db = SessionLocal()
+        try:
+            db.merge(BytecodeFingerprint(
+                bytecode_hash=bytecode_hash,
+                fingerprint=fingerprint,
+                family_id=family_id,
+                minhash=signature.tobytes(),
+            ))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to store fingerprint for {bytecode_hash}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+
+# Process-wide index shared by the contract detector
+clone_index = CloneIndex()
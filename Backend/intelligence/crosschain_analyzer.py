@@ -1,11 +1,11 @@
 import logging
 from typing import Dict, Any, Optional, List
-from web3 import Web3
+from web3 import AsyncWeb3
 
 logger = logging.getLogger(__name__)
 
 class CrossChainAnalyzer:
-    def __init__(self, w3_base: Web3, w3_eth: Optional[Web3] = None):
+    def __init__(self, w3_base: AsyncWeb3, w3_eth: Optional[AsyncWeb3] = None):
         self.w3_base = w3_base
         self.w3_eth = w3_eth
     
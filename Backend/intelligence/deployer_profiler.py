@@ -1,7 +1,7 @@
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
-from web3 import Web3
+from web3 import AsyncWeb3
 
 from db.session import SessionLocal
 from db.models import Wallet, Token
@@ -10,7 +10,7 @@ from intelligence.crosschain_analyzer import CrossChainAnalyzer
 logger = logging.getLogger(__name__)
 
 class DeployerProfiler:
-    def __init__(self, w3_base: Web3, w3_eth: Optional[Web3] = None):
+    def __init__(self, w3_base: AsyncWeb3, w3_eth: Optional[AsyncWeb3] = None):
         self.w3_base = w3_base
         self.w3_eth = w3_eth
         self.crosschain = CrossChainAnalyzer(w3_base, w3_eth) if w3_eth else None
@@ -1,50 +1,51 @@
 import logging
-from typing import Dict, Any, Optional, List
-from web3 import Web3
+from typing import Dict, Any, Optional, List, Set
+from web3 import AsyncWeb3, Web3
 
 from db.session import SessionLocal
 from db.models import Token, ContractAnalysis
+from utils.analysis_cache import analysis_cache
+from utils.bytecode import Bytecode, extract_selectors
+from utils.selectors import DANGEROUS_SELECTORS, OWNERSHIP_SELECTORS, SELECTOR_MATCHER
 
 logger = logging.getLogger(__name__)
 
 class OwnershipAnalyzer:
-    def __init__(self, w3: Web3, chain: str):
+    def __init__(self, w3: AsyncWeb3, chain: str):
         self.w3 = w3
         self.chain = chain
         
         # Common ownership-related function selectors
-        self.OWNERSHIP_SELECTORS = {
-            "8da5cb5b": "owner()",  # owner()
-            "f2fde38b": "transferOwnership",  # transferOwnership(address)
-            "715018a6": "renounceOwnership",  # renounceOwnership()
-            "13af4035": "setOwner",  # setOwner(address)
-        }
+        self.OWNERSHIP_SELECTORS = OWNERSHIP_SELECTORS
         
         # Dangerous function selectors
-        self.DANGEROUS_SELECTORS = {
-            "42966c68": "burn",  # burn(uint256)
-            "79cc6790": "burnFrom",  # burnFrom(address,uint256)
-            "40c10f19": "mint",  # mint(address,uint256)
-            "9dc29fac": "withdraw",  # withdraw(uint256)
-            "24d7806c": "setMinter",  # setMinter(address)
-            "9b2f3ef0": "setBlacklist",  # setBlacklist(address,bool)
-            "f9f92be4": "addToBlacklist",  # addToBlacklist(address)
-            "f0f9d4c6": "removeFromBlacklist",  # removeFromBlacklist(address)
-            "8456cb59": "pause",  # pause()
-            "3f4ba83a": "unpause",  # unpause()
-            "8f283970": "setPauser",  # setPauser(address)
-        }
+        self.DANGEROUS_SELECTORS = DANGEROUS_SELECTORS
     
-    async def analyze(self, token_address: str) -> Dict[str, Any]:
-        """Analyze token ownership and control structure"""
+    async def analyze(self, token_address: str, bytecode_hash: Optional[str] = None,
+                      code_address: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze token ownership and control structure.
+
+        With a known bytecode_hash, clones of an already analyzed contract
+        reuse its cached selectors instead of fetching and scanning the code.
+        For proxies, code_address is the implementation whose code is scanned.
+        """
         token_address = Web3.to_checksum_address(token_address)
+        code_address = Web3.to_checksum_address(code_address or token_address)
         
         try:
-            # Get contract bytecode
-            bytecode = self.w3.eth.get_code(token_address).hex()
-            
-            # Extract selectors
-            selectors = self._extract_selectors(bytecode)
+            cached = analysis_cache.get(bytecode_hash) or {}
+            if "selectors" in cached:
+                selectors = set(cached["selectors"])
+            else:
+                # Get contract bytecode
+                bytecode = await self.w3.eth.get_code(code_address)
+                bytecode_hash = Web3.keccak(bytecode).hex()
+                
+                # Extract selectors
+                selectors = self._extract_selectors(bytecode)
+            
+            profile = SELECTOR_MATCHER.match_selectors(selectors)
             
             # Check for ownership functions
             has_ownership = "8da5cb5b" in selectors
@@ -52,10 +53,14 @@ class OwnershipAnalyzer:
             has_renounce = "715018a6" in selectors
             
             # Check for dangerous functions
-            dangerous_functions = []
-            for selector, name in self.DANGEROUS_SELECTORS.items():
-                if selector in selectors:
-                    dangerous_functions.append(name)
+            dangerous_functions = profile.names("dangerous")
+            
+            if "dangerous_functions" not in cached:
+                analysis_cache.put(
+                    bytecode_hash,
+                    selectors=sorted(selectors),
+                    dangerous_functions=dangerous_functions,
+                )
             
             # Try to get current owner (if possible)
             current_owner = await self._get_owner(token_address)
@@ -115,22 +120,9 @@ class OwnershipAnalyzer:
             logger.error(f"Error analyzing ownership for {token_address}: {e}")
             return {"ownership_score": 50, "flags": ["Analysis failed"]}
     
-    def _extract_selectors(self, bytecode: str) -> List[str]:
-        """Extract function selectors from bytecode"""
-        selectors = []
-        if not bytecode or bytecode == "0x":
-            return selectors
-        
-        bytecode = bytecode.lower().replace("0x", "")
-        
-        # Look for function selectors (PUSH4 + 4 bytes)
-        for i in range(0, len(bytecode) - 10, 2):
-            if bytecode[i:i+2] == "63":  # PUSH4 opcode
-                selector = bytecode[i+2:i+10]
-                if len(selector) == 8:
-                    selectors.append(selector)
-        
-        return selectors
+    def _extract_selectors(self, bytecode: Bytecode) -> Set[str]:
+        """Extract the dispatcher's function selectors from bytecode"""
+        return extract_selectors(bytecode)
     
     async def _get_owner(self, token_address: str) -> Optional[str]:
         """Try to get the contract owner (if possible)"""
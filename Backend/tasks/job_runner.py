@@ -50,26 +50,31 @@ trigger_token_analysis = analyze_token  # type: ignore[assignment]
 # ---------------------------------------------------------------------------
 async def _run_analysis(token_address: str, chain: str) -> None:
     """Full analysis pipeline for a single ERC-20 token."""
-    from web3 import Web3
+    from web3 import AsyncWeb3
     from db.session import SessionLocal
-    from db.models import Token
+    from db.models import ContractAnalysis, Token
     from dex.liquidity_tracker import LiquidityTracker
     from intelligence.ownership_analyzer import OwnershipAnalyzer
     from intelligence.deployer_profiler import DeployerProfiler
     from risk.contract_risk import ContractRisk
     from risk.scoring_engine import ScoringEngine
     from ai.explanation_engine import ExplanationEngine
+    from utils.analysis_cache import analysis_cache
+    from utils.proxy import ProxyResolver
+    from utils.web3_client import get_async_web3
 
     logger.info(f"Starting analysis pipeline for {token_address} on {chain}")
 
-    # Build Web3 connections
-    rpc_url = settings.BASE_RPC_URL if chain == "base" else settings.ETH_RPC_URL
-    w3 = Web3(Web3.HTTPProvider(rpc_url))
+    # Shared AsyncWeb3 clients (one pooled HTTP session per process)
+    if chain == "base":
+        w3 = get_async_web3(settings.BASE_RPC_URL, poa=True)
+    else:
+        w3 = get_async_web3(settings.ETH_RPC_URL)
 
     # Optionally wire up cross-chain Ethereum web3
-    w3_eth: Optional[Web3] = None
+    w3_eth: Optional[AsyncWeb3] = None
     if chain == "base" and settings.ETH_RPC_URL:
-        w3_eth = Web3(Web3.HTTPProvider(settings.ETH_RPC_URL))
+        w3_eth = get_async_web3(settings.ETH_RPC_URL)
 
     db = SessionLocal()
     try:
@@ -83,17 +88,37 @@ async def _run_analysis(token_address: str, chain: str) -> None:
             return
 
         deployer = token.deployer
+        bytecode_hash = token.bytecode_hash
+
+        # ------------------------------------------------------------------
+        # 0. Proxy resolution (re-read: upgradeable proxies may have moved on)
+        # ------------------------------------------------------------------
+        proxy = None
+        if token.proxy_kind:
+            resolver = ProxyResolver(w3, chain)
+            proxy = await resolver.resolve(token_address)
+            if proxy is not None:
+                implementation_hash, _ = await resolver.implementation_code(proxy.implementation)
+                if implementation_hash:
+                    bytecode_hash = implementation_hash
+                    token.bytecode_hash = implementation_hash
+                    token.implementation = proxy.implementation
 
         # ------------------------------------------------------------------
         # 1. Ownership / Contract Analysis
         # ------------------------------------------------------------------
         ownership_analyzer = OwnershipAnalyzer(w3, chain)
-        ownership_result = await ownership_analyzer.analyze(token_address)
+        ownership_result = await ownership_analyzer.analyze(
+            token_address,
+            bytecode_hash=bytecode_hash,
+            code_address=proxy.implementation if proxy else None,
+        )
         ownership_score = ownership_result.get("ownership_score", 50)
 
         # ------------------------------------------------------------------
-        # 2. Contract Risk (from ownership flags)
+        # 2. Contract Risk (from ownership flags, once per bytecode)
         # ------------------------------------------------------------------
+        cached = analysis_cache.get(bytecode_hash) or {}
         contract_flags = {
             "has_mint": "mint" in ownership_result.get("dangerous_functions", []),
             "mint_restricted": True,  # conservative default
@@ -104,10 +129,22 @@ async def _run_analysis(token_address: str, chain: str) -> None:
                 "pause" in f for f in ownership_result.get("dangerous_functions", [])
             ),
             "can_change_fees": False,
-            "is_proxy": False,
+            # Minimal proxies delegate to a fixed implementation, so only upgradeable ones count
+            "is_proxy": proxy is not None and proxy.upgradeable,
             "can_withdraw": "withdraw" in ownership_result.get("dangerous_functions", []),
         }
-        contract_result = ContractRisk.calculate(contract_flags)
+        # The cached score is per implementation code, so it can't cover an upgradeable proxy in front of it
+        if "contract_score" in cached and not contract_flags["is_proxy"]:
+            contract_result = {"score": cached["contract_score"], "flags": cached.get("contract_flags", [])}
+        else:
+            contract_result = ContractRisk.calculate(contract_flags)
+            # Only a successful bytecode analysis is safe to share with clones
+            if "dangerous_functions" in ownership_result and not contract_flags["is_proxy"]:
+                analysis_cache.put(
+                    bytecode_hash,
+                    contract_score=contract_result["score"],
+                    contract_flags=contract_result["flags"],
+                )
         contract_score = contract_result["score"]
 
         # ------------------------------------------------------------------
@@ -172,6 +209,15 @@ async def _run_analysis(token_address: str, chain: str) -> None:
             # Store explanation in flags for now (could add dedicated column)
             token.flags = all_flags + [f"AI: {explanation}"]
         token.analyzed_at = datetime.utcnow()
+
+        if proxy is not None:
+            analysis = db.query(ContractAnalysis).filter(
+                ContractAnalysis.token_address == token_address.lower(),
+                ContractAnalysis.chain == chain,
+            ).first()
+            if analysis:
+                analysis.is_proxy = True
+                analysis.upgradeable = proxy.upgradeable
         db.commit()
 
         logger.info(
@@ -0,0 +1,77 @@
+import os
+import sys
+
+# Run from anywhere: the backend packages are imported top-level
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings require these; unit tests never reach a node or a database
+for name in ("BASE_RPC_URL", "ETH_RPC_URL", "POSTGRES_USER", "POSTGRES_PASSWORD", "NEO4J_PASSWORD"):
+    os.environ.setdefault(name, "test")
+
+import pytest  # noqa: E402
+
+
+class FakeSession:
+    """SessionLocal stand-in: records executed statements and merges; queries yield `rows`."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.executed = []
+        self.merged = []
+        self.queries = 0
+        self.commits = 0
+
+    def query(self, *entities):
+        self.queries += 1
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    group_by = order_by = distinct = filter
+
+    def get(self, entity, ident):
+        self.queries += 1
+        return None
+
+    def yield_per(self, count):
+        return self
+
+    def all(self):
+        return list(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def execute(self, statement, params=None):
+        self.executed.append((statement, params))
+
+    def delete(self, *args, **kwargs):
+        return 0
+
+    def update(self, values, **kwargs):
+        return 0
+
+    def merge(self, instance):
+        self.merged.append(instance)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Point a module's SessionLocal at one FakeSession: `session = fake_db(module)`."""
+    session = FakeSession()
+
+    def install(module):
+        monkeypatch.setattr(module, "SessionLocal", lambda: session)
+        return session
+
+    return install
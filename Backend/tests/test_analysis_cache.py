@@ -0,0 +1,57 @@
+import pytest
+
+import indexer.checkpoint
+import utils.analysis_cache
+from indexer.checkpoint import CheckpointWriter
+from utils.analysis_cache import AnalysisCache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """A fresh process-wide cache, shared with the checkpoint."""
+    cache = AnalysisCache(max_entries=10)
+    monkeypatch.setattr(indexer.checkpoint, "analysis_cache", cache)
+    return cache
+
+
+def test_unknown_bytecode_is_looked_up_once(cache, fake_db):
+    session = fake_db(utils.analysis_cache)
+
+    assert cache.get("0xaa") is None
+    assert cache.get("0xaa") is None
+    assert session.queries == 1
+
+    cache.buffer("0xaa", is_erc20=False)
+    assert cache.get("0xaa") == {"is_erc20": False}
+
+
+def test_buffered_analyses_commit_with_the_checkpoint(cache, fake_db):
+    session = fake_db(indexer.checkpoint)
+    cache.buffer("0xaa", is_erc20=True, selectors=["a9059cbb"])
+    cache.buffer("0xbb", is_erc20=False, selectors=[])
+    cache.buffer("0xcc", is_erc20=True)
+
+    checkpoint = CheckpointWriter("base", trigger_analysis=False)
+    checkpoint.advance(100, "0x64")
+    assert checkpoint.flush()
+
+    # One statement per field set, then the high-water mark, in one transaction
+    analyses = [params for _, params in session.executed if isinstance(params, list)]
+    assert sorted(len(rows) for rows in analyses) == [1, 2]
+    assert len(session.executed) == 3 and session.commits == 1
+    assert cache.write_buffered(session) == {}
+
+
+def test_failed_checkpoint_keeps_analyses_buffered(cache, fake_db):
+    session = fake_db(indexer.checkpoint)
+
+    def fail():
+        raise RuntimeError("connection lost")
+
+    session.commit = fail
+    cache.buffer("0xaa", is_erc20=True)
+    checkpoint = CheckpointWriter("base", trigger_analysis=False)
+    checkpoint.advance(100, "0x64")
+
+    assert not checkpoint.flush()
+    assert cache.write_buffered(session) == {"0xaa": {"is_erc20": True}}
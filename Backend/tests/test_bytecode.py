@@ -0,0 +1,47 @@
+from utils.bytecode import extract_selectors, normalize, opcodes, strip_metadata
+
+# solc dispatcher: PUSH1 0 CALLDATALOAD PUSH1 0xe0 SHR, then DUP1 PUSH4 <selector> EQ PUSH2 <dest> JUMPI
+# per function, with a GT pivot on the first
+DISPATCHER = (
+    "60003560e01c"
+    "806370a08231" "11" "610040" "57"
+    "8063a9059cbb" "14" "610050" "57"
+    "8063dd62ed3e" "14" "610060" "57"
+)
+# PUSH32 whose data looks like a dispatcher entry
+PUSH32_DECOY = "7f" + "8063deadbeef14610070570000000000000000000000000000000000000000000000"[:64]
+# CBOR metadata (a2 64 'ipfs' 58 22 <34 bytes> 64 'solc' 43 <version>) with a decoy in the hash
+METADATA_BODY = "a264697066735822" + "63cafebabe14" + "00" * 28 + "64736f6c6343000813"
+METADATA = METADATA_BODY + f"{len(METADATA_BODY) // 2:04x}"
+
+
+def test_extract_selectors_reads_dispatcher():
+    assert extract_selectors("0x" + DISPATCHER + "00") == {"70a08231", "a9059cbb", "dd62ed3e"}
+
+
+def test_extract_selectors_skips_push_data():
+    code = "0x" + PUSH32_DECOY + DISPATCHER + "00"
+    assert "deadbeef" not in extract_selectors(code)
+    assert extract_selectors(code) == {"70a08231", "a9059cbb", "dd62ed3e"}
+
+
+def test_extract_selectors_skips_metadata():
+    code = bytes.fromhex(DISPATCHER + "00fe" + METADATA)
+    assert strip_metadata(code) == bytes.fromhex(DISPATCHER + "00fe")
+    assert extract_selectors(code) == {"70a08231", "a9059cbb", "dd62ed3e"}
+
+
+def test_extract_selectors_empty():
+    assert extract_selectors(b"") == set()
+    assert extract_selectors("0x") == set()
+
+
+def test_opcodes_drop_push_data():
+    assert opcodes("0x6001600201" + PUSH32_DECOY) == bytes.fromhex("6060017f")
+
+
+def test_normalize_zeroes_immutables():
+    a = "0x73" + "11" * 20 + "31" + "7f" + "22" * 32 + "00"
+    b = "0x73" + "33" * 20 + "31" + "7f" + "44" * 32 + "00"
+    assert normalize(a) == normalize(b)
+    assert normalize("0x6001") == bytes.fromhex("6001")
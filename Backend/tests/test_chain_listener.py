@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+import indexer.checkpoint
+import indexer.known_tokens
+import indexer.reorg
+from config.chains import CHAINS
+from indexer.chain_listener import ChainListener
+
+
+def _hash(number: int, fork: str = "") -> HexBytes:
+    return HexBytes((fork + str(number)).encode().rjust(32, b"\0"))
+
+
+def _chain(head: int, fork_after: int = None):
+    """Blocks 0..head; above fork_after they belong to a competing branch."""
+    blocks = {}
+    for n in range(head + 1):
+        fork = "b" if fork_after is not None and n > fork_after else ""
+        parent_fork = "b" if fork_after is not None and n - 1 > fork_after else ""
+        blocks[n] = AttributeDict({
+            "number": n,
+            "hash": _hash(n, fork),
+            "parentHash": _hash(n - 1, parent_fork),
+            "timestamp": 1_700_000_000 + n,
+            "transactions": [],
+        })
+    return blocks
+
+
+class _Node:
+    """Stand-in for the fetcher, processor and log ingestor, serving one chain of blocks."""
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.failing_blocks = set()
+        self.failing_logs = False
+        self.ingested = []
+        self.processed = []
+
+    async def iter_blocks(self, start_block, end_block):
+        for n in range(start_block, end_block + 1):
+            yield n, self.blocks.get(n)
+
+    async def process_block(self, block_number, block):
+        if block_number in self.failing_blocks:
+            raise RuntimeError("receipts unavailable")
+        self.processed.append(block_number)
+        return []
+
+    async def ingest(self, start_block, end_block):
+        if self.failing_logs:
+            raise RuntimeError("getLogs timed out")
+        self.ingested.append((start_block, end_block))
+        return 0
+
+    async def get_blocks(self, numbers, full_transactions=False):
+        return [self.blocks.get(n) for n in numbers]
+
+
+async def _noop(*args, **kwargs):
+    pass
+
+
+@pytest.fixture
+def listener(fake_db, monkeypatch):
+    """A base listener at block 99 whose node serves blocks up to 110."""
+    for module in (indexer.known_tokens, indexer.checkpoint, indexer.reorg):
+        session = fake_db(module)
+    listener = ChainListener(CHAINS["base"])
+    listener.max_block_batch = 4
+    listener.last_block = 99
+    listener.session = session
+
+    node = _Node(_chain(110))
+    listener.node = node
+    monkeypatch.setattr(listener.block_fetcher, "iter_blocks", node.iter_blocks)
+    monkeypatch.setattr(listener.block_processor, "process_block", node.process_block)
+    monkeypatch.setattr(listener.log_ingestor, "ingest", node.ingest)
+    monkeypatch.setattr(listener.hash_window.rpc, "get_blocks", node.get_blocks)
+    monkeypatch.setattr(listener.price_oracle, "refresh", _noop)
+    monkeypatch.setattr(listener.reserve_tracker, "flush", _noop)
+    monkeypatch.setattr(listener.pool_registry, "flush", lambda: True)
+    return listener
+
+
+def test_batch_advances_after_its_logs(listener):
+    asyncio.run(listener._process_batch(110))
+
+    assert listener.last_block == 104
+    assert listener.node.ingested == [(100, 104)]
+    assert listener.checkpoint.pending_block == 104
+
+
+def test_failed_block_ends_the_batch(listener):
+    listener.node.failing_blocks = {102}
+    asyncio.run(listener._process_batch(110))
+
+    assert listener.last_block == 101
+    assert listener.node.ingested == [(100, 101)]
+    assert max(listener.hash_window.hashes) == 101
+
+    listener.node.failing_blocks = set()
+    asyncio.run(listener._process_batch(110))
+    assert listener.last_block == 106
+    assert listener.node.processed == [100, 101, 102, 103, 104, 105, 106]
+
+
+def test_failed_log_ingestion_retries_the_batch(listener):
+    listener.node.failing_logs = True
+    with pytest.raises(RuntimeError):
+        asyncio.run(listener._process_batch(110))
+
+    # Nothing of the batch survives, in memory or in the database
+    assert listener.last_block == 99
+    assert listener.checkpoint.pending_block is None
+    assert not listener.hash_window.hashes
+    assert listener.session.commits == 0
+
+    listener.node.failing_logs = False
+    asyncio.run(listener._process_batch(110))
+    assert listener.last_block == 104
+    assert listener.node.ingested == [(100, 104)]
+
+
+def test_reorg_rewinds_to_the_fork_point(listener):
+    asyncio.run(listener._process_batch(110))
+
+    # Blocks above 102 were replaced by a competing branch
+    listener.node.blocks = _chain(110, fork_after=102)
+    asyncio.run(listener._process_batch(110))
+
+    assert listener.last_block == 102
+    assert max(listener.hash_window.hashes) == 102
+    assert listener.checkpoint.pending_block is None
+
+    asyncio.run(listener._process_batch(110))
+    assert listener.last_block == 107
+    assert listener.hash_window.hashes[103] == _hash(103, "b").hex()
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+import indexer.checkpoint
+from indexer.checkpoint import CheckpointWriter
+
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_live_checkpoint_never_moves_down(fake_db):
+    session = fake_db(indexer.checkpoint)
+    checkpoint = CheckpointWriter("base", trigger_analysis=False)
+    checkpoint.advance(100, "0x64")
+
+    assert checkpoint.flush()
+    (statement, _), = session.executed
+    # A backfill may have raised the mark past this listener's block
+    assert "greatest(processed_blocks.block_number, excluded.block_number)" in _sql(statement)
+
+
+def test_rewind_drops_blocks_and_tokens_above_the_fork():
+    checkpoint = CheckpointWriter("base", hash_window=64, trigger_analysis=False)
+    for n in range(100, 106):
+        checkpoint.advance(n, hex(n), [SimpleNamespace(address=f"token{n}", deployed_block=n)])
+
+    checkpoint.rewind(102, hex(102))
+
+    assert (checkpoint.pending_block, checkpoint.pending_hash) == (102, hex(102))
+    assert [t.deployed_block for t in checkpoint.pending_tokens] == [100, 101, 102]
+    assert [n for n, _ in checkpoint.pending_hashes] == [100, 101, 102]
+
+    # A fork below everything buffered leaves nothing to write
+    checkpoint.rewind(99, None)
+    assert checkpoint.pending_block is None and not checkpoint.due(at_head=True)
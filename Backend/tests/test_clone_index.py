@@ -0,0 +1,106 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import intelligence.clone_index as clone_module
+from intelligence.clone_index import MIN_SIMILARITY, CloneIndex, bytecode_signature, minhash, shingles, similarity
+from utils.bytecode import PUSH1, PUSH32
+
+# Opcodes without immediates, so every generated byte is an instruction
+_OPS = [op for op in range(256) if not PUSH1 <= op <= PUSH32]
+
+
+def _contract(seed: int, size: int = 2000) -> bytes:
+    rng = random.Random(seed)
+    return bytes(rng.choice(_OPS) for _ in range(size))
+
+
+def _mutate(code: bytes, seed: int, changes: int) -> bytes:
+    rng = random.Random(seed)
+    code = bytearray(code)
+    for pc in rng.sample(range(len(code)), changes):
+        code[pc] = rng.choice(_OPS)
+    return bytes(code)
+
+
+def _fingerprint_row(i: int, code: bytes):
+    """A persisted `bytecode_fingerprints` row for member i."""
+    return SimpleNamespace(
+        bytecode_hash=f"hash{i}",
+        fingerprint=f"fingerprint{i}",
+        family_id=f"family{i}",
+        minhash=bytecode_signature(code).tobytes(),
+    )
+
+
+@pytest.fixture
+def index(fake_db):
+    """A CloneIndex warmed from persisted fingerprints: `index(*members)`."""
+    def build(*members):
+        session = fake_db(clone_module)
+        session.rows = [_fingerprint_row(i, code) for i, code in enumerate(members)]
+        clone_index = CloneIndex()
+        clone_index.load()
+        session.rows = []
+        return clone_index, session
+
+    return build
+
+
+def test_minhash_estimates_jaccard():
+    a = _contract(1)
+    b = _mutate(a, 2, 20)
+    sa, sb = shingles(a), shingles(b)
+    jaccard = len(sa & sb) / len(sa | sb)
+    assert abs(similarity(minhash(sa), minhash(sb)) - jaccard) < 0.15
+    assert similarity(minhash(sa), minhash(sa)) == 1.0
+
+
+def test_near_duplicates_found_through_lsh(index):
+    originals = [_contract(seed) for seed in range(10)]
+    clone_index, _ = index(*originals)
+    for i, code in enumerate(originals):
+        match = clone_index.nearest(_mutate(code, 100 + i, 10))
+        assert match.family_id == f"family{i}"
+        assert match.similarity >= MIN_SIMILARITY
+
+
+def test_unrelated_code_starts_a_family(index):
+    clone_index, session = index(_contract(1))
+    code = _contract(2)
+    assert clone_index.nearest(code).family_id == ""
+
+    family_id = clone_index.assign("new", code)
+    assert family_id == clone_index.nearest(code).fingerprint
+    assert [(row.bytecode_hash, row.family_id) for row in session.merged] == [("new", family_id)]
+
+
+def test_assigned_clone_joins_family(index):
+    original = _contract(1)
+    clone_index, session = index(original)
+
+    assert clone_index.assign("clone", _mutate(original, 2, 10)) == "family0"
+    assert clone_index.family_of("clone") == "family0"
+    # Already indexed: answered from memory, nothing stored twice
+    assert clone_index.assign("clone", b"") == "family0"
+    assert len(session.merged) == 1
+
+
+def test_normalized_clones_match_exactly(index):
+    code = bytes.fromhex("6080604052" + "73" + "11" * 20 + "5af4" + "00")
+    clone = bytes.fromhex("6080604052" + "73" + "22" * 20 + "5af4" + "00")
+    clone_index, _ = index()
+    family_id = clone_index.assign("hash0", code)
+    match = clone_index.nearest(clone)
+    assert (match.family_id, match.similarity) == (family_id, 1.0)
+
+
+def test_family_profiles_are_not_queried_per_token(index):
+    clone_index, session = index(_contract(1))
+    before = session.queries
+
+    family_id = clone_index.assign("new", _contract(2))
+    assert clone_index.family_profile(family_id) is None
+    assert clone_index.family_profile("family0") is None
+    assert session.queries - before == 2  # one refresh for every family
@@ -0,0 +1,96 @@
+import pytest
+from hexbytes import HexBytes
+
+from config.chains import AERODROME_POOL_CREATED_EVENT, TRANSFER_EVENT, V3_SWAP_EVENT
+from indexer.event_decoder import EventDecoder
+
+SENDER = "0x" + "11" * 20
+RECIPIENT = "0x" + "22" * 20
+POOL = "0x" + "ab" * 20
+
+
+def _word(value, signed=False) -> bytes:
+    if isinstance(value, str):
+        return bytes(12) + bytes.fromhex(value[2:])
+    return int(value).to_bytes(32, "big", signed=signed)
+
+
+def _log(topic, topics, data, block, log_index, raw=False):
+    topics = [bytes.fromhex(topic[2:])] + topics
+    if raw:
+        # Raw JSON-RPC form: hex strings and hex quantities
+        return {
+            "address": "0x" + POOL[2:].upper(),
+            "topics": ["0x" + t.hex() for t in topics],
+            "data": "0x" + data.hex(),
+            "blockNumber": hex(block),
+            "transactionIndex": "0x0",
+            "logIndex": hex(log_index),
+        }
+    return {
+        "address": POOL,
+        "topics": [HexBytes(t) for t in topics],
+        "data": HexBytes(data),
+        "blockNumber": block,
+        "transactionIndex": 0,
+        "logIndex": log_index,
+    }
+
+
+def _swaps(raw=False):
+    swaps = [(-5 * 10 ** 18, 7 * 10 ** 6, 2 ** 96, 10 ** 20, -887272), (3, -4, 2 ** 159, 1, 12)]
+    return [
+        _log(
+            V3_SWAP_EVENT,
+            [_word(SENDER), _word(RECIPIENT)],
+            b"".join([_word(a0, True), _word(a1, True), _word(price), _word(liquidity), _word(tick, True)]),
+            block=100 + i, log_index=i, raw=raw,
+        )
+        for i, (a0, a1, price, liquidity, tick) in enumerate(swaps)
+    ]
+
+
+@pytest.mark.parametrize("raw", [False, True])
+def test_batch_matches_per_log_decoding(raw):
+    decoder = EventDecoder()
+    logs = _swaps(raw)
+
+    swaps = decoder.decode_batch(logs)[V3_SWAP_EVENT]
+
+    assert list(swaps.block_number) == [100, 101]
+    assert list(swaps.log_index) == [0, 1]
+    assert swaps.address == [POOL, POOL]
+    for i, log in enumerate(logs):
+        expected = decoder.decode_log(log)["params"]
+        assert {name: column[i] for name, column in swaps.params.items()} == expected
+    assert list(swaps.params["tick"]) == [-887272, 12]
+    assert swaps.params["amount0"] == [-5 * 10 ** 18, 3]
+
+
+def test_indexed_bool_decodes_to_bool():
+    created = _log(
+        AERODROME_POOL_CREATED_EVENT,
+        [_word(SENDER), _word(RECIPIENT), _word(1)],
+        _word(POOL) + _word(7),
+        block=1, log_index=0,
+    )
+
+    pools = EventDecoder().decode_batch([created])[AERODROME_POOL_CREATED_EVENT]
+
+    assert pools.params["stable"] == [True]
+    assert pools.params["pool"] == [POOL]
+    assert EventDecoder().decode_log(created)["params"]["stable"] is True
+
+
+def test_mismatched_layouts_are_dropped():
+    erc20 = _log(TRANSFER_EVENT, [_word(SENDER), _word(RECIPIENT)], _word(5), block=1, log_index=0)
+    # ERC721 Transfer shares topic0 but indexes the token id
+    erc721 = _log(TRANSFER_EVENT, [_word(SENDER), _word(RECIPIENT), _word(5)], b"", block=1, log_index=1)
+    removed = {**erc20, "removed": True}
+    unknown = _log("0x" + "ff" * 32, [], b"", block=1, log_index=2)
+
+    batches = EventDecoder().decode_batch([erc20, erc721, removed, unknown])
+
+    assert list(batches) == [TRANSFER_EVENT]
+    transfers = batches[TRANSFER_EVENT]
+    assert len(transfers) == 1 and list(transfers.params["value"]) == [5]
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from web3 import Web3
+
+from utils.proxy import (
+    EIP1967_BEACON_SLOT,
+    EIP1967_IMPLEMENTATION_SLOT,
+    ZEPPELINOS_IMPLEMENTATION_SLOT,
+    ProxyResolver,
+    minimal_proxy_target,
+)
+
+TARGET = "0xbebebebebebebebebebebebebebebebebebebebe"
+IMPLEMENTATION = "0x" + "ab" * 20
+PROXY = "0x" + "cd" * 20
+
+# EIP-1167 runtime code, and its PUSH0 variant (EIP-7511)
+MINIMAL_PROXY = "0x363d3d373d3d3d363d73" + TARGET[2:] + "5af43d82803e903d91602b57fd5bf3"
+MINIMAL_PROXY_PUSH0 = "0x365f5f375f5f365f73" + TARGET[2:] + "5af43d5f5f3e5f3d91602a57fd5bf3"
+
+# CALLDATASIZE PUSH0 PUSH0 CALLDATACOPY ... GAS DELEGATECALL: a contract that can delegate
+DELEGATING = "0x365f5f375f5f365f5f" + "5af4" + "00"
+
+
+def _word(address):
+    return bytes(12) + bytes.fromhex(address[2:])
+
+
+class _Storage:
+    """BatchRPC stand-in serving fixed storage slots."""
+
+    def __init__(self, slots):
+        self.slots = slots
+
+    async def get_storage_at(self, slots, block="latest"):
+        return [self.slots.get(slot, bytes(32)) for _, slot in slots]
+
+
+def _resolve(slots, bytecode=DELEGATING):
+    resolver = ProxyResolver(None, "base")
+    resolver.rpc = _Storage(slots)
+    return asyncio.run(resolver.resolve(PROXY, bytes.fromhex(bytecode[2:])))
+
+
+def test_slot_constants():
+    assert EIP1967_IMPLEMENTATION_SLOT == int.from_bytes(Web3.keccak(text="eip1967.proxy.implementation"), "big") - 1
+    assert EIP1967_BEACON_SLOT == int.from_bytes(Web3.keccak(text="eip1967.proxy.beacon"), "big") - 1
+    assert ZEPPELINOS_IMPLEMENTATION_SLOT == 0x7050C9E0F4CA769C69BD3A8EF740BC37934F8E2C036E5A723FD8EE048ED3F8C3
+
+
+@pytest.mark.parametrize("code", [MINIMAL_PROXY, MINIMAL_PROXY_PUSH0])
+def test_minimal_proxy_target(code):
+    assert minimal_proxy_target(code) == TARGET
+    assert minimal_proxy_target(bytes.fromhex(code[2:])) == TARGET
+
+
+@pytest.mark.parametrize("code", [MINIMAL_PROXY + "00", "0x00" + MINIMAL_PROXY[2:], MINIMAL_PROXY[:-2], "0x"])
+def test_minimal_proxy_target_rejects_other_code(code):
+    assert minimal_proxy_target(code) is None
+
+
+def test_resolve_minimal_proxy_without_storage_reads():
+    info = _resolve({}, MINIMAL_PROXY)
+    assert (info.kind, info.implementation, info.upgradeable) == ("eip1167", TARGET, False)
+
+
+@pytest.mark.parametrize("slot, kind", [
+    (EIP1967_IMPLEMENTATION_SLOT, "eip1967"),
+    (ZEPPELINOS_IMPLEMENTATION_SLOT, "zeppelinos"),
+])
+def test_resolve_implementation_slot(slot, kind):
+    info = _resolve({slot: _word(IMPLEMENTATION)})
+    assert (info.kind, info.implementation, info.upgradeable) == (kind, IMPLEMENTATION, True)
+
+
+def test_resolve_not_a_proxy():
+    assert _resolve({}) is None
+    # Without DELEGATECALL the slots are not even read
+    assert _resolve({EIP1967_IMPLEMENTATION_SLOT: _word(IMPLEMENTATION)}, "0x6001600201") is None
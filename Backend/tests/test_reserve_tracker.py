@@ -0,0 +1,165 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+import dex.reserve_tracker
+from dex.pool_registry import PoolRegistry
+from dex.reserve_tracker import ReserveTracker
+
+FACTORY_V2 = "0x8909dc15e40173ff4699343b6eb8132c65e18ec6"
+FACTORY_V3 = "0x33128a8fc17869897dce68ed026d694621f6fdfd"
+TOKEN = "0x1111111111111111111111111111111111111111"
+WETH = "0x4200000000000000000000000000000000000006"
+PAIR = "0xaaaa000000000000000000000000000000000001"
+POOL = "0xbbbb000000000000000000000000000000000002"
+
+
+class _Detector:
+    """PoolDetector stand-in: on-chain pool state per address, and the blocks it was read at."""
+
+    def __init__(self, reads=None):
+        self.reads = reads or {}
+        self.blocks = []
+
+    async def read(self, pools, block="latest"):
+        self.blocks.append(block)
+        return [{**self.reads[p["address"]], **p} for p in pools if p["address"] in self.reads]
+
+    async def read_balances(self, pools):
+        pass
+
+
+class _Oracle:
+    def __init__(self, detector):
+        self.snapshot = {}
+        self.pool_detector = detector
+
+
+def _registry(created_at=100):
+    registry = PoolRegistry("base", {FACTORY_V2: "uniswap_v2", FACTORY_V3: "uniswap_v3"})
+    registry.on_event({"name": "PairCreated", "address": FACTORY_V2, "block_number": created_at,
+                       "params": {"token0": TOKEN, "token1": WETH, "pair": PAIR}})
+    registry.on_event({"name": "PoolCreated", "address": FACTORY_V3, "block_number": created_at,
+                       "params": {"token0": TOKEN, "token1": WETH, "fee": 3000, "tickSpacing": 60, "pool": POOL}})
+    return registry
+
+
+def _tracker(registry, detector=None, since=0):
+    tracker = ReserveTracker("base", registry, _Oracle(detector or _Detector()), trigger_analysis=False,
+                             reorg_depth=10)
+    tracker.follow_from(since)
+    return tracker
+
+
+def _sync(tracker, block, r0, r1):
+    tracker.on_event({"name": "Sync", "address": PAIR, "block_number": block,
+                      "params": {"reserve0": r0, "reserve1": r1}})
+
+
+def _v2(tracker, block, name, reserves):
+    _sync(tracker, block, reserves, reserves)
+    tracker.on_event({"name": name, "address": PAIR, "block_number": block, "params": {}})
+
+
+def _v3(tracker, block, name, amount, ticks=(-887220, 887220)):
+    tracker.on_event({"name": name, "address": POOL, "block_number": block,
+                      "params": {"tickLower": ticks[0], "tickUpper": ticks[1], "amount": amount}})
+
+
+def test_churn_is_not_a_rug():
+    tracker = _tracker(_registry())
+    tracker.note_block(102, 1700000000)
+    _v2(tracker, 101, "Mint", 1000)
+    for block in range(102, 142, 2):
+        _v2(tracker, block, "Burn", 700)
+        _v2(tracker, block + 1, "Mint", 1000)
+    assert tracker.state[PAIR]["removal"] == 0
+    assert not tracker.alerts
+
+    _v2(tracker, 150, "Burn", 300)
+    assert tracker.state[PAIR]["removal"] == pytest.approx(70.0)
+    assert tracker.alerts == {PAIR}
+    # Dated by the block of the first removal, not the wall clock
+    assert tracker.state[PAIR]["removed_at"] == datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc)
+
+
+def test_v3_drawdown_counts_out_of_range_positions():
+    tracker = _tracker(_registry())
+    _v3(tracker, 101, "Mint", 600)
+    _v3(tracker, 102, "Mint", 400, ticks=(600, 1200))
+    _v3(tracker, 103, "Burn", 400, ticks=(600, 1200))
+    assert tracker.state[POOL]["removal"] == pytest.approx(40.0)
+
+
+def test_restart_keeps_persisted_peak():
+    registry = _registry(created_at=10)
+    # As loaded from dex_pools after a restart
+    registry.pools[POOL].update(lp_liquidity=1000, peak_lp_liquidity=1000, liquidity_block=200)
+    tracker = _tracker(registry, since=150)
+    # Replayed from a checkpoint behind the persisted state: already counted
+    _v3(tracker, 180, "Burn", 1000)
+    assert tracker.state[POOL]["lp_liquidity"] == 1000
+    _v3(tracker, 201, "Burn", 900)
+    assert tracker.state[POOL]["removal"] == pytest.approx(90.0)
+    assert tracker.alerts == {POOL}
+
+
+def test_untracked_pool_is_seeded_from_chain(fake_db):
+    fake_db(dex.reserve_tracker)
+    detector = _Detector({PAIR: {"reserve0": 1000, "reserve1": 1000}, POOL: {
+        "liquidity": 500, "sqrt_price_x96": 1 << 96, "tick": 0}})
+    # Created before the tracker started: its history is unknown
+    tracker = _tracker(_registry(created_at=10), detector, since=100)
+    _v2(tracker, 120, "Burn", 400)
+    _v3(tracker, 125, "Burn", 250)
+    assert not tracker.state
+
+    assert asyncio.run(tracker.flush())
+    assert detector.blocks == [hex(119)]
+    assert tracker.state[PAIR]["removal"] == pytest.approx(60.0)
+    assert tracker.state[POOL]["removal"] == pytest.approx(50.0)
+
+
+def test_rewind_restores_state_before_the_fork():
+    tracker = _tracker(_registry())
+    _v2(tracker, 101, "Mint", 1000)
+    _v2(tracker, 105, "Burn", 500)
+    _v2(tracker, 108, "Burn", 100)
+    assert tracker.alerts == {PAIR}
+
+    tracker.rewind(106)
+    state = tracker.state[PAIR]
+    assert (state["block"], state["peak"], state["lp_liquidity"]) == (105, 1000, 500)
+    assert state["removal"] == pytest.approx(50.0)
+    assert not tracker.alerts
+
+    # The canonical chain then re-adds liquidity: the peak survived the reorg
+    _v2(tracker, 107, "Mint", 1200)
+    assert tracker.state[PAIR]["peak"] == 1200
+
+
+def test_rewind_past_snapshots_reads_pool_again():
+    registry = _registry(created_at=10)
+    registry.pools[PAIR].update(lp_liquidity=1000, peak_lp_liquidity=1000, liquidity_block=200)
+    tracker = _tracker(registry, since=150)
+    _v2(tracker, 201, "Burn", 800)
+
+    # No snapshot at or below the fork: the persisted state may be orphaned
+    tracker.rewind(195)
+    assert PAIR not in tracker.state
+    _v2(tracker, 196, "Burn", 800)
+    assert PAIR in tracker.unseeded
+
+
+def test_flush_persists_tracker_state(fake_db):
+    session = fake_db(dex.reserve_tracker)
+    tracker = _tracker(_registry())
+    _v2(tracker, 101, "Mint", 1000)
+    _v2(tracker, 102, "Burn", 600)
+
+    assert asyncio.run(tracker.flush())
+    (statement, params), = session.executed
+    assert statement.table.name == "dex_pools"
+    assert params == [{"pool_id": f"base:{PAIR}", "lp": 600, "peak": 1000, "block": 102}]
+    assert not tracker.dirty
@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from indexer.internal_creates import InternalCreateFinder
+from utils.rpc_batch import BatchRPC, _is_method_unsupported
+
+
+class _Provider:
+    """Provider stand-in answering every request with one JSON-RPC error."""
+
+    def __init__(self, error):
+        self.error = error
+
+    async def make_request(self, method, params):
+        return {"jsonrpc": "2.0", "id": 1, "error": self.error}
+
+
+def _finder(error):
+    rpc = BatchRPC(SimpleNamespace(provider=_Provider(error)))
+    return InternalCreateFinder(None, "test", "auto", get_receipts=None, rpc=rpc)
+
+
+@pytest.mark.parametrize("error", [
+    {"code": -32601, "message": "Method not found"},
+    {"code": -32000, "message": "the method debug_traceBlockByNumber does not exist/is not available"},
+    {"code": -32000, "message": "Unsupported method: debug_traceBlockByNumber"},
+])
+def test_missing_method_is_unsupported(error):
+    assert _is_method_unsupported(error, "debug_traceBlockByNumber")
+
+
+@pytest.mark.parametrize("error", [
+    {"code": -32000, "message": "header not found"},
+    {"code": -32000, "message": "block 123 not found"},
+    {"code": -32000, "message": "historical state not available"},
+    {"code": -32005, "message": "request rate exceeded"},
+    "timeout",
+])
+def test_transient_error_is_not_unsupported(error):
+    assert not _is_method_unsupported(error, "debug_traceBlockByNumber")
+
+
+def test_transient_trace_error_keeps_strategy():
+    finder = _finder({"code": -32000, "message": "header not found"})
+
+    assert asyncio.run(finder.find(100, {"transactions": []})) == []
+    assert finder.strategies[0] == "debug"
+
+
+def test_missing_trace_method_falls_back():
+    finder = _finder({"code": -32601, "message": "Method not found"})
+
+    # Every trace method is missing, so it ends on the log heuristic
+    asyncio.run(finder.find(100, {"transactions": []}))
+    assert finder.strategies == ["logs"]
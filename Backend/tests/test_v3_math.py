@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from dex.price_oracle import Price
+from dex.reserve_tracker import ReserveTracker
+from dex.v3_math import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    Q96,
+    amounts_for_liquidity,
+    in_range_amounts,
+    sqrt_ratio_at_tick,
+)
+from dex.valuation import estimate_liquidity_usd
+
+WETH = "0x4200000000000000000000000000000000000006"
+USDC = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+TOKEN = "0x1111111111111111111111111111111111111111"
+POOL = "0x2222222222222222222222222222222222222222"
+
+
+class _Balances:
+    """PoolDetector stand-in: each pool holds fixed token balances."""
+
+    def __init__(self, balances):
+        self.balances = balances
+
+    async def read_balances(self, pools):
+        for pool in pools:
+            if pool["address"] in self.balances:
+                pool["balance0"], pool["balance1"] = self.balances[pool["address"]]
+
+
+class _Oracle:
+    def __init__(self, snapshot, pool_detector):
+        self.snapshot = snapshot
+        self.pool_detector = pool_detector
+
+
+def test_sqrt_ratio_at_tick_bounds():
+    assert sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+    assert sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+    assert sqrt_ratio_at_tick(0) == Q96
+
+
+def test_sqrt_ratio_at_tick_known_values():
+    # TickMath.getSqrtRatioAtTick reference outputs
+    assert sqrt_ratio_at_tick(50) == 79426470787362580746886972461
+    assert sqrt_ratio_at_tick(-50) == 79030349367926598376800521322
+    assert sqrt_ratio_at_tick(1) == 79232123823359799118286999568
+    assert sqrt_ratio_at_tick(-1) == 79224201403219477170569942574
+
+
+@pytest.mark.parametrize("tick", [MIN_TICK - 1, MAX_TICK + 1])
+def test_sqrt_ratio_at_tick_out_of_range(tick):
+    with pytest.raises(ValueError):
+        sqrt_ratio_at_tick(tick)
+
+
+def test_amounts_for_liquidity_around_price():
+    lower, upper = sqrt_ratio_at_tick(-60), sqrt_ratio_at_tick(60)
+    below = amounts_for_liquidity(lower - 1, lower, upper, 10 ** 18)
+    inside = amounts_for_liquidity(Q96, lower, upper, 10 ** 18)
+    above = amounts_for_liquidity(upper, lower, upper, 10 ** 18)
+    assert below[1] == 0 and below[0] > 0
+    assert above[0] == 0 and above[1] > 0
+    # At price 1 in a symmetric range both sides hold about the same amount
+    assert inside[0] > 0 and abs(inside[0] - inside[1]) <= inside[0] // 1000
+
+
+def test_in_range_amounts_at_range_edge():
+    amount0, amount1 = in_range_amounts(sqrt_ratio_at_tick(60), 60, 10 ** 18, 60)
+    assert amount1 == 0 and amount0 > 0
+
+
+def test_single_priced_pool_ignores_its_own_price():
+    prices = {WETH: Price(2000.0, 18)}
+    pool = {"dex": "uniswap_v3", "token0": TOKEN, "token1": WETH, "balance0": 10 ** 18, "balance1": 10 ** 18}
+    honest = estimate_liquidity_usd({**pool, "sqrt_price_x96": Q96}, prices)
+    # A deployer-picked price a million times higher must not inflate the value
+    inflated = estimate_liquidity_usd({**pool, "sqrt_price_x96": Q96 * 1000}, prices)
+    assert honest == inflated == pytest.approx(4000.0)
+
+
+def test_tracked_full_range_pool_valued_from_balances():
+    liquidity = 10 ** 18
+    # A single full-range position at price 1 holds ~1 token of each side
+    balances = amounts_for_liquidity(Q96, MIN_SQRT_RATIO, MAX_SQRT_RATIO, liquidity)
+    assert balances[0] == pytest.approx(10 ** 18, rel=1e-9)
+    # ...while the active tick-spacing range covers about 0.3% of it
+    assert in_range_amounts(Q96, 0, liquidity, 60)[0] < balances[0] / 300
+
+    oracle = _Oracle({WETH: Price(1.0, 18), USDC: Price(1.0, 18)}, _Balances({POOL: balances}))
+    tracker = ReserveTracker("base", None, oracle, trigger_analysis=False)
+    state = {"address": POOL, "dex": "uniswap_v3", "token0": USDC, "token1": WETH, "tick_spacing": 60,
+             "sqrt_price_x96": Q96, "tick": 0, "liquidity": liquidity}
+    (value,) = asyncio.run(tracker._values([state]))
+    assert value == pytest.approx(2.0, rel=1e-9)
+    # Balances are read per flush, never kept in the tracked state
+    assert "balance0" not in state
+
+
+def test_tracked_pool_without_balances_is_not_valued():
+    oracle = _Oracle({WETH: Price(2000.0, 18)}, _Balances({}))
+    tracker = ReserveTracker("base", None, oracle, trigger_analysis=False)
+    v3 = {"address": POOL, "dex": "uniswap_v3", "token0": TOKEN, "token1": WETH, "liquidity": 10 ** 18, "tick": 0}
+    v2 = {"address": TOKEN, "dex": "uniswap_v2", "token0": TOKEN, "token1": WETH}
+    assert asyncio.run(tracker._values([v3, v2])) == [None, None]
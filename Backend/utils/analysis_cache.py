@@ -0,0 +1,126 @@
+"""
+Bytecode-hash keyed analysis cache.
+
+Memecoin launches are mostly byte-identical clones, so everything derived
+purely from runtime bytecode (ERC20 classification, selector set,
+dangerous functions, contract risk) is computed once per bytecode hash.
+Lookups go to an in-process LRU first and to the `bytecode_analysis` table
+on a miss (misses are remembered too); writes go to both. The listener's
+writes are buffered and committed with its checkpoint (see `buffer`).
+"""
+import logging
+from collections import OrderedDict
+from itertools import groupby
+from typing import Any, Dict, Optional
+from sqlalchemy.dialects.postgresql import insert
+
+from config.settings import settings
+from db.session import SessionLocal
+from db.models import BytecodeAnalysis
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("is_erc20", "selectors", "dangerous_functions", "contract_score", "contract_flags")
+
+# LRU marker for a hash with no stored analysis
+_MISSING: Dict[str, Any] = {}
+
+
+class AnalysisCache:
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max(1, max_entries or settings.BYTECODE_CACHE_SIZE)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._buffered: Dict[str, Dict[str, Any]] = {}  # bytecode_hash -> fields not yet written
+
+    def get(self, bytecode_hash: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return the cached fields for a bytecode hash (None if never analyzed)."""
+        if not bytecode_hash:
+            return None
+
+        entry = self._entries.get(bytecode_hash)
+        if entry is not None:
+            self._entries.move_to_end(bytecode_hash)
+            return None if entry is _MISSING else entry
+
+        db = SessionLocal()
+        try:
+            row = db.get(BytecodeAnalysis, bytecode_hash)
+            if row is None:
+                self._remember(bytecode_hash, _MISSING)
+                return None
+            entry = {field: getattr(row, field) for field in FIELDS if getattr(row, field) is not None}
+        except Exception as e:
+            logger.error(f"Failed to read bytecode analysis {bytecode_hash}: {e}")
+            return None
+        finally:
+            db.close()
+
+        self._remember(bytecode_hash, entry)
+        return entry
+
+    def put(self, bytecode_hash: Optional[str], **fields: Any):
+        """Merge fields into the entry for a bytecode hash, in memory and in Postgres."""
+        if not self._merge(bytecode_hash, fields):
+            return
+
+        db = SessionLocal()
+        try:
+            db.execute(_upsert(fields), {"bytecode_hash": bytecode_hash, **fields})
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to store bytecode analysis {bytecode_hash}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def buffer(self, bytecode_hash: Optional[str], **fields: Any):
+        """
+        Like `put`, but the row is only written by the next `write_buffered`,
+        which the listener's checkpoint runs inside its flush transaction.
+        """
+        if self._merge(bytecode_hash, fields):
+            self._buffered[bytecode_hash] = {**self._buffered.get(bytecode_hash, {}), **fields}
+
+    def write_buffered(self, db) -> Dict[str, Dict[str, Any]]:
+        """
+        Execute the buffered rows in db's transaction (one statement per field
+        set) and hand them over; `requeue` them if the transaction fails.
+        """
+        rows, self._buffered = self._buffered, {}
+        ordered = sorted(rows.items(), key=lambda item: sorted(item[1]))
+        for _, group in groupby(ordered, key=lambda item: sorted(item[1])):
+            group = [{"bytecode_hash": bytecode_hash, **fields} for bytecode_hash, fields in group]
+            db.execute(_upsert(group[0]), group)
+        return rows
+
+    def requeue(self, rows: Dict[str, Dict[str, Any]]):
+        """Buffer rows from a rolled back `write_buffered` again (newer fields win)."""
+        for bytecode_hash, fields in rows.items():
+            self._buffered[bytecode_hash] = {**fields, **self._buffered.get(bytecode_hash, {})}
+
+    def _merge(self, bytecode_hash: Optional[str], fields: Dict[str, Any]) -> bool:
+        if not bytecode_hash or not fields:
+            return False
+        entry = dict(self._entries.get(bytecode_hash, {}))
+        entry.update(fields)
+        self._remember(bytecode_hash, entry)
+        return True
+
+    def _remember(self, bytecode_hash: str, entry: Dict[str, Any]):
+        self._entries[bytecode_hash] = entry
+        self._entries.move_to_end(bytecode_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _upsert(fields: Dict[str, Any]):
+    """Upsert of the given fields (others keep their stored values)."""
+    stmt = insert(BytecodeAnalysis)
+    return stmt.on_conflict_do_update(
+        index_elements=[BytecodeAnalysis.bytecode_hash],
+        set_={field: stmt.excluded[field] for field in fields if field != "bytecode_hash"},
+    )
+
+
+# Process-wide cache shared by the detector and the analyzers
+analysis_cache = AnalysisCache()
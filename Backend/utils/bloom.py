@@ -0,0 +1,32 @@
+import math
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over 20-byte addresses.
+
+    Addresses are already keccak-derived, so their own bytes serve as the
+    two base hashes for double hashing; no extra hashing is needed.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, address: str):
+        raw = bytes.fromhex(address[2:] if address[:2] in ("0x", "0X") else address)
+        h1 = int.from_bytes(raw[:8], "big")
+        h2 = int.from_bytes(raw[8:16], "big") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, address: str):
+        for pos in self._positions(address):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, address: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(address))
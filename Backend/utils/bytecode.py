@@ -0,0 +1,112 @@
+"""
+EVM bytecode helpers shared by the classifier and the analyzers.
+
+Bytecode is decoded instruction by instruction, so bytes inside PUSH
+immediates are never mistaken for opcodes. Everything works on `bytes`,
+`memoryview` or hex strings without copying more than once.
+"""
+import re
+from typing import Iterator, Set, Tuple, Union
+
+Bytecode = Union[str, bytes, bytearray, memoryview]
+
+PUSH0 = 0x5F
+PUSH1 = 0x60
+PUSH4 = 0x63
+PUSH20 = 0x73
+PUSH32 = 0x7F
+
+# Instruction length (opcode + immediate) for every opcode byte
+_STEP = tuple(1 + (op - PUSH0 if PUSH1 <= op <= PUSH32 else 0) for op in range(256))
+
+# solc/vyper dispatchers compare the call's selector against each PUSH4 with
+# EQ (linear), GT/LT (binary search pivots) or XOR (vyper), optionally after
+# one DUP/SWAP. Only the PUSH4 byte is consumed, so candidates may overlap.
+_DISPATCH_RE = re.compile(rb"\x63(?=(.{4})[\x80-\x9f]?[\x10\x11\x14\x18])", re.S)
+
+
+def to_bytes(bytecode: Bytecode) -> Union[bytes, memoryview]:
+    """Normalize hex strings to bytes; bytes-like input is returned as is."""
+    if isinstance(bytecode, str):
+        bytecode = bytecode[2:] if bytecode[:2] in ("0x", "0X") else bytecode
+        return bytes.fromhex(bytecode)
+    if isinstance(bytecode, bytearray):
+        return memoryview(bytecode)
+    return bytecode
+
+
+def strip_metadata(code: Union[bytes, memoryview]) -> Union[bytes, memoryview]:
+    """Drop the trailing CBOR metadata solc/vyper append to runtime code."""
+    if len(code) < 2:
+        return code
+    length = int.from_bytes(code[-2:], "big")
+    start = len(code) - 2 - length
+    # The metadata is a CBOR map (0xa1..0xa5 header) followed by its 2-byte length
+    if length and start >= 0 and 0xA1 <= code[start] <= 0xA5:
+        return code[:start]
+    return code
+
+
+def iter_instructions(bytecode: Bytecode) -> Iterator[Tuple[int, int, Union[bytes, memoryview]]]:
+    """Yield (pc, opcode, immediate) for every instruction, skipping PUSH data."""
+    code = to_bytes(bytecode)
+    pc, end = 0, len(code)
+    while pc < end:
+        op = code[pc]
+        step = _STEP[op]
+        yield pc, op, code[pc + 1:pc + step]
+        pc += step
+
+
+def extract_selectors(bytecode: Bytecode) -> Set[str]:
+    """
+    Return the function selectors of the contract's dispatcher as 8-char
+    lowercase hex strings.
+
+    Candidate `PUSH4 <selector> [DUPn|SWAPn] EQ|GT|LT|XOR` sequences are
+    located with a byte regex, then kept only if the PUSH4 starts an
+    instruction, which takes one opcode walk up to the last candidate.
+    """
+    if not bytecode:
+        return set()
+    code = strip_metadata(to_bytes(bytecode))
+
+    candidates = [(m.start(), m.group(1)) for m in _DISPATCH_RE.finditer(code)]
+    selectors = set()
+    pc = 0
+    for offset, selector in candidates:
+        while pc < offset:
+            pc += _STEP[code[pc]]
+        if pc == offset:
+            selectors.add(bytes(selector).hex())
+    return selectors
+
+
+def opcodes(bytecode: Bytecode) -> bytes:
+    """The opcode sequence of the code with metadata and PUSH data removed."""
+    code = strip_metadata(to_bytes(bytecode))
+    ops = bytearray()
+    pc, end = 0, len(code)
+    while pc < end:
+        op = code[pc]
+        ops.append(op)
+        pc += _STEP[op]
+    return bytes(ops)
+
+
+def normalize(bytecode: Bytecode) -> bytes:
+    """
+    Runtime code with the parts that differ between clones of one contract
+    removed: the CBOR metadata, and the PUSH20/PUSH32 immediates that carry
+    hardcoded addresses and constructor-set immutables (zeroed in place).
+    """
+    code = bytearray(strip_metadata(to_bytes(bytecode)))
+    pc, end = 0, len(code)
+    while pc < end:
+        op = code[pc]
+        step = _STEP[op]
+        if op == PUSH20 or op == PUSH32:
+            width = min(step, end - pc) - 1  # code may end mid-immediate
+            code[pc + 1:pc + 1 + width] = bytes(width)
+        pc += step
+    return bytes(code)
@@ -0,0 +1,57 @@
+"""
+Multicall3 call aggregation.
+
+Many read-only calls are packed into `aggregate3` calls on the Multicall3
+contract, so a whole batch of factory lookups or pool reads costs one
+eth_call instead of one per read. Calls beyond MULTICALL_BATCH_SIZE are
+split across several aggregate calls, which still go out in one JSON-RPC
+batch.
+"""
+import logging
+from typing import List, Optional, Sequence, Tuple
+from web3 import AsyncWeb3, Web3
+
+from config.chains import MULTICALL3
+from config.settings import settings
+from utils.rpc_batch import BatchRPC
+
+logger = logging.getLogger(__name__)
+
+# aggregate3((address target, bool allowFailure, bytes callData)[])
+AGGREGATE3_SELECTOR = "0x82ad56cb"
+
+
+class Multicall:
+    """
+    Drop-in for `BatchRPC.eth_call`: takes (to, calldata) pairs and returns
+    each call's raw return data, or None if that call reverted.
+
+    If an aggregate call fails as a whole (no Multicall3 on the chain, or it
+    ran out of gas), its calls are retried as a plain JSON-RPC batch.
+    """
+
+    def __init__(self, w3: AsyncWeb3, rpc: Optional[BatchRPC] = None, batch_size: Optional[int] = None):
+        self.w3 = w3
+        self.rpc = rpc or BatchRPC(w3)
+        self.batch_size = max(1, batch_size or settings.MULTICALL_BATCH_SIZE)
+
+    async def call(self, calls: Sequence[Tuple[str, str]], block: str = "latest") -> List[Optional[bytes]]:
+        if not calls:
+            return []
+
+        chunks = [calls[i:i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+        raws = await self.rpc.eth_call([(MULTICALL3, self._encode(chunk)) for chunk in chunks], block)
+
+        results: List[Optional[bytes]] = []
+        for chunk, raw in zip(chunks, raws):
+            if not raw:
+                logger.debug(f"Multicall3 aggregate of {len(chunk)} calls failed, sending them individually")
+                results.extend(await self.rpc.eth_call(chunk, block))
+                continue
+            (decoded,) = self.w3.codec.decode(["(bool,bytes)[]"], raw)
+            results.extend(data if success else None for success, data in decoded)
+        return results
+
+    def _encode(self, calls: Sequence[Tuple[str, str]]) -> str:
+        args = [(Web3.to_checksum_address(to), True, Web3.to_bytes(hexstr=data)) for to, data in calls]
+        return AGGREGATE3_SELECTOR + self.w3.codec.encode(["(address,bool,bytes)[]"], [args]).hex()
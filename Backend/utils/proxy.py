@@ -0,0 +1,125 @@
+"""
+Proxy detection and implementation resolution.
+
+EIP-1167 minimal proxies are recognised from their runtime bytes alone.
+Other contracts that DELEGATECALL are checked for EIP-1967 implementation
+and beacon slots (which also covers UUPS) in one batched storage read.
+Implementation bytecode is cached per chain and address, so the analysis
+of a popular implementation is shared by every proxy in front of it.
+"""
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from web3 import AsyncWeb3, Web3
+
+from utils.bytecode import Bytecode, opcodes, to_bytes
+from utils.rpc_batch import BatchRPC
+
+logger = logging.getLogger(__name__)
+
+DELEGATECALL = 0xF4
+
+# EIP-1167 and its PUSH0 variant (EIP-7511)
+_MINIMAL_PROXY_RE = re.compile(
+    rb"\A(?:\x36\x3d\x3d\x37\x3d\x3d\x3d\x36\x3d\x73(.{20})\x5a\xf4\x3d\x82\x80\x3e\x90\x3d\x91\x60\x2b\x57\xfd\x5b\xf3"
+    rb"|\x36\x5f\x5f\x37\x5f\x5f\x36\x5f\x73(.{20})\x5a\xf4\x3d\x5f\x5f\x3e\x5f\x3d\x91\x60\x2a\x57\xfd\x5b\xf3)\Z",
+    re.S,
+)
+
+# bytes32(uint256(keccak256("eip1967.proxy.implementation")) - 1)
+EIP1967_IMPLEMENTATION_SLOT = 0x360894A13BA1A3210667C828492DB98DCA3E2076CC3735A920A3CA505D382BBC
+# bytes32(uint256(keccak256("eip1967.proxy.beacon")) - 1)
+EIP1967_BEACON_SLOT = 0xA3F0AD74E5423AEBFD80D3EF4346578335A9A72AEAEE59FF6CB3582B35133D50
+# keccak256("org.zeppelinos.proxy.implementation"), pre-1967 OpenZeppelin proxies
+ZEPPELINOS_IMPLEMENTATION_SLOT = int.from_bytes(Web3.keccak(text="org.zeppelinos.proxy.implementation"), "big")
+
+IMPLEMENTATION_CALL = "0x5c60da1b"  # implementation()
+
+# Implementations whose bytecode stays cached per process
+IMPLEMENTATION_CACHE_SIZE = 1024
+
+_implementations: "OrderedDict[Tuple[str, str], Tuple[str, bytes]]" = OrderedDict()
+
+
+@dataclass
+class ProxyInfo:
+    kind: str  # eip1167 | eip1967 | beacon | zeppelinos
+    implementation: str
+
+    @property
+    def upgradeable(self) -> bool:
+        # A minimal proxy's target is baked into its code
+        return self.kind != "eip1167"
+
+
+def minimal_proxy_target(bytecode: Bytecode) -> Optional[str]:
+    """Implementation address of an EIP-1167 minimal proxy, or None."""
+    match = _MINIMAL_PROXY_RE.match(to_bytes(bytecode))
+    if match is None:
+        return None
+    return "0x" + bytes(match.group(1) or match.group(2)).hex()
+
+
+class ProxyResolver:
+    def __init__(self, w3: AsyncWeb3, chain: str):
+        self.w3 = w3
+        self.chain = chain
+        self.rpc = BatchRPC(w3)
+
+    async def resolve(self, address: str, bytecode: Optional[bytes] = None) -> Optional[ProxyInfo]:
+        """Return the proxy kind and current implementation of a contract (None if not a proxy)."""
+        if bytecode is None:
+            bytecode = await self.w3.eth.get_code(Web3.to_checksum_address(address))
+        if not bytecode:
+            return None
+
+        target = minimal_proxy_target(bytecode)
+        if target is not None:
+            return ProxyInfo("eip1167", target)
+
+        # Only contracts that can delegate are worth the storage reads
+        if DELEGATECALL not in opcodes(bytecode):
+            return None
+
+        implementation, beacon, legacy = await self.rpc.get_storage_at([
+            (address, EIP1967_IMPLEMENTATION_SLOT),
+            (address, EIP1967_BEACON_SLOT),
+            (address, ZEPPELINOS_IMPLEMENTATION_SLOT),
+        ])
+
+        if _slot_address(implementation):
+            return ProxyInfo("eip1967", _slot_address(implementation))
+        if _slot_address(beacon):
+            (result,) = await self.rpc.eth_call([(_slot_address(beacon), IMPLEMENTATION_CALL)])
+            if _slot_address(result):
+                return ProxyInfo("beacon", _slot_address(result))
+        if _slot_address(legacy):
+            return ProxyInfo("zeppelinos", _slot_address(legacy))
+        return None
+
+    async def implementation_code(self, implementation: str) -> Tuple[Optional[str], Optional[bytes]]:
+        """(bytecode_hash, bytecode) of an implementation, fetched once per process."""
+        key = (self.chain, implementation.lower())
+        cached = _implementations.get(key)
+        if cached is not None:
+            _implementations.move_to_end(key)
+            return cached
+
+        bytecode = await self.w3.eth.get_code(Web3.to_checksum_address(implementation))
+        if not bytecode:
+            return None, None
+
+        entry = (Web3.keccak(bytecode).hex(), bytes(bytecode))
+        _implementations[key] = entry
+        while len(_implementations) > IMPLEMENTATION_CACHE_SIZE:
+            _implementations.popitem(last=False)
+        return entry
+
+
+def _slot_address(value: Optional[bytes]) -> Optional[str]:
+    """The address held in the low 20 bytes of a storage word or return value."""
+    if not value or len(value) < 20 or not any(value[-20:]):
+        return None
+    return "0x" + bytes(value[-20:]).hex()
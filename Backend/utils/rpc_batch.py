@@ -0,0 +1,261 @@
+import asyncio
+import itertools
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from aiohttp import ClientResponseError, ClientSession, ClientTimeout
+from web3 import AsyncWeb3, Web3
+from web3._utils.method_formatters import PYTHONIC_RESULT_FORMATTERS
+from web3._utils.request import async_make_post_request
+from web3.datastructures import AttributeDict
+from web3.providers.async_rpc import AsyncHTTPProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# (method, params) pair for a single JSON-RPC call inside a batch
+RPCCall = Tuple[str, Sequence[Any]]
+
+# JSON-RPC "method not found"
+METHOD_NOT_FOUND = -32601
+
+
+class BatchRejectedError(Exception):
+    """Raised when a node refuses a JSON-RPC batch (usually because it is too large)."""
+
+
+class RPCMethodUnsupportedError(Exception):
+    """Raised when a node does not implement an (optional) RPC method."""
+
+
+class AsyncBatchHTTPProvider(AsyncHTTPProvider):
+    """
+    AsyncHTTPProvider that can also pack many calls into a single JSON-RPC
+    array request. Single calls behave exactly like the stock provider, so it
+    is a drop-in replacement for `AsyncWeb3.AsyncHTTPProvider`.
+
+    When a node rejects a batch the chunk is split in half and retried; the
+    smaller size is remembered so later batches don't hit the limit again.
+
+    If `session_factory` is given, the session it returns is registered for
+    this endpoint before the first request so providers can share one pool.
+    """
+
+    def __init__(self, endpoint_uri: Optional[str] = None, max_batch_size: Optional[int] = None,
+                 session_factory: Optional[Callable[[], Awaitable[ClientSession]]] = None, **kwargs):
+        kwargs.setdefault("request_kwargs", {"timeout": ClientTimeout(settings.RPC_TIMEOUT_SECONDS)})
+        super().__init__(endpoint_uri, **kwargs)
+        self.max_batch_size = max(1, max_batch_size or settings.RPC_BATCH_SIZE)
+        self._batch_ids = itertools.count()
+        self._session_factory = session_factory
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _ensure_session(self) -> None:
+        if self._session_factory is None:
+            return
+        loop = asyncio.get_running_loop()
+        if self._session_loop is not loop:
+            await self.cache_async_session(await self._session_factory())
+            self._session_loop = loop
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        await self._ensure_session()
+        return await super().make_request(method, params)
+
+    async def make_batch_request(self, calls: Sequence[RPCCall]) -> List[RPCResponse]:
+        """Send `calls` as one or more JSON-RPC batches, returning responses in call order."""
+        await self._ensure_session()
+
+        responses: List[RPCResponse] = []
+        offset = 0
+        while offset < len(calls):
+            chunk = calls[offset:offset + self.max_batch_size]
+            responses.extend(await self._send_with_split(chunk))
+            offset += len(chunk)
+        return responses
+
+    async def _send_with_split(self, calls: Sequence[RPCCall]) -> List[RPCResponse]:
+        if len(calls) == 1:
+            method, params = calls[0]
+            return [await self.make_request(RPCEndpoint(method), params)]
+
+        try:
+            return await self._send_batch(calls)
+        except BatchRejectedError as e:
+            half = len(calls) // 2
+            if half < self.max_batch_size:
+                self.max_batch_size = max(1, half)
+                logger.info(
+                    f"RPC batch of {len(calls)} rejected by {self.endpoint_uri} ({e}), "
+                    f"lowering batch size to {self.max_batch_size}"
+                )
+            return (
+                await self._send_with_split(calls[:half])
+                + await self._send_with_split(calls[half:])
+            )
+
+    async def _send_batch(self, calls: Sequence[RPCCall]) -> List[RPCResponse]:
+        payload = []
+        for method, params in calls:
+            payload.append({
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": list(params or []),
+                "id": next(self._batch_ids),
+            })
+
+        try:
+            raw = await async_make_post_request(
+                self.endpoint_uri,
+                Web3.to_bytes(text=json.dumps(payload)),
+                **self.get_request_kwargs(),
+            )
+        except ClientResponseError as e:
+            # 413 / 400 / 5xx on oversized payloads are all treated as a rejection
+            raise BatchRejectedError(str(e)) from e
+
+        decoded = json.loads(raw)
+
+        # A single error object instead of an array means the batch itself was refused
+        if not isinstance(decoded, list):
+            raise BatchRejectedError(str(decoded.get("error", decoded)))
+
+        by_id = {item.get("id"): item for item in decoded}
+        ordered = [by_id.get(item["id"]) for item in payload]
+        if any(response is None for response in ordered):
+            raise BatchRejectedError(f"node answered {len(decoded)} of {len(payload)} calls")
+        return ordered
+
+
+class BatchRPC:
+    """
+    Typed helpers over `AsyncBatchHTTPProvider` that return the same
+    web3-formatted values (AttributeDict, HexBytes, ints) as the equivalent
+    `w3.eth` calls.
+
+    Falls back to concurrent single requests when the provider can't batch,
+    so callers never need to care which provider they were given.
+    """
+
+    def __init__(self, w3: AsyncWeb3):
+        self.w3 = w3
+
+    async def call_many(self, calls: Sequence[RPCCall]) -> List[Any]:
+        """Execute raw calls, returning formatted results (None for calls that errored)."""
+        if not calls:
+            return []
+
+        provider = self.w3.provider
+        if hasattr(provider, "make_batch_request"):
+            responses = await provider.make_batch_request(calls)
+        else:
+            responses = await asyncio.gather(*[
+                provider.make_request(RPCEndpoint(m), list(p)) for m, p in calls
+            ])
+
+        results = []
+        for (method, _), response in zip(calls, responses):
+            if "error" in response:
+                logger.debug(f"RPC {method} failed in batch: {response['error']}")
+                results.append(None)
+                continue
+            results.append(self._format(method, response.get("result")))
+        return results
+
+    @staticmethod
+    def _format(method: str, result: Any) -> Any:
+        formatter = PYTHONIC_RESULT_FORMATTERS.get(RPCEndpoint(method))
+        if formatter is not None and result is not None:
+            result = formatter(result)
+        return AttributeDict.recursive(result)
+
+    async def get_blocks(self, block_numbers: Sequence[int], full_transactions: bool = True) -> List[Optional[Dict[str, Any]]]:
+        return await self.call_many([
+            ("eth_getBlockByNumber", [hex(n), full_transactions]) for n in block_numbers
+        ])
+
+    async def get_transaction_receipts(self, tx_hashes: Sequence[Any]) -> List[Optional[Dict[str, Any]]]:
+        return await self.call_many([
+            ("eth_getTransactionReceipt", [_to_hex(h)]) for h in tx_hashes
+        ])
+
+    async def get_block_receipts(self, block_number: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch every receipt of a block with one `eth_getBlockReceipts` call.
+
+        Raises RPCMethodUnsupportedError if the node lacks the method; returns
+        None on any other error so callers can retry or fall back.
+        """
+        receipts = await self._block_request("eth_getBlockReceipts", block_number)
+        if receipts is None:
+            return None
+        return [self._format("eth_getTransactionReceipt", receipt) for receipt in receipts]
+
+    async def debug_trace_block(self, block_number: int, tracer: str = "callTracer") -> Optional[List[Dict[str, Any]]]:
+        """
+        Trace every transaction of a block with one `debug_traceBlockByNumber`
+        call (geth-style). Same error contract as `get_block_receipts`; the
+        raw tracer output is returned unformatted.
+        """
+        return await self._block_request("debug_traceBlockByNumber", block_number, {"tracer": tracer})
+
+    async def trace_block(self, block_number: int) -> Optional[List[Dict[str, Any]]]:
+        """Flat parity-style traces of a block (`trace_block`, erigon/reth/nethermind)."""
+        return await self._block_request("trace_block", block_number)
+
+    async def _block_request(self, method: str, block_number: int, *extra: Any) -> Optional[Any]:
+        response = await self.w3.provider.make_request(RPCEndpoint(method), [hex(block_number), *extra])
+
+        if "error" in response:
+            error = response["error"]
+            if _is_method_unsupported(error, method):
+                raise RPCMethodUnsupportedError(f"{method}: {error}")
+            logger.debug(f"{method} failed for block {block_number}: {error}")
+            return None
+
+        return response.get("result") or []
+
+    async def get_logs(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """`eth_getLogs` for one filter (errors propagate so callers can split the range)."""
+        return await self.w3.eth.get_logs(params)
+
+    async def get_code(self, addresses: Sequence[str], block: str = "latest") -> List[Optional[bytes]]:
+        return await self.call_many([
+            ("eth_getCode", [Web3.to_checksum_address(a), block]) for a in addresses
+        ])
+
+    async def get_storage_at(self, slots: Sequence[Tuple[str, int]], block: str = "latest") -> List[Optional[bytes]]:
+        """Batch `eth_getStorageAt` for (address, slot) pairs."""
+        return await self.call_many([
+            ("eth_getStorageAt", [Web3.to_checksum_address(address), hex(slot), block])
+            for address, slot in slots
+        ])
+
+    async def eth_call(self, calls: Sequence[Tuple[str, str]], block: str = "latest") -> List[Optional[bytes]]:
+        """Batch `eth_call` for (to, calldata) pairs; returns raw return data."""
+        return await self.call_many([
+            ("eth_call", [{"to": Web3.to_checksum_address(to), "data": data}, block])
+            for to, data in calls
+        ])
+
+
+def _is_method_unsupported(error: Any, method: str) -> bool:
+    """
+    Whether the node lacks `method` altogether, as opposed to a transient
+    failure such as "header not found" that is worth retrying.
+    """
+    if not isinstance(error, dict):
+        return False
+    if error.get("code") == METHOD_NOT_FOUND:
+        return True
+    message = str(error.get("message", "")).lower()
+    # e.g. "the method debug_traceBlockByNumber does not exist/is not available"
+    if method.lower() not in message and "method" not in message:
+        return False
+    return any(hint in message for hint in ("method not found", "does not exist", "not available", "not supported", "unsupported"))
+
+
+def _to_hex(value: Any) -> str:
+    return value.hex() if hasattr(value, "hex") else value
@@ -0,0 +1,126 @@
+"""
+Function selector families and a one-pass multi-family matcher.
+
+Every family the classifier and analyzers care about is compiled into a
+single selector -> families table, so a contract's dispatcher is decoded
+once and each of its selectors costs one dict lookup, however many
+families are registered.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+from web3 import Web3
+
+from utils.bytecode import Bytecode, extract_selectors
+
+
+def _from_signatures(*signatures: str) -> Dict[str, str]:
+    return {Web3.keccak(text=sig).hex()[2:10]: sig.split("(")[0] for sig in signatures}
+
+
+# ERC20 required function selectors
+ERC20_SELECTORS = {
+    "18160ddd": "totalSupply",  # totalSupply()
+    "70a08231": "balanceOf",  # balanceOf(address)
+    "a9059cbb": "transfer",  # transfer(address,uint256)
+    "095ea7b3": "approve",  # approve(address,uint256)
+    "23b872dd": "transferFrom",  # transferFrom(address,address,uint256)
+}
+
+# Common optional ERC20 selectors
+ERC20_METADATA_SELECTORS = {
+    "06fdde03": "name",  # name()
+    "95d89b41": "symbol",  # symbol()
+    "313ce567": "decimals",  # decimals()
+}
+
+# Common ownership-related function selectors
+OWNERSHIP_SELECTORS = {
+    "8da5cb5b": "owner()",  # owner()
+    "f2fde38b": "transferOwnership",  # transferOwnership(address)
+    "715018a6": "renounceOwnership",  # renounceOwnership()
+    "13af4035": "setOwner",  # setOwner(address)
+}
+
+# Dangerous function selectors
+DANGEROUS_SELECTORS = {
+    "42966c68": "burn",  # burn(uint256)
+    "79cc6790": "burnFrom",  # burnFrom(address,uint256)
+    "40c10f19": "mint",  # mint(address,uint256)
+    "9dc29fac": "withdraw",  # withdraw(uint256)
+    "24d7806c": "setMinter",  # setMinter(address)
+    "9b2f3ef0": "setBlacklist",  # setBlacklist(address,bool)
+    "f9f92be4": "addToBlacklist",  # addToBlacklist(address)
+    "f0f9d4c6": "removeFromBlacklist",  # removeFromBlacklist(address)
+    "8456cb59": "pause",  # pause()
+    "3f4ba83a": "unpause",  # unpause()
+    "8f283970": "setPauser",  # setPauser(address)
+}
+
+# Owner-settable fees / taxes
+FEE_SELECTORS = _from_signatures(
+    "setFee(uint256)",
+    "setFees(uint256,uint256)",
+    "setTaxFeePercent(uint256)",
+    "setBuyFee(uint256)",
+    "setSellFee(uint256)",
+    "updateFees(uint256,uint256)",
+)
+
+# Upgradeable proxies and their admin surface
+PROXY_SELECTORS = _from_signatures(
+    "upgradeTo(address)",
+    "upgradeToAndCall(address,bytes)",
+    "implementation()",
+    "proxiableUUID()",
+    "changeAdmin(address)",
+)
+
+SELECTOR_FAMILIES: Dict[str, Dict[str, str]] = {
+    "erc20": ERC20_SELECTORS,
+    "erc20_metadata": ERC20_METADATA_SELECTORS,
+    "ownership": OWNERSHIP_SELECTORS,
+    "dangerous": DANGEROUS_SELECTORS,
+    "fees": FEE_SELECTORS,
+    "proxy": PROXY_SELECTORS,
+}
+
+
+@dataclass
+class SelectorProfile:
+    selectors: Set[str]
+    families: Dict[str, Set[str]] = field(default_factory=dict)
+
+    def count(self, family: str) -> int:
+        return len(self.families.get(family, ()))
+
+    def names(self, family: str) -> List[str]:
+        """Names of the family's functions present, in the family table's order."""
+        matched = self.families.get(family, set())
+        return [name for selector, name in SELECTOR_FAMILIES[family].items() if selector in matched]
+
+
+class SelectorMatcher:
+    """Matches a contract's dispatcher selectors against many families in one pass."""
+
+    def __init__(self, families: Dict[str, Dict[str, str]]):
+        self.family_names = list(families)
+        self._index: Dict[str, Tuple[str, ...]] = {}
+        for family, table in families.items():
+            for selector in table:
+                self._index[selector] = self._index.get(selector, ()) + (family,)
+
+    def match(self, bytecode: Bytecode) -> SelectorProfile:
+        selectors = extract_selectors(bytecode)
+        return self.match_selectors(selectors)
+
+    def match_selectors(self, selectors: Set[str]) -> SelectorProfile:
+        families: Dict[str, Set[str]] = {family: set() for family in self.family_names}
+        index = self._index
+        for selector in selectors:
+            for family in index.get(selector, ()):
+                families[family].add(selector)
+        return SelectorProfile(selectors=selectors, families=families)
+
+
+# Shared matcher over every registered family
+SELECTOR_MATCHER = SelectorMatcher(SELECTOR_FAMILIES)
@@ -0,0 +1,79 @@
+"""
+Shared AsyncWeb3 clients.
+
+Every listener, detector and analyzer in a process talks to the nodes
+through the same AsyncWeb3 instance per RPC URL, and all of them share
+pooled aiohttp sessions, so I/O for Base and Ethereum overlaps on a single
+event loop instead of blocking it.
+"""
+import asyncio
+import functools
+import logging
+from typing import Dict, Optional, Tuple
+from aiohttp import ClientSession, TCPConnector
+from web3 import AsyncWeb3
+from web3.middleware import async_geth_poa_middleware
+
+from config.settings import settings
+from utils.rpc_batch import AsyncBatchHTTPProvider
+
+logger = logging.getLogger(__name__)
+
+SHARED_POOL = "shared"
+
+_sessions: Dict[str, Tuple[ClientSession, asyncio.AbstractEventLoop]] = {}
+_clients: Dict[Tuple[str, bool, Optional[int]], AsyncWeb3] = {}
+
+
+async def get_shared_session(pool: str = SHARED_POOL, limit: Optional[int] = None) -> ClientSession:
+    """
+    Return the HTTP session of a connection pool, creating it for the running
+    loop if needed. Every client shares the default pool unless it asked for
+    a dedicated one.
+    """
+    loop = asyncio.get_running_loop()
+    session, session_loop = _sessions.get(pool, (None, None))
+    if session is None or session.closed or session_loop is not loop:
+        limit = limit or settings.RPC_POOL_SIZE
+        connector = TCPConnector(
+            limit=limit,
+            limit_per_host=min(limit, settings.RPC_POOL_SIZE_PER_HOST),
+            keepalive_timeout=60,
+        )
+        session = ClientSession(connector=connector, raise_for_status=True)
+        _sessions[pool] = (session, loop)
+        logger.debug(f"Created {pool} RPC session (pool={limit})")
+    return session
+
+
+async def close_shared_session() -> None:
+    """Close every RPC HTTP session (call on shutdown)."""
+    sessions = list(_sessions.values())
+    _sessions.clear()
+    for session, _ in sessions:
+        if not session.closed:
+            await session.close()
+
+
+def get_async_web3(rpc_url: str, poa: bool = False, pool_size: Optional[int] = None) -> AsyncWeb3:
+    """
+    Return the shared AsyncWeb3 client for an RPC URL.
+
+    `poa` injects the geth PoA middleware, needed for OP-stack chains like
+    Base whose blocks carry oversized extraData. `pool_size` gives the client
+    its own connection pool of that size, so a slow node can't hold
+    connections other chains need.
+    """
+    key = (rpc_url, poa, pool_size)
+    w3 = _clients.get(key)
+    if w3 is None:
+        if pool_size:
+            session_factory = functools.partial(get_shared_session, rpc_url, pool_size)
+        else:
+            session_factory = get_shared_session
+        provider = AsyncBatchHTTPProvider(rpc_url, session_factory=session_factory)
+        w3 = AsyncWeb3(provider)
+        if poa:
+            w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+        _clients[key] = w3
+    return w3